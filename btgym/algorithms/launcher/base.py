@@ -29,12 +29,14 @@ import psutil
 import glob
 from subprocess import PIPE
 import signal
+import multiprocessing
 import numpy as np
 import copy
 
 from btgym.algorithms.worker import Worker
 from btgym.algorithms.aac import A3C
 from btgym.algorithms.policy import BaseAacPolicy
+from btgym.ports import clear_ports
 
 import sys
 sys.path.insert(0,'..')
@@ -194,8 +196,11 @@ class Launcher():
         # Configure workers:
         self.workers_config_list = self._make_workers_spec()
 
-        # Ensure data_server port is clear:
-        self.clear_port(self.env_config['kwargs']['data_port'])
+        # Ensure cluster, environments and data_server ports are clear:
+        if self.env_config['kwargs'].get('transport', 'tcp') == 'tcp':
+            self.ports_to_use.append(self.env_config['kwargs']['data_port'])
+
+        self.clear_port(self.ports_to_use)
 
         self.log.debug('Launcher ready.')
 
@@ -255,7 +260,9 @@ class Launcher():
                         'random_seed': self.workers_rnd_seeds.pop()
                     }
                 )
-                self.clear_port(env_config['kwargs']['port'])
+                if key in 'worker' and env_config['kwargs'].get('transport', 'tcp') == 'tcp':
+                    # Otherwise environments talk via ipc sockets:
+                    self.ports_to_use += env_config['kwargs']['port']
                 workers_config_list.append(worker_config)
                 task_index += 1
 
@@ -270,7 +277,6 @@ class Launcher():
         port = config['port']
 
         for _ in range(config['num_ps']):
-            self.clear_port(port)
             self.ports_to_use.append(port)
             all_ps.append('{}:{}'.format(config['host'], port))
             port += 1
@@ -278,7 +284,6 @@ class Launcher():
 
         all_workers = []
         for _ in range(config['num_workers']):
-            self.clear_port(port)
             self.ports_to_use.append(port)
             all_workers.append('{}:{}'.format(config['host'], port))
             port += 1
@@ -292,12 +297,8 @@ class Launcher():
         if not isinstance(port_list, list):
             port_list = [port_list]
 
-        for port in port_list:
-            p = psutil.Popen(['lsof', '-i:{}'.format(port), '-t'], stdout=PIPE, stderr=PIPE)
-            pid = p.communicate()[0].decode()[:-1]  # retrieving PID
-            if pid is not '':
-                p = psutil.Popen(['kill', pid])
-                self.log.info('port {} cleared'.format(port))
+        clear_ports(port_list, log=self.log)
+
 
     def _update_config_dict(self, old_dict, new_dict=None):
         """
@@ -348,18 +349,20 @@ class Launcher():
             stop_worker([chief_worker])
             stop_worker(p_servers_list)
 
-        # Start workers:
+        # Start workers all at once, data slaves environments wait for data-master to launch datafeed_server:
+        start_time = time.time()
+        ready_list = []
         for worker_config in self.workers_config_list:
             # Make:
-            worker = Worker(**worker_config)
+            ready = multiprocessing.Event()
+            worker = Worker(ready=ready, **worker_config)
             # Launch:
             worker.daemon = False
             worker.start()
 
             if worker.job_name in 'worker':
-                # Allow data-master to launch datafeed_server:
+                ready_list.append((worker, ready))
                 if worker_config['env_config']['kwargs']['data_master']:
-                    time.sleep(5)
                     chief_worker = worker
 
                 else:
@@ -368,6 +371,15 @@ class Launcher():
             else:
                 p_servers_list.append(worker)
 
+        # Wait for workers environments to get ready:
+        for worker, ready in ready_list:
+            while not ready.wait(1):
+                if not worker.is_alive():
+                    self.log.error('worker_{} exited before getting ready.'.format(worker.task))
+                    break
+
+        self.log.notice('Cluster started in {:.2f} sec.'.format(time.time() - start_time))
+
         # TODO: auto-launch tensorboard?
 
         signal.signal(signal.SIGINT, signal_handler)
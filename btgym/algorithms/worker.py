@@ -12,6 +12,7 @@ import os
 import random
 import multiprocessing
 import datetime
+import time
 
 import tensorflow as tf
 
@@ -68,7 +69,8 @@ class Worker(multiprocessing.Process):
                  max_env_steps,
                  random_seed=None,
                  render_last_env=False,
-                 test_mode=False):
+                 test_mode=False,
+                 ready=None):
         """
 
         Args:
@@ -87,6 +89,7 @@ class Worker(multiprocessing.Process):
             random_seed:            int or None
             render_last_env:        bool, if True - render enabled for last environment in a list; first otherwise
             test_mode:              if True - use Atari mode, BTGym otherwise.
+            ready:                  multiprocessing.Event or None, set when worker environments are ready.
 
             Note:
                 - Conventional `self.global_step` refers to number of environment steps,
@@ -117,6 +120,7 @@ class Worker(multiprocessing.Process):
         self.test_mode = test_mode
         self.random_seed = random_seed
         self.render_last_env = render_last_env
+        self.ready = ready
 
         # Saver and summaries path:
         self.current_ckpt_dir = self.log_dir + log_ckpt_subdir
@@ -247,6 +251,9 @@ class Worker(multiprocessing.Process):
                 else:
                     task_id = 0
 
+                # Servers are started concurrently, see below:
+                env_kwargs['wait_server'] = False
+                start_time = time.time()
                 for port, data_port, is_render, is_master in zip(port_list, data_port_list, render_list, data_master_list):
                     # Get random seed for environments:
                     env_kwargs['random_seed'] = random.randint(0, 2 ** 30)
@@ -289,6 +296,18 @@ class Worker(multiprocessing.Process):
                             self.log.exception('failed to make Gym/Atari environment')
                             raise e
 
+                if not self.test_mode:
+                    # All server processes have been started, wait for every one to get ready:
+                    for env in self.env_list:
+                        env.connect_server()
+
+                    self.log.info(
+                        '{} environments started in {:.2f} sec.'.format(len(self.env_list), time.time() - start_time)
+                    )
+
+                if self.ready is not None:
+                    self.ready.set()
+
                 self.log.debug('Defining trainer...')
 
                 # Define trainer:
@@ -21,15 +21,42 @@ from logbook import Logger, StreamHandler, WARNING
 
 import datetime
 import random
+import numpy as np
 from numpy.random import beta as random_beta
 import copy
 import os
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
 from backtrader import TimeFrame
-import backtrader.feeds as btfeeds
 import pandas as pd
 
+from .cache import source_cache_key, load_cached_source, save_cached_source
+from .store import BTgymDataStore
+from .ingest import ChunkedFrameBuilder, count_lines
+from .feed import BTgymNumpyData
+from .stat import BTgymIntervalStat
+
+def _read_source_remote(loader, filename, force_reload=False):
+    """
+    Parses single source file in pool worker process.
+
+    Args:
+        loader:         BTgymBaseData instance holding parsing params;
+        filename:       str, source file;
+        force_reload:   bool, ignore and rebuild cached entry, if any.
+
+    Returns:
+        tuple (pandas dataframe, number of duplicates found).
+    """
+    builder = None
+    if loader.chunksize:
+        builder = ChunkedFrameBuilder(count_lines(filename), float_dtype=loader.dtype or np.float64)
+
+    return loader._read_source(filename, force_reload=force_reload, builder=builder)
+
+
 DataSampleConfig = dict(
     get_new=True,
     sample_type=0,
@@ -93,6 +120,21 @@ class BTgymBaseData:
             index_col:                      0
             parse_dates:                    True
             names:                          ['open', 'high', 'low', 'close', 'volume']
+            cache_dir:                      None - if set, every parsed source file is stored in this directory
+                                            as set of binary column arrays, keyed by file path, modification time,
+                                            size and parsing params; subsequent loads memory-map cached arrays
+                                            and skip CSV parsing; `read_csv(force_reload=True)` rebuilds cache.
+            chunksize:                      None - if set to number of rows, sources are parsed in chunks of that size
+                                            straight into preallocated output buffers, with duplicates removed and
+                                            integer columns downcasted on the fly; bounds loading peak memory to
+                                            about final dataset size.
+            num_workers:                    None - if set to int > 1, source files of `filename` list are parsed
+                                            concurrently by pool of that many processes and merged in listed
+                                            order, same as when loaded one by one.
+            dtype:                          None - if set, e.g. to 'float32', all data columns are stored with
+                                            this dtype; float32 storage halves memory held by data and its samples
+                                            and size of samples sent to server; data is converted back to float64
+                                            by backtrader feed (see to_btfeed()) and statistic.
 
             specific_params Pandas to BT.feeds conversion
 
@@ -152,6 +194,10 @@ class BTgymBaseData:
                 index_col=0,
                 parse_dates=True,
                 names=['open', 'high', 'low', 'close', 'volume'],
+                cache_dir=None,
+                chunksize=None,
+                num_workers=None,
+                dtype=None,
 
                 # Pandas to BT.feeds params:
                 timeframe=1,  # 1 minute.
@@ -199,6 +245,9 @@ class BTgymBaseData:
         self.data_name = self.data_names[0]
 
         self.data = None  # Will hold actual data as pandas dataframe
+        self.data_store = None  # Shared memory-mapped data source, if any, see share_data()
+        self.store_interval = None  # [first, last] rows of shared source this instance data is view of
+        self._shared_data = None
         self.is_ready = False
 
         self.global_timestamp = 0
@@ -206,6 +255,11 @@ class BTgymBaseData:
         self.final_timestamp = 0
 
         self.data_stat = None  # Dataset descriptive statistic as pandas dataframe
+        self.stat = None  # Statistic accumulators, see describe()
+        self.stat_interval = None  # This instance data rows interval within data `stat` is built on
+        self._stat_data = None  # Data `stat` refers to
+        self._described_data = None  # Data `data_stat` refers to
+        self._stat_percentiles = False  # True if `data_stat` holds percentiles
         self.data_range_delta = None  # Dataset total duration timedelta
         self.max_time_gap = None
         self.time_gap = None
@@ -217,6 +271,12 @@ class BTgymBaseData:
         self.expanding = False
 
         self.sample_instance = None
+        self.sample_lock = threading.RLock()  # Guards sampling state when sampled concurrently, see _sample()
+        self._start_index = {}  # Valid sample start rows, keyed by sample number of records, see _get_start_index()
+        self.cache_dir = None  # Parsed source files binary cache location, see read_csv()
+        self.chunksize = None  # Streaming parsing chunk size, see read_csv()
+        self.num_workers = None  # Number of processes to parse source files with, see read_csv()
+        self.dtype = None  # Data storage dtype, see read_csv()
 
         self.test_range_delta = None
         self.train_range_delta = None
@@ -403,6 +463,11 @@ class BTgymBaseData:
                 )
                 raise AssertionError
 
+        # Precompute valid sample start rows:
+        self._start_index = {}
+        if self.data.shape[0] > self.sample_num_records > 0:
+            self._get_start_index(self.sample_num_records)
+
         self.sample_num = 0
         self.is_ready = True
 
@@ -412,7 +477,7 @@ class BTgymBaseData:
 
         Args:
             data_filename: [opt] csv data filename as string or list of such strings.
-            force_reload:  ignore loaded data.
+            force_reload:  ignore loaded data and cached source files, if any.
         """
         if self.data is not None and not force_reload:
             data_range = pd.to_datetime(self.data.index)
@@ -425,41 +490,325 @@ class BTgymBaseData:
         if type(self.filename) == str:
             self.filename = [self.filename]
 
+        if self.num_workers is not None and self.num_workers > 1 and len(self.filename) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.num_workers, len(self.filename))) as pool:
+                self._merge_sources(self._submit_sources(pool, force_reload=force_reload))
+            return
+
+        builder = None
+        if self.chunksize:
+            # Streaming mode: all sources are parsed straight into single set of preallocated buffers,
+            # number of lines is an upper bound for number of records:
+            builder = ChunkedFrameBuilder(
+                sum([count_lines(filename) for filename in self.filename if filename and os.path.isfile(filename)]),
+                float_dtype=self.dtype or np.float64,
+            )
+
         dataframes = []
         for filename in self.filename:
             try:
                 assert filename and os.path.isfile(filename)
-                current_dataframe = pd.read_csv(
-                    filename,
-                    sep=self.sep,
-                    header=self.header,
-                    index_col=self.index_col,
-                    parse_dates=self.parse_dates,
-                    names=self.names,
-                )
-
-                # Check and remove duplicate datetime indexes:
-                duplicates = current_dataframe.index.duplicated(keep='first')
-                how_bad = duplicates.sum()
-                if how_bad > 0:
-                    current_dataframe = current_dataframe[~duplicates]
-                    self.log.warning('Found {} duplicated date_time records in <{}>.\
-                     Removed all but first occurrences.'.format(how_bad, filename))
-
-                dataframes += [current_dataframe]
-                self.log.info('Loaded {} records from <{}>.'.format(dataframes[-1].shape[0], filename))
+                current_dataframe, how_bad = self._read_source(filename, force_reload=force_reload, builder=builder)
+                dataframes += [self._check_source(filename, current_dataframe, how_bad)]
 
             except:
                 msg = 'Data file <{}> not specified / not found / parser error.'.format(str(filename))
                 self.log.error(msg)
                 raise FileNotFoundError(msg)
 
-        self.data = pd.concat(dataframes)
+        if builder is not None:
+            self._set_data(builder.frame())
+
+        else:
+            self._set_data(pd.concat(dataframes))
+
+    def _check_source(self, filename, dataframe, how_bad):
+        """
+        Reports single loaded source.
+
+        Returns:
+            dataframe
+        """
+        if how_bad > 0:
+            self.log.warning('Found {} duplicated date_time records in <{}>.\
+             Removed all but first occurrences.'.format(how_bad, filename))
+
+        self.log.info('Loaded {} records from <{}>.'.format(dataframe.shape[0], filename))
+        return dataframe
+
+    def _set_data(self, data):
+        """
+        Sets freshly loaded data, dropping everything derived from previous one.
+
+        Args:
+            data:   pandas dataframe
+        """
+        if self.dtype is not None:
+            data = data.astype(self.dtype, copy=False)
+
+        # Store of previous data is not used anymore, delete if owned:
+        self.release_data_store()
+        self.data = data
+        self._start_index = {}
+        self.data_stat = None
+        self._stat_percentiles = False
+        self.stat = None
+        self.stat_interval = None
         data_range = pd.to_datetime(self.data.index)
         self.total_num_records = self.data.shape[0]
         self.data_range_delta = (data_range[-1] - data_range[0]).to_pytimedelta()
 
-    def describe(self):
+    def _submit_sources(self, pool, force_reload=False):
+        """
+        Schedules parsing of every source file by process pool.
+
+        Args:
+            pool:           concurrent.futures.ProcessPoolExecutor instance;
+            force_reload:   bool, ignore and rebuild cached entries, if any.
+
+        Returns:
+            list of tuples (filename, future); futures resolve to `_read_source()` results.
+        """
+        if type(self.filename) == str:
+            self.filename = [self.filename]
+
+        # Light-weight copy to ship to workers:
+        loader = copy.copy(self)
+        loader.data = None
+        loader._shared_data = None
+        loader.data_store = None
+        loader._start_index = {}
+
+        return [
+            (filename, pool.submit(_read_source_remote, loader, filename, force_reload)) for filename in self.filename
+        ]
+
+    def _merge_sources(self, futures):
+        """
+        Collects sources parsed by process pool and sets instance data.
+
+        Args:
+            futures:    list of tuples (filename, future) as returned by `_submit_sources()`.
+        """
+        dataframes = []
+        for filename, future in futures:
+            try:
+                assert filename and os.path.isfile(filename)
+                current_dataframe, how_bad = future.result()
+                dataframes += [self._check_source(filename, current_dataframe, how_bad)]
+
+            except:
+                msg = 'Data file <{}> not specified / not found / parser error.'.format(str(filename))
+                self.log.error(msg)
+                raise FileNotFoundError(msg)
+
+        # Merge in order files are listed, same as sequential loading does, regardless of order they got parsed:
+        self._set_data(pd.concat(dataframes))
+
+    def _read_source(self, filename, force_reload=False, builder=None):
+        """
+        Loads single CSV source file, using binary cache if `cache_dir` param is set.
+
+        Args:
+            filename:       str, existing csv file;
+            force_reload:   bool, ignore and rebuild cached entry, if any;
+            builder:        ChunkedFrameBuilder instance or None; if given, source is parsed in chunks and
+                            appended to builder buffers.
+
+        Returns:
+            tuple (pandas dataframe with duplicate records removed, number of duplicates found);
+            if builder is given, dataframe returned is view of builder buffers.
+        """
+        cache_key = None
+        cached = None
+        if self.cache_dir is not None:
+            try:
+                cache_key = source_cache_key(filename, vars(self))
+                if not force_reload:
+                    cached = load_cached_source(self.cache_dir, cache_key)
+
+            except (OSError, ValueError, KeyError) as e:
+                self.log.warning('Failed to load cached <{}>, parsing source. Reason: {}'.format(filename, e))
+
+        if cached is not None:
+            self.log.debug('Cache hit for <{}>, key: {}'.format(filename, cache_key))
+            if builder is None:
+                return cached
+
+            builder.start_source()
+            builder.append(cached[0])
+            builder.finish_source()
+
+            return builder.frame(builder.source_start), cached[1]
+
+        csv_kwargs = dict(
+            sep=self.sep,
+            header=self.header,
+            index_col=self.index_col,
+            parse_dates=self.parse_dates,
+            names=self.names,
+        )
+        if builder is not None:
+            builder.start_source()
+            for chunk in pd.read_csv(filename, chunksize=self.chunksize, **csv_kwargs):
+                builder.append(chunk)
+
+            how_bad = builder.finish_source()
+            dataframe = builder.frame(builder.source_start)
+
+        else:
+            dataframe = pd.read_csv(filename, **csv_kwargs)
+
+            # Check and remove duplicate datetime indexes:
+            duplicates = dataframe.index.duplicated(keep='first')
+            how_bad = duplicates.sum()
+            if how_bad > 0:
+                dataframe = dataframe[~duplicates]
+
+        if cache_key is not None:
+            try:
+                if save_cached_source(self.cache_dir, cache_key, dataframe, how_bad, source=filename):
+                    self.log.debug('Cached <{}> as: {}'.format(filename, cache_key))
+
+                else:
+                    self.log.debug('<{}> holds non-numeric data, not cached.'.format(filename))
+
+            except OSError as e:
+                self.log.warning('Failed to cache <{}>. Reason: {}'.format(filename, e))
+
+        return dataframe, how_bad
+
+    def share_data(self, store_dir=None, force=False):
+        """
+        Moves loaded data to memory-mapped store, shared by all processes on host.
+        Instance data becomes zero-copy view of that store; all samples made afterwards carry only
+        store handle and rows interval when pickled, e.g. when sent by data server.
+
+        Args:
+            store_dir:  str, directory to create store in, def: RAM-backed directory if available;
+            force:      bool, create new store even if current data is already shared.
+
+        Returns:
+            BTgymDataStore instance.
+        """
+        try:
+            assert not self.data.empty
+
+        except (AssertionError, AttributeError) as e:
+            msg = 'Instance holds no data. Hint: forgot to call .read_csv()?'
+            self.log.error(msg)
+            raise AssertionError(msg)
+
+        if self.data_store is not None and self.data is self._shared_data and not force:
+            return self.data_store
+
+        self.release_data_store()
+        self.data_store = BTgymDataStore.from_frame(self.data, store_dir=store_dir)
+        self.store_interval = [0, self.data_store.num_records]
+        self.data = self.data_store.frame()
+        self._shared_data = self.data
+        self.log.debug('Data shared at: {}'.format(self.data_store.path))
+
+        return self.data_store
+
+    def release_data_store(self):
+        """
+        Deletes shared data store owned by this instance, if any. Loaded data stays valid.
+        """
+        if self.data_store is not None and self._shared_data is not None:
+            # Only instance created the store owns it:
+            self.data_store.close()
+            self.log.debug('Released data store: {}'.format(self.data_store.path))
+
+        self.data_store = None
+        self.store_interval = None
+        self._shared_data = None
+
+    def _attach_store(self, instance, first_row):
+        """
+        Passes shared data store handle to sample instance.
+
+        Args:
+            instance:   sample instance with data already set;
+            first_row:  int, sample first row relative to this instance data.
+        """
+        if self.data_store is not None:
+            first_row = self.store_interval[0] + first_row
+            instance.data_store = self.data_store
+            instance.store_interval = [first_row, first_row + instance.data.shape[0]]
+
+    def get_descriptor(self):
+        """
+        Returns compact description of this sample instance, sufficient to restore it from shared data store
+        by any process on host, see: from_descriptor().
+
+        Returns:
+            dict of: filename, metadata, store handle, rows interval;
+            None if instance data is not shared.
+        """
+        if self.data_store is None:
+            return None
+
+        return dict(
+            filename=self.filename,
+            metadata=self.metadata,
+            store=self.data_store,
+            interval=self.store_interval,
+        )
+
+    def get_sample_config(self):
+        """
+        Returns:
+            dict of class reference and kwargs this instance makes its samples with.
+        """
+        return dict(
+            class_ref=self.nested_class_ref,
+            kwargs=self.nested_params,
+        )
+
+    @staticmethod
+    def from_descriptor(descriptor, sample_config):
+        """
+        Makes sample instance from its descriptor, with data being zero-copy view of shared store.
+
+        Args:
+            descriptor:     dict, as returned by sample get_descriptor() method;
+            sample_config:  dict, as returned by parent get_sample_config() method.
+
+        Returns:
+            sample instance.
+        """
+        instance = sample_config['class_ref'](**sample_config['kwargs'])
+        instance.filename = descriptor['filename']
+        instance.metadata = descriptor['metadata']
+        instance.data_store = descriptor['store']
+        instance.store_interval = list(descriptor['interval'])
+        instance.data = instance.data_store.frame(*instance.store_interval)
+
+        return instance
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Cheap to recompute by receiving side:
+        state['_start_index'] = {}
+        state['stat'] = None
+        state['stat_interval'] = None
+        state['_stat_data'] = None
+        state['_described_data'] = None
+        state['sample_lock'] = None
+        if self.data_store is not None:
+            # Data gets restored from shared store by receiving side:
+            state['data'] = None
+            state['_shared_data'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.sample_lock = threading.RLock()
+        if self.data_store is not None and self.data is None:
+            self.data = self.data_store.frame(*self.store_interval)
+
+    def describe(self, percentiles=True):
         """
         Returns summary dataset statistic as pandas dataframe:
 
@@ -473,9 +822,18 @@ class BTgymBaseData:
             - max value
 
         for every data column.
+
+        Args:
+            percentiles:    bool, if False - percentiles are left NaN, till requested by next call;
+                            those are only statistic taking pass over all data rows.
         """
-        # Pretty straightforward, using standard pandas utility.
-        # The only caveat here is that if actual data has not been loaded yet, need to load, describe and unload again,
+        # Computed once per data and cached: statistic of already flushed data is still valid;
+        # samples made by instance holding statistic accumulators get described in O(1) (see _attach_stat()):
+        if self.data_stat is not None and (self.data is None or self.data is self._described_data) and \
+                (self._stat_percentiles or not percentiles):
+            return self.data_stat
+
+        # If actual data has not been loaded yet, need to load, describe and unload again,
         # thus avoiding passing big files to BT server:
         flush_data = False
         try:
@@ -486,15 +844,47 @@ class BTgymBaseData:
             self.read_csv()
             flush_data = True
 
-        self.data_stat = self.data.describe()
+        self.data_stat = self.get_stat().describe(self.data, self.stat_interval[0], percentiles=percentiles)
+        self._described_data = self.data
+        self._stat_percentiles = percentiles
         self.log.info('Data summary:\n{}'.format(self.data_stat.to_string()))
 
         if flush_data:
             self.data = None
+            self.stat = None
+            self._stat_data = None
             self.log.info('Flushed data.')
 
         return self.data_stat
 
+    def get_stat(self):
+        """
+        Returns statistic accumulators of loaded data, builds ones if needed.
+
+        Returns:
+            BTgymIntervalStat instance, this instance data rows are given by `stat_interval` attribute.
+        """
+        if self.stat is None or self._stat_data is not self.data:
+            self.stat = BTgymIntervalStat(self.data)
+            self.stat_interval = [0, self.data.shape[0]]
+            self._stat_data = self.data
+
+        return self.stat
+
+    def _attach_stat(self, instance, first_row):
+        """
+        Passes statistic accumulators to sample instance, if any built.
+
+        Args:
+            instance:   sample instance with data already set;
+            first_row:  int, sample first row relative to this instance data.
+        """
+        if self.stat is not None and self._stat_data is self.data:
+            first_row = self.stat_interval[0] + first_row
+            instance.stat = self.stat
+            instance.stat_interval = [first_row, first_row + instance.data.shape[0]]
+            instance._stat_data = instance.data
+
     def to_btfeed(self):
         """
         Performs BTgymData-->bt.feed conversion.
@@ -509,7 +899,7 @@ class BTgymBaseData:
             return timeframe
         try:
             assert not self.data.empty
-            btfeed = btfeeds.PandasDirectData(
+            btfeed = BTgymNumpyData(
                 dataname=self.data,
                 timeframe=bt_timeframe(self.timeframe),
                 datetime=self.datetime,
@@ -594,6 +984,12 @@ class BTgymBaseData:
                 raise ValueError(msg)
 
         if self.sample_instance is None or get_new:
+            # Only sample number is reserved under lock; sample itself is drawn and built outside of it,
+            # so concurrent callers (see BTgymDataFeedServer) do not wait for each other:
+            with self.sample_lock:
+                sample_num = self.sample_num
+                self.sample_num += 1
+
             if sample_type == 0:
                 # Get beta_distributed sample in train interval:
                 if force_interval:
@@ -601,12 +997,13 @@ class BTgymBaseData:
                 else:
                     sample_interval = self.train_interval
 
-                self.sample_instance = self._sample_interval(
+                sample = self._sample_interval(
                     sample_interval,
                     force_interval=force_interval,
                     b_alpha=b_alpha,
                     b_beta=b_beta,
                     name='train_' + self.sample_name,
+                    sample_num=sample_num,
                     **kwargs
                 )
 
@@ -617,25 +1014,137 @@ class BTgymBaseData:
                 else:
                     sample_interval = self.test_interval
 
-                self.sample_instance = self._sample_interval(
+                sample = self._sample_interval(
                     sample_interval,
                     force_interval=force_interval,
                     b_alpha=1,
                     b_beta=1,
                     name='test_' + self.sample_name,
+                    sample_num=sample_num,
                     **kwargs
                 )
-            self.sample_instance.metadata['type'] = sample_type  # TODO: can move inside sample()
-            self.sample_instance.metadata['sample_num'] = self.sample_num
-            self.sample_instance.metadata['parent_sample_num'] = copy.deepcopy(self.metadata['sample_num'])
-            self.sample_instance.metadata['parent_sample_type'] = copy.deepcopy(self.metadata['type'])
-            self.sample_num += 1
+            sample.metadata['type'] = sample_type  # TODO: can move inside sample()
+            sample.metadata['sample_num'] = sample_num
+            sample.metadata['parent_sample_num'] = copy.deepcopy(self.metadata['sample_num'])
+            sample.metadata['parent_sample_type'] = copy.deepcopy(self.metadata['type'])
+            self.sample_instance = sample
 
         else:
             # Do nothing:
-            self.log.debug('Reusing sample, id: {}'.format(self.sample_instance.filename))
+            sample = self.sample_instance
+            self.log.debug('Reusing sample, id: {}'.format(sample.filename))
+
+        return sample
+
+    def _sample_num(self, sample_num=None):
+        """
+        Returns:
+            sample number reserved by caller, current one if not given.
+        """
+        if sample_num is None:
+            return self.sample_num
+
+        return sample_num
+
+    def _get_start_index(self, sample_num_records):
+        """
+        Returns index of valid sample start rows for given sample length, computed once per data reset.
+        Row is valid sample start if:
+            - its weekday is in `start_weekdays`;
+            - sample starting from it (or from nearest to 00:00 record of that day if `start_00` is set)
+              and containing `sample_num_records` rows has no more than `time_gap` of missing data.
+
+        Args:
+            sample_num_records:     int, sample number of records
+
+        Returns:
+            tuple of int64 arrays:
+                start_rows:     [num_records], actual sample start row for every candidate row,
+                                differs from candidate only if `start_00` is set;
+                valid_rows:     sorted valid candidate rows;
+                valid_cumsum:   [num_records + 1], number of valid candidate rows preceding every row.
+        """
+        try:
+            return self._start_index[sample_num_records]
+
+        except KeyError:
+            pass
+
+        with self.sample_lock:
+            if sample_num_records not in self._start_index:
+                self._build_start_index(sample_num_records)
+
+        return self._start_index[sample_num_records]
+
+    def _build_start_index(self, sample_num_records):
+        """
+        Computes valid sample start rows index for given sample length, see _get_start_index().
+        """
+        day = 86400 * 10 ** 9
+        timestamps = self.data.index.values.view(np.int64)
+        num_records = timestamps.shape[0]
+
+        weekday_ok = np.isin((timestamps // day + 3) % 7, list(self.start_weekdays))
+
+        if self.start_00:
+            # Same as `index.get_loc(date, method='nearest')` for every record's date:
+            midnight = timestamps - timestamps % day
+            right = np.searchsorted(timestamps, midnight, side='left')
+            left = np.searchsorted(timestamps, midnight, side='right') - 1
+            right_c = np.minimum(right, num_records - 1)
+            left_c = np.maximum(left, 0)
+            use_left = (right >= num_records) | (
+                (left >= 0) & (midnight - timestamps[left_c] < timestamps[right_c] - midnight)
+            )
+            start_rows = np.where(use_left, left_c, right_c)
+
+        else:
+            start_rows = np.arange(num_records)
+
+        last_rows = np.minimum(start_rows + sample_num_records, num_records) - 1
+        sample_len = timestamps[last_rows] - timestamps[start_rows]
+        max_sample_len = int(self.max_sample_len_delta.total_seconds()) * 10 ** 9
+        max_time_gap = int(self.max_time_gap.total_seconds()) * 10 ** 9
+        gap_ok = max_sample_len - sample_len < max_time_gap
+
+        valid = weekday_ok & gap_ok
+        valid_cumsum = np.zeros(num_records + 1, dtype=np.int64)
+        np.cumsum(valid, out=valid_cumsum[1:])
+
+        self._start_index[sample_num_records] = (start_rows, np.flatnonzero(valid), valid_cumsum)
+        self.log.debug(
+            'Start index for {} records sample: {} of {} rows valid.'.format(
+                sample_num_records, valid_cumsum[-1], num_records
+            )
+        )
+
+    def _draw_start_row(self, interval, sample_num_records, quantile):
+        """
+        Picks sample start row among valid ones in constant time.
+
+        Args:
+            interval:               [lower, upper] candidate rows, both included;
+            sample_num_records:     int, sample number of records;
+            quantile:               float in [0,1], relative position of row to pick among valid rows in interval.
+
+        Returns:
+            candidate row number.
+        """
+        start_rows, valid_rows, valid_cumsum = self._get_start_index(sample_num_records)
+        lower = min(max(min(interval), 0), start_rows.shape[0] - 1)
+        upper = min(max(max(interval), 0), start_rows.shape[0] - 1)
+        num_valid = valid_cumsum[upper + 1] - valid_cumsum[lower]
+
+        if num_valid <= 0:
+            msg = (
+                'No valid sample start found within rows: {}.\n' +
+                'Sample duration: {}, maximum time gap allowed: {}, start weekdays: {}.\n' +
+                'Hint: check sampling params / dataset consistency.'
+            ).format([lower, upper], self.max_sample_len_delta, self.max_time_gap, self.start_weekdays)
+            self.log.error(msg)
+            raise RuntimeError(msg)
 
-        return self.sample_instance
+        return int(valid_rows[valid_cumsum[lower] + min(int(num_valid * quantile), num_valid - 1)])
 
     def _sample_random(
             self,
@@ -644,6 +1153,7 @@ class BTgymBaseData:
             name='random_sample_',
             interval=None,
             force_interval=False,
+            sample_num=None,
             **kwargs
     ):
         """
@@ -651,6 +1161,7 @@ class BTgymBaseData:
 
         Args:
             name:        str, sample filename id
+            sample_num:  int, sample number to put in filename, current `sample_num` if not given
 
         Returns:
              BTgymDataset instance with number of records ~ max_episode_len,
@@ -670,87 +1181,43 @@ class BTgymBaseData:
         self.log.debug('Respective number of steps: {}.'.format(self.sample_num_records))
         self.log.debug('Maximum allowed data time gap set to: {}.\n'.format(self.max_time_gap))
 
-        sampled_data = None
-        sample_len = 0
-
-        # Sanity check param:
-        max_attempts = 100
-        attempts = 0
-
-        # # Keep sampling random enter points until all conditions are met:
-        while attempts <= max_attempts:
-
-            # Randomly sample record (row) from entire datafeed:
-            first_row = int((self.data.shape[0] - self.sample_num_records - 1) * random.random())
-            sample_first_day = self.data[first_row:first_row + 1].index[0]
-            self.log.debug('Sample start: {}, weekday: {}.'.format(sample_first_day, sample_first_day.weekday()))
-
-            # Keep sampling until good day:
-            while not sample_first_day.weekday() in self.start_weekdays and attempts <= max_attempts:
-                self.log.debug('Not a good day to start, resampling...')
-                first_row = int((self.data.shape[0] - self.sample_num_records - 1) * random.random())
-                sample_first_day = self.data[first_row:first_row + 1].index[0]
-                self.log.debug('Sample start: {}, weekday: {}.'.format(sample_first_day, sample_first_day.weekday()))
-                attempts +=1
-
-            # Check if managed to get proper weekday:
-            assert attempts <= max_attempts, \
-                'Quitting after {} sampling attempts. Hint: check sampling params / dataset consistency.'. \
-                format(attempts)
-
-            # If 00 option set, get index of first record of that day:
-            if self.start_00:
-                adj_timedate = sample_first_day.date()
-                self.log.debug('Start time adjusted to <00:00>')
-
-            else:
-                adj_timedate = sample_first_day
-
-            first_row = self.data.index.get_loc(adj_timedate, method='nearest')
-
-            # Easy part:
-            last_row = first_row + self.sample_num_records  # + 1
-            sampled_data = self.data[first_row: last_row]
-            sample_len = (sampled_data.index[-1] - sampled_data.index[0]).to_pytimedelta()
-            self.log.debug('Actual sample duration: {}.'.format(sample_len, ))
-            self.log.debug('Total sample time gap: {}.'.format(self.max_sample_len_delta - sample_len))
+        # Candidate start rows are: [0, num_records - sample_num_records - 2]:
+        first_row = self._draw_start_row(
+            [0, self.data.shape[0] - self.sample_num_records - 2],
+            self.sample_num_records,
+            random.random()
+        )
+        # If 00 option set, start is adjusted to first record of that day:
+        adj_row = self._get_start_index(self.sample_num_records)[0][first_row]
+        sample_first_day = self.data.index[first_row]
 
-            # Perform data gap check:
-            if self.max_sample_len_delta - sample_len < self.max_time_gap:
-                self.log.debug('Sample accepted.')
-                # If sample OK - compose and return sample:
-                new_instance = self.nested_class_ref(**self.nested_params)
-                new_instance.filename = name + 'n{}_at_{}'.format(self.sample_num, adj_timedate)
-                self.log.info('Sample id: <{}>.'.format(new_instance.filename))
-                new_instance.data = sampled_data
-                new_instance.metadata['type'] = 'random_sample'
-                new_instance.metadata['first_row'] = first_row
-                new_instance.metadata['last_row'] = last_row
+        if self.start_00:
+            adj_timedate = sample_first_day.date()
+            self.log.debug('Start time adjusted to <00:00>')
 
-                return new_instance
+        else:
+            adj_timedate = sample_first_day
 
-            else:
-                self.log.debug('Duration too big, resampling...\n')
-                attempts += 1
+        first_row = int(adj_row)
+        last_row = first_row + self.sample_num_records  # + 1
+        sampled_data = self.data[first_row: last_row]
+        self.log.debug(
+            'Sample start: {}, actual sample duration: {}.'.
+            format(sample_first_day, sampled_data.index[-1] - sampled_data.index[0])
+        )
+        self.log.debug('Sample accepted.')
 
-        # Got here -> sanity check failed:
-        msg = (
-            '\nQuitting after {} sampling attempts.\n' +
-            'Full sample duration: {}\n' +
-            'Total sample time gap: {}\n' +
-            'Sample start time: {}\n' +
-            'Sample finish time: {}\n' +
-            'Hint: check sampling params / dataset consistency.'
-        ).format(
-            attempts,
-            sample_len,
-            sample_len - self.max_sample_len_delta,
-            sampled_data.index[0],
-            sampled_data.index[-1]
+        new_instance = self.nested_class_ref(**self.nested_params)
+        new_instance.filename = name + 'n{}_at_{}'.format(self._sample_num(sample_num), adj_timedate)
+        self.log.info('Sample id: <{}>.'.format(new_instance.filename))
+        new_instance.data = sampled_data
+        self._attach_store(new_instance, first_row)
+        self._attach_stat(new_instance, first_row)
+        new_instance.metadata['type'] = 'random_sample'
+        new_instance.metadata['first_row'] = first_row
+        new_instance.metadata['last_row'] = last_row
 
-        )
-        self.log.error(msg)
-        raise RuntimeError(msg)
+        return new_instance
 
     def _sample_interval(
             self,
@@ -759,6 +1226,7 @@ class BTgymBaseData:
             b_beta=1.0,
             name='interval_sample_',
             force_interval=False,
+            sample_num=None,
             **kwargs
     ):
         """
@@ -773,7 +1241,11 @@ class BTgymBaseData:
             b_beta:         float > 0, sampling B-distribution beta param, def=1;
             name:           str, sample filename id
             force_interval: bool,  if true: force exact interval sampling
+            sample_num:     int, sample number to put in filename, current `sample_num` if not given
 
+        Note:
+            start position is drawn directly from precomputed set of valid start rows (see `_get_start_index()`),
+            beta-distribution quantile being applied to ordered valid rows within interval; no resampling needed.
 
         Returns:
              - BTgymDataset instance such as:
@@ -798,7 +1270,7 @@ class BTgymBaseData:
             raise AssertionError
 
         if force_interval:
-            return self._sample_exact_interval(interval, name)
+            return self._sample_exact_interval(interval, name, sample_num=sample_num)
 
         try:
             assert b_alpha > 0 and b_beta > 0
@@ -819,117 +1291,52 @@ class BTgymBaseData:
         self.log.debug('Sample number of steps (adjusted to interval): {}.'.format(sample_num_records))
         self.log.debug('Maximum allowed data time gap set to: {}.\n'.format(self.max_time_gap))
 
-        sampled_data = None
-        sample_len = 0
-
-        # Sanity check param:
-        max_attempts = 100
-        attempts = 0
-
-        # # Keep sampling random enter points until all conditions are met:
-        while attempts <= max_attempts:
-
-            first_row = interval[0] + int(
-                (interval[-1] - interval[0] - sample_num_records) * random_beta(a=b_alpha, b=b_beta)
-            )
-
-            #print('_sample_interval_sample_num_records: ', sample_num_records)
-            #print('_sample_interval_first_row: ', first_row)
-
-            sample_first_day = self.data[first_row:first_row + 1].index[0]
-            self.log.debug(
-                'Sample start row: {}, day: {}, weekday: {}.'.
-                format(first_row, sample_first_day, sample_first_day.weekday())
-            )
-
-            # Keep sampling until good day:
-            while not sample_first_day.weekday() in self.start_weekdays and attempts <= max_attempts:
-                self.log.debug('Not a good day to start, resampling...')
-                first_row = interval[0] + round(
-                    (interval[-1] - interval[0] - sample_num_records) * random_beta(a=b_alpha, b=b_beta)
-                )
-                #print('r_sample_interval_sample_num_records: ', sample_num_records)
-                #print('r_sample_interval_first_row: ', first_row)
-                sample_first_day = self.data[first_row:first_row + 1].index[0]
-                self.log.debug(
-                    'Sample start row: {}, day: {}, weekday: {}.'.
-                    format(first_row, sample_first_day, sample_first_day.weekday())
-                )
-                attempts += 1
-
-            # Check if managed to get proper weekday:
-            try:
-                assert attempts <= max_attempts
-
-            except AssertionError:
-                self.log.exception(
-                    'Quitting after {} sampling attempts. Hint: check sampling params / dataset consistency.'.
-                    format(attempts)
-                )
-                raise RuntimeError
-
-            # If 00 option set, get index of first record of that day:
-            if self.start_00:
-                adj_timedate = sample_first_day.date()
-                self.log.debug('Start time adjusted to <00:00>')
-                first_row = self.data.index.get_loc(adj_timedate, method='nearest')
+        # Draw start row among valid ones; candidates lie in [interval[0], interval[-1] - sample_num_records]:
+        first_row = self._draw_start_row(
+            [interval[0], interval[-1] - sample_num_records],
+            sample_num_records,
+            random_beta(a=b_alpha, b=b_beta)
+        )
+        sample_first_day = self.data.index[first_row]
+        self.log.debug(
+            'Sample start row: {}, day: {}, weekday: {}.'.
+            format(first_row, sample_first_day, sample_first_day.weekday())
+        )
 
-            else:
-                adj_timedate = sample_first_day
+        # If 00 option set, get index of first record of that day:
+        if self.start_00:
+            adj_timedate = sample_first_day.date()
+            self.log.debug('Start time adjusted to <00:00>')
+            first_row = int(self._get_start_index(sample_num_records)[0][first_row])
 
-            # first_row = self.data.index.get_loc(adj_timedate, method='nearest')
+        else:
+            adj_timedate = sample_first_day
 
-            # Easy part:
-            last_row = first_row + sample_num_records  # + 1
-            sampled_data = self.data[first_row: last_row]
+        # Easy part:
+        last_row = first_row + sample_num_records  # + 1
+        sampled_data = self.data[first_row: last_row]
 
-            self.log.debug(
-                'first_row: {}, last_row: {}, data_shape: {}'.format(
-                    first_row,
-                    last_row,
-                    sampled_data.shape
-                )
+        self.log.debug(
+            'first_row: {}, last_row: {}, data_shape: {}'.format(
+                first_row,
+                last_row,
+                sampled_data.shape
             )
-            sample_len = (sampled_data.index[-1] - sampled_data.index[0]).to_pytimedelta()
-            self.log.debug('Actual sample duration: {}.'.format(sample_len))
-            self.log.debug('Total sample time gap: {}.'.format(self.max_sample_len_delta - sample_len))
-
-            # Perform data gap check:
-            if self.max_sample_len_delta - sample_len < self.max_time_gap:
-                self.log.debug('Sample accepted.')
-                # If sample OK - return new dataset:
-                new_instance = self.nested_class_ref(**self.nested_params)
-                new_instance.filename = name + 'num_{}_at_{}'.format(self.sample_num, adj_timedate)
-                self.log.info('New sample id: <{}>.'.format(new_instance.filename))
-                new_instance.data = sampled_data
-                new_instance.metadata['type'] = 'interval_sample'
-                new_instance.metadata['first_row'] = first_row
-                new_instance.metadata['last_row'] = last_row
-
-                return new_instance
-
-            else:
-                self.log.debug('Attempt {}: gap is too big, resampling, ...\n'.format(attempts))
-                attempts += 1
+        )
+        self.log.debug('Actual sample duration: {}.'.format(sampled_data.index[-1] - sampled_data.index[0]))
+        self.log.debug('Sample accepted.')
 
-        # Got here -> sanity check failed:
-        msg = (
-                '\nQuitting after {} sampling attempts.\n' +
-                'Full sample duration: {}\n' +
-                'Total sample time gap: {}\n' +
-                'Sample start time: {}\n' +
-                'Sample finish time: {}\n' +
-                'Hint: check sampling params / dataset consistency.'
-        ).format(
-            attempts,
-            sample_len,
-            sample_len - self.max_sample_len_delta,
-            sampled_data.index[0],
-            sampled_data.index[-1]
+        new_instance = self.nested_class_ref(**self.nested_params)
+        new_instance.filename = name + 'num_{}_at_{}'.format(self._sample_num(sample_num), adj_timedate)
+        self.log.info('New sample id: <{}>.'.format(new_instance.filename))
+        new_instance.data = sampled_data
+        self._attach_store(new_instance, first_row)
+        self._attach_stat(new_instance, first_row)
+        new_instance.metadata['type'] = 'interval_sample'
+        new_instance.metadata['first_row'] = first_row
+        new_instance.metadata['last_row'] = last_row
 
-        )
-        self.log.error(msg)
-        raise RuntimeError(msg)
+        return new_instance
 
     def _sample_aligned_interval(
             self,
@@ -939,6 +1346,7 @@ class BTgymBaseData:
             b_beta=1.0,
             name='interval_sample_',
             force_interval=False,
+            sample_num=None,
             **kwargs
     ):
         """
@@ -954,6 +1362,7 @@ class BTgymBaseData:
             b_beta:         float > 0, sampling B-distribution beta param, def=1;
             name:           str, sample filename id
             force_interval: bool,  if true: force exact interval sampling
+            sample_num:     int, sample number to put in filename, current `sample_num` if not given
 
         Returns:
              - BTgymDataset instance such as:
@@ -978,7 +1387,7 @@ class BTgymBaseData:
             raise AssertionError
 
         if force_interval:
-            return self._sample_exact_interval(interval, name)
+            return self._sample_exact_interval(interval, name, sample_num=sample_num)
 
         try:
             assert b_alpha > 0 and b_beta > 0
@@ -1077,9 +1486,11 @@ class BTgymBaseData:
                 self.log.debug('Sample accepted.')
                 # If sample OK - return new dataset:
                 new_instance = self.nested_class_ref(**self.nested_params)
-                new_instance.filename = name + 'num_{}_at_{}'.format(self.sample_num, adj_timedate)
+                new_instance.filename = name + 'num_{}_at_{}'.format(self._sample_num(sample_num), adj_timedate)
                 self.log.info('New sample id: <{}>.'.format(new_instance.filename))
                 new_instance.data = sampled_data
+                self._attach_store(new_instance, first_row)
+                self._attach_stat(new_instance, first_row)
                 new_instance.metadata['type'] = 'interval_sample'
                 new_instance.metadata['first_row'] = first_row
                 new_instance.metadata['last_row'] = last_row
@@ -1097,13 +1508,14 @@ class BTgymBaseData:
         self.log.error(msg)
         raise RuntimeError(msg)
 
-    def _sample_exact_interval(self, interval, name='interval_sample_', **kwargs):
+    def _sample_exact_interval(self, interval, name='interval_sample_', sample_num=None, **kwargs):
         """
         Samples exactly defined interval.
 
         Args:
             interval:   tuple, list or 1d-array of integers of length 2: [lower_row_number, upper_row_number];
             name:       str, sample filename id
+            sample_num: int, sample number to put in filename, current `sample_num` if not given
 
         Returns:
              BTgymDataset instance.
@@ -1127,14 +1539,33 @@ class BTgymBaseData:
 
         first_row = interval[0]
         last_row = interval[-1]
-        sampled_data = self.data[first_row: last_row]
 
-        sample_first_day = self.data[first_row:first_row + 1].index[0]
+        return self._interval_instance(self.data[first_row: last_row], interval, name, sample_num)
+
+    def _interval_instance(self, sampled_data, interval, name='interval_sample_', sample_num=None):
+        """
+        Wraps data of exactly defined interval as new sample instance.
+
+        Args:
+            sampled_data:   pandas dataframe, instance data rows [lower_row_number, upper_row_number)
+                            or any other data aligned with them, e.g. a view of shared block
+            interval:       [lower_row_number, upper_row_number]
+            name:           str, sample filename id
+            sample_num:     int, sample number to put in filename, current `sample_num` if not given
+
+        Returns:
+             BTgymDataset instance.
+        """
+        first_row = interval[0]
+        last_row = interval[-1]
+        sample_first_day = self.data.index[first_row]
 
         new_instance = self.nested_class_ref(**self.nested_params)
-        new_instance.filename = name + 'num_{}_at_{}'.format(self.sample_num, sample_first_day)
+        new_instance.filename = name + 'num_{}_at_{}'.format(self._sample_num(sample_num), sample_first_day)
         self.log.info('New sample id: <{}>.'.format(new_instance.filename))
         new_instance.data = sampled_data
+        self._attach_store(new_instance, first_row)
+        self._attach_stat(new_instance, first_row)
         new_instance.metadata['type'] = 'interval_sample'
         new_instance.metadata['first_row'] = first_row
         new_instance.metadata['last_row'] = last_row
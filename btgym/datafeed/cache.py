@@ -0,0 +1,145 @@
+###############################################################################
+#
+# Copyright (C) 2017 Andrew Muzikin
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import os
+import json
+import shutil
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Bump this if on-disk layout changes, invalidates all previously cached sources:
+CACHE_VERSION = 1
+
+# Parsing parameters cached source depends on:
+CACHE_KEY_PARAMS = ('sep', 'header', 'index_col', 'parse_dates', 'names', 'timeframe', 'dtype')
+
+
+def source_cache_key(filename, parsing_params):
+    """
+    Computes cache key for single CSV source file.
+
+    Args:
+        filename:           str, path to source file;
+        parsing_params:     dict, CSV parsing parameters.
+
+    Returns:
+        hex digest string, unique for file path, modification time, size and parsing parameters.
+    """
+    stat = os.stat(filename)
+    key = dict(
+        version=CACHE_VERSION,
+        path=os.path.abspath(filename),
+        mtime=stat.st_mtime_ns,
+        size=stat.st_size,
+        params={name: parsing_params.get(name, None) for name in CACHE_KEY_PARAMS},
+    )
+    return hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def load_cached_source(cache_dir, key):
+    """
+    Loads previously cached source as pandas dataframe, memory-mapping stored arrays.
+
+    Args:
+        cache_dir:  str, cache directory;
+        key:        str, source cache key.
+
+    Returns:
+        tuple (dataframe, number of duplicate records removed at parsing time) or None if no valid entry found.
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    meta_file = os.path.join(entry_dir, 'meta.json')
+    if not os.path.isfile(meta_file):
+        return None
+
+    with open(meta_file, 'r') as f:
+        meta = json.load(f)
+
+    index = np.load(os.path.join(entry_dir, 'index.npy'), mmap_mode='c')
+    if meta['index_is_datetime']:
+        index = pd.DatetimeIndex(index.view('datetime64[ns]'), name=meta['index_name'])
+
+    else:
+        index = pd.Index(index, name=meta['index_name'])
+
+    columns = {
+        name: np.load(os.path.join(entry_dir, 'col_{}.npy'.format(i)), mmap_mode='c')
+        for i, name in enumerate(meta['columns'])
+    }
+    frame = pd.DataFrame(columns, index=index, columns=meta['columns'])
+
+    return frame, meta['num_duplicates']
+
+
+def save_cached_source(cache_dir, key, frame, num_duplicates=0, source=None):
+    """
+    Stores parsed source dataframe as set of per-column binary arrays.
+    Entry is written to temporary location first and moved in place when complete.
+
+    Args:
+        cache_dir:          str, cache directory;
+        key:                str, source cache key;
+        frame:              pandas dataframe to store;
+        num_duplicates:     int, number of duplicate records removed at parsing time;
+        source:             str, source filename, for reference only.
+
+    Returns:
+        True if stored, False if dataframe can not be represented as plain numeric arrays.
+    """
+    index = frame.index
+    index_is_datetime = isinstance(index, pd.DatetimeIndex)
+    if index_is_datetime:
+        if index.tz is not None:
+            return False
+        index_values = index.values.view(np.int64)
+
+    else:
+        index_values = np.asarray(index)
+
+    columns = [np.asarray(frame[name]) for name in frame.columns]
+    if index_values.dtype == object or any([column.dtype == object for column in columns]):
+        return False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    entry_dir = os.path.join(cache_dir, key)
+    tmp_dir = entry_dir + '.tmp_{}'.format(os.getpid())
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    np.save(os.path.join(tmp_dir, 'index.npy'), index_values)
+    for i, column in enumerate(columns):
+        np.save(os.path.join(tmp_dir, 'col_{}.npy'.format(i)), column)
+
+    meta = dict(
+        source=source,
+        columns=[str(name) for name in frame.columns],
+        index_name=index.name,
+        index_is_datetime=index_is_datetime,
+        num_duplicates=int(num_duplicates),
+        num_records=int(frame.shape[0]),
+    )
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir)
+
+    return True
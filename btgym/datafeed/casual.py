@@ -436,6 +436,9 @@ class BTgymCasualDataDomain(BTgymRandomDataDomain):
         self.log.debug('sample_num_records: {}'.format(self.sample_num_records))
         self.log.debug('sliding_test_period: {}'.format(self.test_period))
 
+        # Sampling params might have changed, drop precomputed valid start rows:
+        self._start_index = {}
+
         # Train/test timedeltas:
         self.test_range_delta = datetime.timedelta(**self.test_period)
         self.train_range_delta = datetime.timedelta(**self.sample_duration) - datetime.timedelta(**self.test_period)
@@ -490,51 +493,53 @@ class BTgymCasualDataDomain(BTgymRandomDataDomain):
             Trial as `BTgymBaseDataTrial` instance;
             None, if trial's sequence is exhausted (global time is up).
         """
-        self.set_global_timestamp(timestamp)
+        # Trials follow global time, so are sampled in order under lock as whole:
+        with self.sample_lock:
+            self.set_global_timestamp(timestamp)
 
-        if 'interval' not in kwargs.keys():
-            train_interval, test_interval = self.get_intervals()
-        else:
-            train_interval = test_interval = kwargs.pop('interval')
+            if 'interval' not in kwargs.keys():
+                train_interval, test_interval = self.get_intervals()
+            else:
+                train_interval = test_interval = kwargs.pop('interval')
+
+            if get_new or self.sample_instance is None:
+                if sample_type:
+                    self.sample_instance = self._sample_interval(
+                        interval=test_interval,
+                        b_alpha=b_alpha,
+                        b_beta=b_beta,
+                        name='target_trial_',
+                        **kwargs
+                    )
+                    if self.sample_instance is None:
+                        # Exhausted:
+                        return False
 
-        if get_new or self.sample_instance is None:
-            if sample_type:
-                self.sample_instance = self._sample_interval(
-                    interval=test_interval,
-                    b_alpha=b_alpha,
-                    b_beta=b_beta,
-                    name='target_trial_',
-                    **kwargs
+                else:
+                    self.sample_instance = self._sample_interval(
+                        interval=train_interval,
+                        b_alpha=b_alpha,
+                        b_beta=b_beta,
+                        name='source_trial_',
+                        **kwargs
+                    )
+                    if self.sample_instance is None:
+                        # Exhausted:
+                        return False
+
+                self.log.debug(
+                    'sampled new trial <{}> with metadata: {}'.
+                    format(self.sample_instance.filename, self.sample_instance.metadata)
                 )
-                if self.sample_instance is None:
-                    # Exhausted:
-                    return False
 
             else:
-                self.sample_instance = self._sample_interval(
-                    interval=train_interval,
-                    b_alpha=b_alpha,
-                    b_beta=b_beta,
-                    name='source_trial_',
-                    **kwargs
+                self.log.debug(
+                    'reused trial <{}> with metadata: {}'.
+                        format(self.sample_instance.filename, self.sample_instance.metadata)
                 )
-                if self.sample_instance is None:
-                    # Exhausted:
-                    return False
-
-            self.log.debug(
-                'sampled new trial <{}> with metadata: {}'.
-                format(self.sample_instance.filename, self.sample_instance.metadata)
-            )
-
-        else:
-            self.log.debug(
-                'reused trial <{}> with metadata: {}'.
-                    format(self.sample_instance.filename, self.sample_instance.metadata)
-            )
-        self.sample_instance.metadata['type'] = sample_type
-        self.sample_instance.metadata['sample_num'] = self.sample_num
-        self.sample_instance.metadata['parent_sample_num'] = copy.deepcopy(self.metadata['sample_num'])
-        self.sample_instance.metadata['parent_sample_type'] = copy.deepcopy(self.metadata['type'])
+            self.sample_instance.metadata['type'] = sample_type
+            self.sample_instance.metadata['sample_num'] = self.sample_num
+            self.sample_instance.metadata['parent_sample_num'] = copy.deepcopy(self.metadata['sample_num'])
+            self.sample_instance.metadata['parent_sample_type'] = copy.deepcopy(self.metadata['type'])
 
-        return self.sample_instance
+            return self.sample_instance
@@ -179,6 +179,10 @@ class BTgymRandomDataDomain(BTgymBaseData):
                 index_col=0,
                 parse_dates=True,
                 names=['open', 'high', 'low', 'close', 'volume'],
+                cache_dir=None,
+                chunksize=None,
+                num_workers=None,
+                dtype=None,
 
                 # Pandas to BT.feeds params:
                 timeframe=1,  # 1 minute.
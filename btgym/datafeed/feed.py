@@ -0,0 +1,182 @@
+###############################################################################
+#
+# Copyright (C) 2017 Andrew Muzikin
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from backtrader.feed import DataBase
+from backtrader.utils import date2num
+
+NS_PER_DAY = 86400 * 10 ** 9
+
+# Proleptic Gregorian ordinal of 1970-01-01:
+EPOCH_ORDINAL = 719163
+
+
+def date2num_array(index):
+    """
+    Vectorized backtrader `date2num()`: converts datetime index to backtrader date numbers.
+    Results are bit-exact to ones `date2num()` computes row by row.
+
+    Args:
+        index:  pd.DatetimeIndex or datetime64 array.
+
+    Returns:
+        1d float64 array.
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        # Same as date2num() does with aware datetime:
+        index = index.tz_convert('UTC').tz_localize(None)
+
+    ns = index.values.view(np.int64)
+    days = ns // NS_PER_DAY
+    base = (days + EPOCH_ORDINAL).astype(np.float64)
+    if base.shape[0] == 0:
+        return base
+
+    # date2num() sums day ordinal and time-of-day fractions exactly and rounds once;
+    # for all ordinals of same binade that rounding depends on time of day only:
+    binade = 2.0 ** np.floor(np.log2(base[0]))
+    if not ((base >= binade) & (base < 2 * binade)).all():
+        return np.asarray([date2num(dt) for dt in index.to_pydatetime()], dtype=np.float64)
+
+    time_of_day, inverse = np.unique(ns - days * NS_PER_DAY, return_inverse=True)
+    fraction = np.empty(time_of_day.shape[0], dtype=np.float64)
+    for i, ns_of_day in enumerate(time_of_day.tolist()):
+        seconds, ns_of_second = divmod(ns_of_day, 10 ** 9)
+        minutes, second = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+        fraction[i] = math.fsum(
+            (binade, hour / 24.0, minute / 1440.0, second / 86400.0, (ns_of_second // 1000) / 86400000000.0)
+        ) - binade
+
+    return base + fraction[inverse]
+
+
+class BTgymNumpyData(DataBase):
+    """
+    Backtrader data feed reading bars from contiguous numpy arrays.
+
+    Accepts same `dataname` (pandas dataframe) and column parameters as `btfeeds.PandasDirectData`:
+    0 refers to dataframe index, positive values - to columns numbered from one, negative ones mark
+    line as not present. All conversion is done once at feed start: datetimes are converted to
+    backtrader date numbers and every line gets its own float64 array, so loading bar takes
+    few list lookups instead of pandas row iteration and datetime conversion.
+
+    Lines arrays are columns of single read-only array, ordered as `datafields`, so values window of
+    several adjacent lines (e.g. open, high, low, close) is available with no copying, see get_window().
+    """
+
+    params = (
+        ('datetime', 0),
+        ('open', 1),
+        ('high', 2),
+        ('low', 3),
+        ('close', 4),
+        ('volume', 5),
+        ('openinterest', 6),
+    )
+
+    datafields = [
+        'datetime', 'open', 'high', 'low', 'close', 'volume', 'openinterest'
+    ]
+
+    def start(self):
+        super(BTgymNumpyData, self).start()
+
+        frame = self.p.dataname
+        lines = set(self.getlinealiases())
+        datafields = [
+            datafield for datafield in self.datafields
+            # Columns not present are skipped:
+            if datafield in lines and getattr(self.params, datafield) >= 0
+        ]
+        # Column-major, so every line array is contiguous:
+        self.values_array = np.empty([frame.shape[0], len(datafields)], dtype=np.float64, order='F')
+        self.arrays = {}
+        self.column_index = {}
+        for i, datafield in enumerate(datafields):
+            colidx = getattr(self.params, datafield)
+            if colidx == 0:
+                column = frame.index
+
+            else:
+                column = frame.iloc[:, colidx - 1]
+
+            if datafield == 'datetime':
+                self.values_array[:, i] = date2num_array(column)
+
+            else:
+                self.values_array[:, i] = np.asarray(column, dtype=np.float64)
+
+            self.arrays[datafield] = self.values_array[:, i]
+            self.column_index[datafield] = i
+
+        self.values_array.flags.writeable = False
+
+        # Indexing python lists is the fastest way to get single scalars:
+        self._columns = [
+            (getattr(self.lines, datafield), array.tolist()) for datafield, array in self.arrays.items()
+        ]
+        self._num_records = frame.shape[0]
+        self._row = 0
+
+    def _load(self):
+        row = self._row
+        if row >= self._num_records:
+            return False
+
+        for line, values in self._columns:
+            line[0] = values[row]
+
+        self._row = row + 1
+        return True
+
+    def get_window(self, datafields, size):
+        """
+        Returns values of last `size` bars up to and including current one.
+
+        Window is keyed on current bar, i.e. `len(self)`, not on number of bars loaded: with `preload=True`
+        (or when other feeds are ahead after rewind) rows past current bar are already loaded
+        and should never be seen by strategy.
+
+        Args:
+            datafields:     sequence of lines names, should be adjacent in `datafields` order
+            size:           int, number of bars
+
+        Returns:
+            read-only view of shape [size, len(datafields)]; None if lines are not adjacent columns,
+            there is not enough bars yet or feed rows are not aligned with bars (e.g. some rows were filtered out).
+        """
+        try:
+            first = self.column_index[datafields[0]]
+            if [self.column_index[datafield] - first for datafield in datafields] != list(range(len(datafields))):
+                return None
+
+        except KeyError:
+            return None
+
+        end = len(self)
+        if size > end or self.arrays['datetime'][end - 1] != self.lines.datetime[0]:
+            return None
+
+        return self.values_array[end - size: end, first: first + len(datafields)]
@@ -0,0 +1,207 @@
+###############################################################################
+#
+# Copyright (C) 2017 Andrew Muzikin
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import numpy as np
+import pandas as pd
+
+
+def count_lines(filename, block_size=2 ** 20):
+    """
+    Counts text lines in file without parsing it.
+
+    Args:
+        filename:   str, text file;
+        block_size: int, read block size in bytes.
+
+    Returns:
+        number of lines, int
+    """
+    num_lines = 0
+    last_block = b''
+    with open(filename, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            num_lines += block.count(b'\n')
+            last_block = block
+
+    if last_block and not last_block.endswith(b'\n'):
+        num_lines += 1
+
+    return num_lines
+
+
+class ChunkedFrameBuilder:
+    """
+    Assembles single dataframe from stream of parsed chunks using preallocated output buffers,
+    so peak memory stays close to final dataset size plus one chunk.
+
+    - float columns are written to single 2d float block, which final dataframe is zero-copy view of;
+    - integer columns are stored separately, downcasted to smallest integer dtype fitting values seen so far;
+    - duplicate index records are removed on the fly, keeping first occurrence;
+    - every source (file) is expected to be sorted by index; source is sorted at its end if it is not.
+
+    Duplicates and sorting are handled within single source, records of different sources are never mixed.
+    """
+
+    def __init__(self, max_records, float_dtype=np.float64):
+        """
+        Args:
+            max_records:    int, upper bound of total number of records to hold;
+            float_dtype:    float columns block dtype.
+        """
+        self.max_records = max_records
+        self.float_dtype = float_dtype
+        self.num_records = 0
+        self.columns = None
+        self.float_columns = None
+        self.other_columns = None
+        self.float_block = None
+        self.other_buffers = None
+        self.index_buffer = None
+        self.index_name = None
+
+        self.source_start = 0
+        self.source_is_sorted = True
+        self.source_duplicates = 0
+        self.last_key = None
+
+    def _allocate(self, chunk):
+        if chunk.index.dtype == object:
+            raise ValueError('Non-numeric index can not be buffered, got: {}'.format(chunk.index.dtype))
+
+        self.columns = list(chunk.columns)
+        self.float_columns = [name for name in self.columns if chunk[name].dtype.kind == 'f']
+        self.other_columns = [name for name in self.columns if name not in self.float_columns]
+
+        for name in self.other_columns:
+            if chunk[name].dtype.kind not in 'iub':
+                raise ValueError('Column <{}> of dtype {} can not be buffered.'.format(name, chunk[name].dtype))
+
+        self.index_name = chunk.index.name
+        self.index_buffer = np.empty(self.max_records, dtype=chunk.index.values.dtype)
+        self.float_block = np.empty((self.max_records, len(self.float_columns)), dtype=self.float_dtype)
+        self.other_buffers = {
+            name: np.empty(self.max_records, dtype=pd.to_numeric(chunk[name], downcast='integer').dtype)
+            for name in self.other_columns
+        }
+
+    def start_source(self):
+        """
+        Marks beginning of next source.
+        """
+        self.source_start = self.num_records
+        self.source_is_sorted = True
+        self.source_duplicates = 0
+        self.last_key = None
+
+    def append(self, chunk):
+        """
+        Writes parsed chunk to buffers.
+
+        Args:
+            chunk:  pandas dataframe.
+        """
+        if self.columns is None:
+            self._allocate(chunk)
+
+        keep = ~chunk.index.duplicated(keep='first')
+        keys = chunk.index.values
+
+        if self.source_is_sorted and keys.shape[0] > 0:
+            chunk_keys = keys[keep]
+            if (chunk_keys[1:] < chunk_keys[:-1]).any() or \
+                    (self.last_key is not None and chunk_keys[0] < self.last_key):
+                # Resolved at source end:
+                self.source_is_sorted = False
+
+            elif self.last_key is not None:
+                # Duplicates spanning chunks border:
+                keep &= keys != self.last_key
+
+        size = int(keep.sum())
+        self.source_duplicates += keep.shape[0] - size
+        if size == 0:
+            return
+
+        start, end = self.num_records, self.num_records + size
+        if end > self.max_records:
+            raise ValueError('Expected no more than {} records, got more.'.format(self.max_records))
+
+        self.index_buffer[start:end] = keys[keep]
+        for i, name in enumerate(self.float_columns):
+            self.float_block[start:end, i] = chunk[name].values[keep]
+
+        for name in self.other_columns:
+            values = pd.to_numeric(chunk[name].values[keep], downcast='integer')
+            dtype = np.result_type(self.other_buffers[name].dtype, values.dtype)
+            if dtype != self.other_buffers[name].dtype:
+                self.other_buffers[name] = self.other_buffers[name].astype(dtype)
+            self.other_buffers[name][start:end] = values
+
+        self.num_records = end
+        self.last_key = self.index_buffer[end - 1]
+
+    def finish_source(self):
+        """
+        Sorts and de-duplicates current source records if it came unsorted.
+
+        Returns:
+            number of duplicate records removed from this source, int.
+        """
+        if not self.source_is_sorted:
+            start, end = self.source_start, self.num_records
+            order = np.argsort(self.index_buffer[start:end], kind='stable')
+            keys = self.index_buffer[start:end][order]
+            keep = np.ones(keys.shape[0], dtype=bool)
+            keep[1:] = keys[1:] != keys[:-1]
+            order = order[keep]
+            size = order.shape[0]
+
+            self.index_buffer[start:start + size] = keys[keep]
+            self.float_block[start:start + size] = self.float_block[start:end][order]
+            for buffer in self.other_buffers.values():
+                buffer[start:start + size] = buffer[start:end][order]
+
+            self.source_duplicates += end - start - size
+            self.num_records = start + size
+
+        return self.source_duplicates
+
+    def frame(self, start=0, end=None):
+        """
+        Returns dataframe view of buffered records.
+
+        Args:
+            start:  int, first record;
+            end:    int or None, last record (excluded), def: last one buffered.
+
+        Returns:
+            pandas dataframe
+        """
+        if end is None:
+            end = self.num_records
+
+        index = pd.Index(self.index_buffer[start:end], name=self.index_name)
+        frame = pd.DataFrame(self.float_block[start:end], index=index, columns=self.float_columns, copy=False)
+        for name in self.other_columns:
+            frame.insert(self.columns.index(name), name, self.other_buffers[name][start:end])
+
+        return frame
@@ -2,18 +2,46 @@ from logbook import Logger, StreamHandler, WARNING
 
 import datetime
 import random
+import numpy as np
 from numpy.random import beta as random_beta
 import copy
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 import backtrader.feeds as btfeeds
 import pandas as pd
 
 
+def intersect_indexes(timestamps):
+    """
+    Sorted k-way intersection of int64 timestamp arrays.
+
+    Args:
+        timestamps:     list of 1d int64 arrays, each sorted ascending.
+
+    Returns:
+        tuple (sorted array of unique common timestamps, list of common timestamps row numbers for every array).
+    """
+    # Start from shortest one and narrow it down by binary search in the rest:
+    common = np.unique(min(timestamps, key=len))
+    for ts in timestamps:
+        pos = np.searchsorted(ts, common)
+        found = pos < ts.shape[0]
+        found[found] = ts[pos[found]] == common[found]
+        common = common[found]
+
+    return common, [np.searchsorted(ts, common) for ts in timestamps]
+
+
 class BTgymMultiData:
     """
     Multiply data streams wrapper.
+
+    Note:
+        when all streams have same number of columns, aligned data is held as single
+        [num_streams, num_records, num_columns] array of common dtype (see `block` attribute),
+        every stream data being zero-copy view of it.
     """
 
     def __init__(
@@ -73,6 +101,7 @@ class BTgymMultiData:
         self.params = {}
         self.names = []
         self.sample_num = 0
+        self.block = None
 
         # Logging:
         StreamHandler(sys.stdout).push_application()
@@ -146,40 +175,93 @@ class BTgymMultiData:
                 setattr(stream, key, value)
 
     def read_csv(self, data_filename=None, force_reload=False):
+        """
+        Loads all data streams.
+
+        Note:
+            if any stream has `num_workers` param set, source files of all streams get parsed
+            by single shared process pool of that size.
+        """
+        num_workers = max([stream.num_workers or 1 for stream in self.data.values()])
+        if num_workers > 1:
+            streams = [stream for stream in self.data.values() if stream.data is None or force_reload]
+            with ProcessPoolExecutor(max_workers=num_workers) as pool:
+                # Submit everything first, then collect:
+                futures = [(stream, stream._submit_sources(pool, force_reload=force_reload)) for stream in streams]
+                for stream, stream_futures in futures:
+                    stream._merge_sources(stream_futures)
+
+            force_reload = False
+
         # Load:
-        indexes = []
         for stream in self.data.values():
             stream.read_csv(force_reload=force_reload)
-            indexes.append(stream.data.index)
 
-        # Get indexes intersection:
-        if len(indexes) > 1:
-            idx_intersected = indexes[0]
-            for i in range(1, len(indexes)):
-                idx_intersected = idx_intersected.intersection(indexes[i])
+        self._align()
 
-            # Truncate data to common index:
-            for stream in self.data.values():
-                stream.data = stream.data.loc[idx_intersected]
+    def _align(self):
+        """
+        Truncates all streams to common timestamps and stores them as single aligned block.
+        Does nothing if streams are already aligned.
+        """
+        if len(self.data) < 2:
+            return
+
+        streams = list(self.data.values())
+        timestamps = [np.asarray(stream.data.index.values).view(np.int64) for stream in streams]
+        num_columns = set([stream.data.shape[-1] for stream in streams])
+
+        is_aligned = all([ts.shape == timestamps[0].shape and np.array_equal(ts, timestamps[0]) for ts in timestamps])
+        if is_aligned and (self.block is not None or len(num_columns) > 1):
+            return
+
+        if is_aligned:
+            rows = [slice(None)] * len(streams)
+            common_index = streams[0].data.index
+
+        else:
+            rows = []
+            sorted_timestamps = []
+            for ts in timestamps:
+                if (ts[1:] < ts[:-1]).any():
+                    order = np.argsort(ts, kind='stable')
+                    rows.append(order)
+                    sorted_timestamps.append(ts[order])
+
+                else:
+                    rows.append(None)
+                    sorted_timestamps.append(ts)
+
+            common, common_rows = intersect_indexes(sorted_timestamps)
+            rows = [r if order is None else order[r] for r, order in zip(common_rows, rows)]
+            common_index = pd.Index(common.view(streams[0].data.index.dtype), name=streams[0].data.index.name)
+
+        if len(num_columns) == 1:
+            self.block = np.empty(
+                (len(streams), common_index.shape[0], num_columns.pop()),
+                dtype=np.result_type(*[stream.data.values.dtype for stream in streams])
+            )
+            for i, stream in enumerate(streams):
+                self.block[i] = stream.data.values[rows[i]]
+                stream._set_data(
+                    pd.DataFrame(self.block[i], index=common_index, columns=stream.data.columns, copy=False)
+                )
+
+        else:
+            self.block = None
+            for i, stream in enumerate(streams):
+                stream._set_data(stream.data.iloc[rows[i]])
 
     def reset(self, **kwargs):
-        indexes = []
+        # Load and align first so every stream gets reset on aligned data:
+        self.read_csv()
+
         for stream in self.data.values():
             stream.reset(**kwargs)
-            indexes.append(stream.data.index)
-
-        # Get indexes intersection:
-        if len(indexes) > 1:
-            idx_intersected = indexes[0]
-            for i in range(1, len(indexes)):
-                idx_intersected = idx_intersected.intersection(indexes[i])
 
-            idx_intersected.drop_duplicates()
-            self.log.info('shared num. records: {}'.format(len(idx_intersected)))
-
-            # Truncate data to common index:
-            for stream in self.data.values():
-                stream.data = stream.data.loc[idx_intersected]
+        if len(self.data) > 1:
+            self._align()
+            self.log.info('shared num. records: {}'.format(list(self.data.values())[0].data.shape[0]))
 
             # Choose master_data
             if self.master_data is None:
@@ -193,14 +275,39 @@ class BTgymMultiData:
         self.sample_num = 0
         self.is_ready = True
 
+    def __getstate__(self):
+        # Stream data is pickled by streams; block is rebuilt at reset:
+        state = self.__dict__.copy()
+        state['block'] = None
+        return state
+
     def set_global_timestamp(self, timestamp):
         for stream in self.data.values():
             stream.set_global_timestamp(timestamp)
 
         self.global_timestamp = self.master_data.global_timestamp
 
-    def describe(self):
-        return {key: stream.describe() for key, stream in self.data.items()}
+    def describe(self, percentiles=True):
+        return {key: stream.describe(percentiles=percentiles) for key, stream in self.data.items()}
+
+    def share_data(self, store_dir=None, force=False):
+        """
+        Moves every data stream to shared memory-mapped store, see BTgymBaseData.share_data().
+
+        Returns:
+            dict of BTgymDataStore instances.
+        """
+        return {key: stream.share_data(store_dir=store_dir, force=force) for key, stream in self.data.items()}
+
+    def release_data_store(self):
+        for stream in self.data.values():
+            stream.release_data_store()
+
+    def get_descriptor(self):
+        """
+        Multi-stream samples are not described by descriptors, sent as is.
+        """
+        return None
 
     def sample(self, **kwargs):
 
@@ -221,9 +328,25 @@ class BTgymMultiData:
         interval = [master_sample.metadata['first_row'], master_sample.metadata['last_row']]
 
         # Populate sample with data:
-        for key, stream in self.data.items():
-            self.log.debug('Sampling <{}> with interval: {}, kwargs: {}'.format(key, interval, kwargs))
-            sample.data[key] = stream.sample(interval=interval, force_interval=True, **kwargs)
+        if self.block is not None:
+            # Single slice of aligned block, every stream sample data is a view of it:
+            sample.block = self.block[:, interval[0]: interval[-1]]
+            index = self.master_data.data.index[interval[0]: interval[-1]]
+            prefix = 'test_' if kwargs.get('sample_type', 0) else 'train_'
+
+            for i, (key, stream) in enumerate(self.data.items()):
+                sample.data[key] = stream._interval_instance(
+                    pd.DataFrame(sample.block[i], index=index, columns=stream.data.columns, copy=False),
+                    interval,
+                    name=prefix + stream.sample_name,
+                    sample_num=sample.metadata['sample_num'],
+                )
+                sample.data[key].metadata.update(sample.metadata)
+
+        else:
+            for key, stream in self.data.items():
+                self.log.debug('Sampling <{}> with interval: {}, kwargs: {}'.format(key, interval, kwargs))
+                sample.data[key] = stream.sample(interval=interval, force_interval=True, **kwargs)
 
         sample.filename = {key: stream.filename for key, stream in self.data.items()}
         self.sample_num += 1
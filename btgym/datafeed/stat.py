@@ -0,0 +1,255 @@
+###############################################################################
+#
+# Copyright (C) 2017 Andrew Muzikin
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+class BTgymIntervalStat:
+    """
+    Summary statistic of any rows interval of numeric dataframe, same as `DataFrame.describe()` returns.
+
+    Accumulators are built by single pass over data, block by block, and hold no copy of data itself:
+
+    - per-block prefix sums of values and squared values (shifted by first row for numerical stability),
+      and of valid values count if data has any NaNs, make records count, mean and std of any interval
+      O(block_size) at most;
+    - per-block min/max values, with sparse table over spans of `table_span` blocks, make min/max of any interval
+      O(block_size + table_span) at most;
+    - rows of interval ends not covering whole blocks are taken from interval data given by caller,
+      percentiles are computed on request only, by linear-time selection over interval data.
+
+    Memory held is about `5 / block_size` of float64 data size.
+
+    Note:
+        mean and std come from differences of running sums, so for short intervals of long data these can
+        differ from ones pandas computes starting from about 9th significant digit.
+    """
+
+    percentiles_index = ['25%', '50%', '75%']
+
+    def __init__(self, frame, block_size=256, table_span=16, chunk_size=2 ** 16):
+        """
+        Args:
+            frame:      pandas dataframe;
+            block_size: int, accumulators block size;
+            table_span: int, number of blocks min/max sparse table is built over;
+            chunk_size: int, number of rows processed at once when building accumulators.
+        """
+        # Note: select_dtypes() would copy data:
+        self.columns = frame.columns[[np.issubdtype(dtype, np.number) for dtype in frame.dtypes]]
+        self.num_records = frame.shape[0]
+        self.block_size = block_size
+        self.table_span = table_span
+
+        num_blocks = -(-self.num_records // block_size)
+        chunk_size = max(chunk_size // block_size, 1) * block_size
+        shape = (num_blocks, len(self.columns))
+        block_count = np.zeros(shape, dtype=np.int64)
+        block_sum = np.zeros(shape)
+        block_sum_sq = np.zeros(shape)
+        block_min = np.empty(shape)
+        block_max = np.empty(shape)
+        self.shift = np.zeros(len(self.columns))
+
+        for j, column in enumerate(self.columns):
+            values = frame[column].values
+            if self.num_records > 0:
+                self.shift[j] = np.nan_to_num(float(values[0]))
+
+            for start in range(0, self.num_records, chunk_size):
+                # Padded to whole number of blocks:
+                chunk = np.full(min(chunk_size, num_blocks * block_size - start), np.nan)
+                chunk[:min(chunk_size, self.num_records - start)] = values[start: start + chunk_size]
+                chunk = chunk.reshape(-1, block_size)
+                blocks = slice(start // block_size, start // block_size + chunk.shape[0])
+
+                is_valid = ~np.isnan(chunk)
+                shifted = np.where(is_valid, chunk - self.shift[j], 0.0)
+                block_count[blocks, j] = is_valid.sum(axis=-1)
+                block_sum[blocks, j] = shifted.sum(axis=-1)
+                block_sum_sq[blocks, j] = (shifted ** 2).sum(axis=-1)
+                block_min[blocks, j] = np.where(is_valid, chunk, np.inf).min(axis=-1)
+                block_max[blocks, j] = np.where(is_valid, chunk, -np.inf).max(axis=-1)
+
+        # Number of valid values is only kept if data has NaNs:
+        if block_count.sum() == self.num_records * len(self.columns):
+            self.count = None
+
+        else:
+            self.count = self._prefix_sum(block_count)
+
+        self.sum = self._prefix_sum(block_sum)
+        self.sum_sq = self._prefix_sum(block_sum_sq)
+        self.block_min = block_min
+        self.block_max = block_max
+        num_spans = num_blocks // table_span
+        self.min_table = self._sparse_table(
+            block_min[:num_spans * table_span].reshape(num_spans, table_span, shape[-1]).min(axis=1), np.minimum
+        )
+        self.max_table = self._sparse_table(
+            block_max[:num_spans * table_span].reshape(num_spans, table_span, shape[-1]).max(axis=1), np.maximum
+        )
+
+    @staticmethod
+    def _prefix_sum(values):
+        prefix = np.zeros((values.shape[0] + 1, values.shape[-1]), dtype=values.dtype)
+        np.cumsum(values, axis=0, out=prefix[1:])
+        return prefix
+
+    @staticmethod
+    def _sparse_table(values, fn):
+        """
+        Returns:
+            list of arrays: k-th one holds reduction of every 2**k consecutive blocks.
+        """
+        table = [values]
+        span = 1
+        while 2 * span <= values.shape[0]:
+            previous = table[-1]
+            table.append(fn(previous[:-span], previous[span:]))
+            span *= 2
+        return table
+
+    def _query_table(self, table, fn, first_span, last_span):
+        level = int(np.log2(last_span - first_span))
+        return fn(table[level][first_span], table[level][last_span - 2 ** level])
+
+    def _min_max(self, first_block, last_block):
+        """
+        Returns:
+            min and max values of whole blocks [first_block, last_block), inf if there is no valid values.
+        """
+        first_span = -(-first_block // self.table_span)
+        last_span = last_block // self.table_span
+        if last_span > first_span:
+            # Whole spans from tables, leftover blocks directly:
+            min_value = self._query_table(self.min_table, np.minimum, first_span, last_span)
+            max_value = self._query_table(self.max_table, np.maximum, first_span, last_span)
+            parts = [
+                slice(first_block, first_span * self.table_span),
+                slice(last_span * self.table_span, last_block),
+            ]
+
+        else:
+            min_value = np.full(len(self.columns), np.inf)
+            max_value = np.full(len(self.columns), -np.inf)
+            parts = [slice(first_block, last_block)]
+
+        for part in parts:
+            if part.stop > part.start:
+                min_value = np.minimum(min_value, self.block_min[part].min(axis=0))
+                max_value = np.maximum(max_value, self.block_max[part].max(axis=0))
+
+        return min_value, max_value
+
+    def percentiles(self, frame, q=(25, 50, 75)):
+        """
+        Args:
+            frame:  pandas dataframe, interval data.
+
+        Returns:
+            [len(q), num_columns] array of interval percentiles, linearly interpolated.
+        """
+        result = np.empty((len(q), len(self.columns)))
+        for j, column in enumerate(self.columns):
+            values = np.asarray(frame[column].values, dtype=np.float64)
+            if values.shape[0] > 0 and not np.isnan(values).any():
+                result[:, j] = np.percentile(values, q)
+
+            else:
+                with warnings.catch_warnings():
+                    # All-nan interval:
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    result[:, j] = np.nanpercentile(values, q)
+
+        return result
+
+    def describe(self, frame, first_row=0, percentiles=True):
+        """
+        Returns summary statistic of rows interval as pandas dataframe.
+
+        Args:
+            frame:          pandas dataframe, interval data: rows [first_row, first_row + len(frame)) of data
+                            accumulators were built on, or same values held by any other dataframe;
+            first_row:      int, interval first row;
+            percentiles:    bool, compute percentiles; if False - those are left NaN.
+
+        Returns:
+            pandas dataframe, same as `DataFrame.describe()` of that interval.
+        """
+        last_row = first_row + frame.shape[0]
+        first_block = -(-first_row // self.block_size)
+        last_block = last_row // self.block_size
+        num_columns = len(self.columns)
+
+        if last_block > first_block:
+            # Whole blocks from accumulators:
+            if self.count is None:
+                count = np.full(num_columns, (last_block - first_block) * self.block_size, dtype=np.float64)
+
+            else:
+                count = (self.count[last_block] - self.count[first_block]).astype(np.float64)
+
+            shifted_sum = self.sum[last_block] - self.sum[first_block]
+            shifted_sum_sq = self.sum_sq[last_block] - self.sum_sq[first_block]
+            min_value, max_value = self._min_max(first_block, last_block)
+            head = first_block * self.block_size - first_row
+            tail = last_block * self.block_size - first_row
+
+        else:
+            count, shifted_sum, shifted_sum_sq = np.zeros(num_columns), np.zeros(num_columns), np.zeros(num_columns)
+            min_value, max_value = np.full(num_columns, np.inf), np.full(num_columns, -np.inf)
+            head = tail = frame.shape[0]
+
+        # Leftovers directly from interval data:
+        for j, column in enumerate(self.columns):
+            values = frame[column].values
+            edges = np.concatenate([values[:head], values[tail:]]).astype(np.float64)
+            edges = edges[~np.isnan(edges)]
+            if edges.shape[0] > 0:
+                shifted = edges - self.shift[j]
+                count[j] += edges.shape[0]
+                shifted_sum[j] += shifted.sum()
+                shifted_sum_sq[j] += (shifted ** 2).sum()
+                min_value[j] = min(min_value[j], edges.min())
+                max_value[j] = max(max_value[j], edges.max())
+
+        # All-nan columns:
+        min_value[np.isinf(min_value)] = np.nan
+        max_value[np.isinf(max_value)] = np.nan
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.shift + shifted_sum / count
+            var = np.maximum(shifted_sum_sq - shifted_sum ** 2 / count, 0.0) / (count - 1)
+            std = np.where(count > 1, np.sqrt(var), np.nan)
+
+        if percentiles:
+            percentile_values = self.percentiles(frame)
+
+        else:
+            percentile_values = np.full((len(self.percentiles_index), num_columns), np.nan)
+
+        return pd.DataFrame(
+            np.vstack([count, mean, std, min_value, percentile_values, max_value]),
+            index=['count', 'mean', 'std', 'min'] + self.percentiles_index + ['max'],
+            columns=self.columns,
+        )
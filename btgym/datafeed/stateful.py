@@ -158,19 +158,21 @@ class BTgymSequentialDataDomain(BTgymRandomDataDomain):
             Trial as `BTgymBaseDataTrial` instance;
             None, if trial's sequence is exhausted.
         """
-        self.sample_instance = self._sample_sequential()
-        if self.sample_instance is None:
-            # Exhausted:
-            return False
+        # Trials are iterated in order, so are sampled under lock as whole:
+        with self.sample_lock:
+            self.sample_instance = self._sample_sequential()
+            if self.sample_instance is None:
+                # Exhausted:
+                return False
 
-        else:
-            self.sample_instance.metadata['type'] = 0  # 0 - always train
-            self.sample_instance.metadata['sample_num'] = self.sample_num
-            self.log.debug(
-                'got new trial <{}> with metadata: {}'.
-                format(self.sample_instance.filename, self.sample_instance.metadata)
-            )
-            return self.sample_instance
+            else:
+                self.sample_instance.metadata['type'] = 0  # 0 - always train
+                self.sample_instance.metadata['sample_num'] = self.sample_num
+                self.log.debug(
+                    'got new trial <{}> with metadata: {}'.
+                    format(self.sample_instance.filename, self.sample_instance.metadata)
+                )
+                return self.sample_instance
 
     def _get_interval(self, sample_num):
         """
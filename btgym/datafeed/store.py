@@ -0,0 +1,165 @@
+###############################################################################
+#
+# Copyright (C) 2017 Andrew Muzikin
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+def _default_store_root():
+    """
+    Returns:
+        RAM-backed directory if host provides one, system temp. directory otherwise.
+    """
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+
+    return tempfile.gettempdir()
+
+
+class BTgymDataStore:
+    """
+    Memory-mapped read-only storage of single data stream, shared by all processes on host.
+
+    Data is held as two binary files: int64 index [n] and values block [n, num_columns] of common dtype.
+    Instance pickles as few bytes of metadata; arrays get mapped lazily by every process accessing them,
+    so dataframes returned by `frame()` are zero-copy views into host page cache.
+
+    Note:
+        all columns are stored casted to common dtype, e.g. integer `volume` column is stored as float64
+        if other columns are float64.
+    """
+
+    def __init__(self, path, columns, num_records, index_name=None, index_is_datetime=True):
+        """
+        Args:
+            path:               str, store directory;
+            columns:            list of column names;
+            num_records:        int, number of rows stored;
+            index_name:         str or None, dataframe index name;
+            index_is_datetime:  bool, restore index as pd.DatetimeIndex if True.
+
+        Note:
+            do not use directly, use `from_frame()` to create store.
+        """
+        self.path = path
+        self.columns = list(columns)
+        self.num_records = num_records
+        self.index_name = index_name
+        self.index_is_datetime = index_is_datetime
+        self._index = None
+        self._values = None
+
+    @classmethod
+    def from_frame(cls, frame, store_dir=None):
+        """
+        Writes dataframe to new store.
+
+        Args:
+            frame:      pandas dataframe with numeric columns;
+            store_dir:  str, directory to create store in, def: RAM-backed directory if available.
+
+        Returns:
+            BTgymDataStore instance.
+        """
+        if store_dir is None:
+            store_dir = _default_store_root()
+
+        path = tempfile.mkdtemp(prefix='btgym_store_', dir=store_dir)
+
+        index = frame.index
+        index_is_datetime = isinstance(index, pd.DatetimeIndex)
+        if index_is_datetime:
+            index_values = index.values.view(np.int64)
+
+        else:
+            index_values = np.asarray(index, dtype=np.int64)
+
+        values = np.asarray(frame.values)
+        assert values.dtype != object, 'Expected numeric dataframe, got columns dtypes: {}'.format(frame.dtypes)
+
+        np.save(os.path.join(path, 'index.npy'), index_values)
+        np.save(os.path.join(path, 'values.npy'), values)
+
+        return cls(
+            path=path,
+            columns=frame.columns,
+            num_records=frame.shape[0],
+            index_name=index.name,
+            index_is_datetime=index_is_datetime,
+        )
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_index'] = None
+        state['_values'] = None
+        return state
+
+    def _map(self):
+        if self._values is None:
+            self._index = np.load(os.path.join(self.path, 'index.npy'), mmap_mode='r')
+            self._values = np.load(os.path.join(self.path, 'values.npy'), mmap_mode='c')
+
+    @property
+    def index(self):
+        """
+        Memory-mapped int64 index array.
+        """
+        self._map()
+        return self._index
+
+    @property
+    def values(self):
+        """
+        Memory-mapped [num_records, num_columns] values array.
+        """
+        self._map()
+        return self._values
+
+    def frame(self, first_row=0, last_row=None):
+        """
+        Returns pandas dataframe view for given rows interval.
+
+        Args:
+            first_row:  int, first row;
+            last_row:   int or None, last row (excluded).
+
+        Returns:
+            pandas dataframe
+        """
+        self._map()
+        index = self._index[first_row:last_row]
+        if self.index_is_datetime:
+            index = pd.DatetimeIndex(index.view('datetime64[ns]'), name=self.index_name)
+
+        else:
+            index = pd.Index(index, name=self.index_name)
+
+        return pd.DataFrame(self._values[first_row:last_row], index=index, columns=self.columns, copy=False)
+
+    def close(self):
+        """
+        Deletes store files. Mapped arrays stay valid in processes holding them.
+        """
+        self._index = None
+        self._values = None
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pandas.testing import assert_frame_equal
+
+from .derivative import BTgymDataset
+
+
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../examples/data')
+
+filename = [
+    os.path.join(data_dir, 'DAT_ASCII_EURUSD_M1_201701.csv'),
+    os.path.join(data_dir, 'DAT_ASCII_EURUSD_M1_201702.csv'),
+]
+
+parsing_params = dict(
+    sep=';',
+    header=0,
+    index_col=0,
+    parse_dates=True,
+    names=['open', 'high', 'low', 'close', 'volume'],
+    timeframe=1,
+    datetime=0,
+    open=1,
+    high=2,
+    low=3,
+    close=4,
+    volume=-1,
+    openinterest=-1,
+)
+
+
+class SourceCacheTest(unittest.TestCase):
+    """Testing binary cache of parsed source files"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.params = dict(parsing_params, cache_dir=self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_cached_data_equals_parsed(self):
+        reference = BTgymDataset(filename=filename)
+        reference.read_csv()
+
+        for force_reload in [False, False, True]:
+            with self.subTest(force_reload=force_reload):
+                dataset = BTgymDataset(filename=filename, parsing_params=dict(self.params))
+                dataset.read_csv(force_reload=force_reload)
+                assert_frame_equal(dataset.data, reference.data)
+
+        self.assertEqual(len(os.listdir(self.cache_dir)), len(filename))
+
+    def test_parsing_params_change_invalidates_cache(self):
+        dataset = BTgymDataset(filename=filename[0], parsing_params=dict(self.params))
+        dataset.read_csv()
+        dataset = BTgymDataset(filename=filename[0], parsing_params=dict(self.params, header=None))
+        dataset.read_csv()
+
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+
+class ChunkedIngestionTest(unittest.TestCase):
+    """Testing streaming and parallel parsing of source files"""
+
+    def test_chunked_data_equals_parsed(self):
+        reference = BTgymDataset(filename=filename)
+        reference.read_csv()
+
+        dataset = BTgymDataset(filename=filename, parsing_params=dict(parsing_params, chunksize=1000))
+        dataset.read_csv()
+
+        assert_frame_equal(dataset.data, reference.data, check_dtype=False)
+
+    def test_parallel_data_equals_parsed(self):
+        # Sources are merged in listed order by both sequential and parallel loading:
+        for sources in [filename, filename[::-1]]:
+            reference = BTgymDataset(filename=sources)
+            reference.read_csv()
+
+            dataset = BTgymDataset(filename=sources, parsing_params=dict(parsing_params, num_workers=2))
+            dataset.read_csv()
+
+            assert_frame_equal(dataset.data, reference.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
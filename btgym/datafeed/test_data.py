@@ -1,7 +1,18 @@
 
+import os
+import pickle
+import shutil
+import tempfile
 import unittest
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from .base import BTgymBaseData
 from .derivative import BTgymDataset, BTgymRandomDataDomain
 from .stateful import BTgymSequentialDataDomain
+from .multi import BTgymMultiData
+from .feed import date2num_array
+from .stat import BTgymIntervalStat
 
 
 filename='../examples/data/DAT_ASCII_EURUSD_M1_2016.csv'
@@ -190,6 +201,320 @@ class DomainTest(unittest.TestCase):
                                 self.assertLess(last_trial_sup, e_test_inf_time)
 
 
+class StartIndexTest(unittest.TestCase):
+    """Testing precomputed valid sample start rows"""
+
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../examples/data')
+    filename = [
+        os.path.join(data_dir, 'DAT_ASCII_EURUSD_M1_201701.csv'),
+        os.path.join(data_dir, 'DAT_ASCII_EURUSD_M1_201702.csv'),
+    ]
+
+    def test_start_index_matches_row_by_row_checks(self):
+        for start_00 in [False, True]:
+            domain = BTgymDataset(
+                filename=self.filename,
+                episode_duration={'days': 0, 'hours': 23, 'minutes': 55},
+                start_00=start_00,
+                start_weekdays=[0, 1, 2, 3],
+                time_gap={'days': 0, 'hours': 5},
+                log_level=log_level,
+            )
+            domain.reset()
+            num_records = domain.sample_num_records
+            start_rows, valid_rows, _ = domain._get_start_index(num_records)
+            valid = np.zeros(start_rows.shape, dtype=bool)
+            valid[valid_rows] = True
+
+            for row in range(0, domain.data.shape[0], 97):
+                with self.subTest(start_00=start_00, row=row):
+                    first_day = domain.data.index[row]
+                    first_row = row
+                    if start_00:
+                        first_row = domain.data.index.get_indexer([first_day.normalize()], method='nearest')[0]
+
+                    self.assertEqual(first_row, start_rows[row])
+
+                    sample = domain.data[first_row: first_row + num_records]
+                    sample_len = (sample.index[-1] - sample.index[0]).to_pytimedelta()
+                    is_valid = first_day.weekday() in domain.start_weekdays and \
+                        domain.max_sample_len_delta - sample_len < domain.max_time_gap
+
+                    self.assertEqual(is_valid, valid[row])
+
+    def test_sampled_episodes_are_valid(self):
+        domain = BTgymDataset(
+            filename=self.filename,
+            episode_duration={'days': 0, 'hours': 23, 'minutes': 55},
+            start_weekdays=[0, 1, 2, 3],
+            time_gap={'days': 0, 'hours': 5},
+            log_level=log_level,
+        )
+        domain.reset()
+        trial = domain.sample()
+        trial.reset()
+        for i in range(100):
+            episode = trial.sample(b_alpha=2, b_beta=0.5)
+            sample_len = (episode.data.index[-1] - episode.data.index[0]).to_pytimedelta()
+
+            self.assertIn(episode.data.index[0].weekday(), domain.start_weekdays)
+            self.assertLess(domain.max_sample_len_delta - sample_len, domain.max_time_gap)
+
+
+class MultiDataAlignTest(unittest.TestCase):
+    """Testing multi-stream data alignment"""
+
+    data_dir = StartIndexTest.data_dir
+
+    def test_aligned_streams_match_index_intersection(self):
+        source = os.path.join(self.data_dir, 'DAT_ASCII_EURUSD_M1_20170{}.csv')
+        data_config = {
+            'a': {'filename': [source.format(1), source.format(2)]},
+            'b': {'filename': [source.format(2), source.format(3)]},
+        }
+        reference = {}
+        for key, config in data_config.items():
+            reference[key] = BTgymDataset(filename=config['filename'], log_level=log_level)
+            reference[key].read_csv()
+
+        common_index = reference['a'].data.index.intersection(reference['b'].data.index)
+
+        data = BTgymMultiData(
+            data_class_ref=BTgymDataset,
+            data_config=data_config,
+            episode_duration={'days': 0, 'hours': 23, 'minutes': 55},
+            time_gap={'days': 0, 'hours': 5},
+            log_level=log_level,
+        )
+        data.reset()
+        self.assertEqual(data.block.shape, (2, common_index.shape[0], 5))
+
+        for i, key in enumerate(['a', 'b']):
+            self.assertTrue((data.data[key].data.index == common_index).all())
+            self.assertTrue(np.array_equal(data.block[i], reference[key].data.loc[common_index].values))
+            self.assertTrue(np.shares_memory(data.data[key].data.values, data.block))
+
+        for _ in range(3):
+            sample = data.sample()
+            first_row, last_row = sample.metadata['first_row'], sample.metadata['last_row']
+            self.assertTrue(np.shares_memory(sample.block, data.block))
+
+            for i, key in enumerate(['a', 'b']):
+                episode = sample.data[key]
+                self.assertEqual(episode.metadata['sample_num'], sample.metadata['sample_num'])
+                self.assertTrue((episode.data.index == common_index[first_row: last_row]).all())
+                self.assertTrue(np.array_equal(episode.data.values, sample.block[i]))
+                self.assertTrue(np.shares_memory(episode.data.values, sample.block[i]))
+
+
+class IntervalStatTest(unittest.TestCase):
+    """Testing cached and interval dataset statistic"""
+
+    def test_sample_stat_equals_pandas_describe(self):
+        domain = BTgymRandomDataDomain(
+            filename=StartIndexTest.filename,
+            trial_params=dict(
+                sample_duration={'days': 10, 'hours': 0, 'minutes': 0},
+                time_gap={'days': 5, 'hours': 0},
+                test_period={'days': 2, 'hours': 0, 'minutes': 0},
+            ),
+            episode_params=dict(
+                sample_duration={'days': 0, 'hours': 23, 'minutes': 55},
+                time_gap={'days': 0, 'hours': 10},
+            ),
+            log_level=log_level,
+        )
+        domain.reset()
+        self.assertIs(domain.describe(), domain.describe())
+
+        for i in range(5):
+            trial = domain.sample()
+            trial.reset()
+            for sample in [trial, trial.sample()]:
+                self.assertIs(sample.stat, domain.stat)
+                np.testing.assert_allclose(sample.describe().values, sample.data.describe().values, rtol=1e-7)
+
+        # Percentiles are computed on request:
+        episode = trial.sample()
+        stat = episode.describe(percentiles=False)
+        self.assertTrue(stat.loc[['25%', '50%', '75%']].isnull().values.all())
+        self.assertIs(episode.describe(percentiles=False), stat)
+        np.testing.assert_allclose(episode.describe().values, episode.data.describe().values, rtol=1e-7)
+
+    def test_interval_stat_with_nans(self):
+        rng = np.random.RandomState(0)
+        frame = pd.DataFrame(rng.randn(5000, 3).astype(np.float32) + 1.1, columns=['a', 'b', 'c'])
+        frame.iloc[rng.randint(0, 5000, 300), 1] = np.nan
+        frame.iloc[1000:1700, 2] = np.nan
+        frame['d'] = np.arange(5000)
+
+        stat = BTgymIntervalStat(frame, block_size=64, chunk_size=1000)
+        self.assertFalse(hasattr(stat, 'values'))
+        self.assertLess(stat.sum.nbytes + stat.sum_sq.nbytes + stat.count.nbytes, frame.memory_usage().sum() / 10)
+        self.assertIsNone(BTgymIntervalStat(frame[['a', 'd']], block_size=64).count)
+
+        intervals = [[0, 5000], [0, 1], [3, 100], [1100, 1600], [900, 1800]] + \
+            [sorted(rng.randint(0, 5001, 2)) for _ in range(50)]
+        for first_row, last_row in intervals:
+            interval = frame[first_row: last_row]
+            np.testing.assert_allclose(
+                stat.describe(interval, first_row).values,
+                interval.describe().values,
+                rtol=1e-6,
+                err_msg='interval: {}'.format([first_row, last_row]),
+            )
+
+    def test_interval_stat_shorter_than_table_span(self):
+        frame = pd.DataFrame(np.random.RandomState(0).randn(100, 2), columns=['a', 'b'])
+        stat = BTgymIntervalStat(frame, block_size=64)
+        np.testing.assert_allclose(stat.describe(frame).values, frame.describe().values)
+        np.testing.assert_allclose(stat.describe(frame[10:90], 10).values, frame[10:90].describe().values)
+
+
+class SharedStoreTest(unittest.TestCase):
+    """Testing data shared via memory-mapped store"""
+
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+
+    def test_descriptor_round_trip(self):
+        domain = BTgymRandomDataDomain(
+            filename=StartIndexTest.filename,
+            trial_params=dict(
+                sample_duration={'days': 10, 'hours': 0, 'minutes': 0},
+                time_gap={'days': 5, 'hours': 0},
+                test_period={'days': 2, 'hours': 0, 'minutes': 0},
+            ),
+            episode_params=dict(
+                sample_duration={'days': 0, 'hours': 23, 'minutes': 55},
+                time_gap={'days': 0, 'hours': 10},
+            ),
+            log_level=log_level,
+        )
+        domain.reset()
+        reference = domain.data.copy()
+        store = domain.share_data(store_dir=self.store_dir)
+        assert_frame_equal(domain.data, reference, check_dtype=False)
+
+        for i in range(3):
+            trial = domain.sample()
+            descriptor = pickle.loads(pickle.dumps(trial.get_descriptor()))
+            restored = BTgymBaseData.from_descriptor(descriptor, domain.get_sample_config())
+            pickled = pickle.loads(pickle.dumps(trial))
+
+            self.assertEqual(restored.filename, trial.filename)
+            self.assertEqual(restored.metadata, trial.metadata)
+            assert_frame_equal(restored.data, pickled.data)
+            first_row, last_row = descriptor['interval']
+            assert_frame_equal(restored.data, reference[first_row: last_row], check_dtype=False)
+
+            # Episodes of restored trial are views of same store:
+            restored.reset()
+            episode = restored.sample()
+            self.assertIs(episode.data_store, restored.data_store)
+            first_row, last_row = episode.store_interval
+            assert_frame_equal(episode.data, reference[first_row: last_row], check_dtype=False)
+
+        # Store is deleted when data gets reloaded:
+        self.assertTrue(os.path.isdir(store.path))
+        domain.read_csv(force_reload=True)
+        self.assertIsNone(domain.data_store)
+        self.assertFalse(os.path.exists(store.path))
+        assert_frame_equal(domain.data, reference)
+
+
+class CompactStorageTest(unittest.TestCase):
+    """Testing float32 data storage"""
+
+    def test_episode_pnl_unchanged(self):
+        import backtrader as bt
+
+        class FlipPosition(bt.Strategy):
+            def next(self):
+                if len(self) % 50 == 0:
+                    self.order_target_size(target=10000 if (len(self) // 50) % 2 else -10000)
+
+        episodes = []
+        for dtype in [None, 'float32']:
+            domain = BTgymDataset(
+                filename=StartIndexTest.filename,
+                parsing_params=dict(BTgymDataset(filename=None).parsing_params, dtype=dtype),
+                log_level=log_level,
+            )
+            domain.reset()
+            episodes.append(domain._sample_exact_interval([1000, 2435]))
+
+        self.assertEqual(episodes[-1].data.values.dtype, np.float32)
+        self.assertLess(episodes[-1].data.memory_usage().sum(), 0.6 * episodes[0].data.memory_usage().sum())
+
+        values = []
+        for episode in episodes:
+            cerebro = bt.Cerebro(stdstats=False)
+            cerebro.broker.setcash(100.0)
+            cerebro.adddata(list(episode.to_btfeed().values())[0])
+            cerebro.addstrategy(FlipPosition)
+            cerebro.run(preload=False)
+            values.append(cerebro.broker.getvalue())
+
+        self.assertNotEqual(values[0], 100.0)
+        self.assertAlmostEqual(values[0], values[1], delta=1e-3)
+
+
+class NumpyFeedTest(unittest.TestCase):
+    """Testing numpy-backed backtrader feed"""
+
+    def test_date2num_array_is_bit_exact(self):
+        from backtrader.utils import date2num
+
+        index = pd.date_range('2016-12-30 23:58:00', periods=5000, freq='1min')
+        index = index.append(pd.DatetimeIndex(['2017-01-01 00:00:00.000001', '2017-06-01 12:34:56.789012']))
+        self.assertTrue(
+            np.array_equal(date2num_array(index), np.asarray([date2num(dt) for dt in index.to_pydatetime()]))
+        )
+
+    def test_get_window_matches_lines(self):
+        import backtrader as bt
+
+        class CompareWindows(bt.Strategy):
+            def __init__(self):
+                self.mismatches = 0
+                self.num_checked = 0
+
+            def next(self):
+                if len(self) < 30:
+                    return
+
+                window = self.data.get_window(('open', 'high', 'low', 'close'), 30)
+                lines = np.stack(
+                    [
+                        np.frombuffer(line.get(size=30))
+                        for line in [self.data.open, self.data.high, self.data.low, self.data.close]
+                    ],
+                    axis=-1
+                )
+                self.mismatches += int(not np.array_equal(window, lines))
+                self.num_checked += 1
+
+        domain = BTgymDataset(filename=StartIndexTest.filename[0], log_level=log_level)
+        domain.reset()
+        episode = domain._sample_exact_interval([1000, 2435])
+
+        # With preload all bars are loaded before first next() call, window should still end at current bar:
+        for preload in [False, True]:
+            with self.subTest(preload=preload):
+                cerebro = bt.Cerebro(stdstats=False)
+                cerebro.adddata(list(episode.to_btfeed().values())[0])
+                cerebro.addstrategy(CompareWindows)
+                strategy = cerebro.run(preload=preload)[0]
+
+                self.assertEqual(strategy.num_checked, episode.data.shape[0] - 29)
+                self.assertEqual(strategy.mismatches, 0)
+                self.assertIsNone(strategy.data.get_window(('open', 'low'), 30))
+
+
 if __name__ == '__main__':
     unittest.main()
 
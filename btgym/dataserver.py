@@ -18,11 +18,21 @@
 ###############################################################################
 
 import multiprocessing
+import threading
+import pickle
+import shutil
+import tempfile
 import copy
 import zmq
+import time
 import datetime
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
 
 from .datafeed import DataSampleConfig
+from .datafeed.store import _default_store_root
+from .ports import bind
 
 
 class BTgymDataFeedServer(multiprocessing.Process):
@@ -30,11 +40,34 @@ class BTgymDataFeedServer(multiprocessing.Process):
     Data provider server class.
     Enables efficient data sampling for asynchronous multiply BTgym environments execution.
     Manages global back-testing time and broadcast messages.
+
+    Read-only requests (`_get_data`, `_get_info` and time queries) are served concurrently by pool of worker threads;
+    global time updates, data reset and shutdown are handled by server loop in order received, after
+    all requests being served are done, so workers never see dataset or global time changing.
+    Dataset sampling itself is not serialized: dataset guards its own sampling state, see BTgymBaseData._sample().
+    Per-request type latency histograms are reported by `_get_info` as `request_latency`.
     """
     process = None
     dataset_stat = None
-
-    def __init__(self, dataset=None, network_address=None, log_level=None, task=0):
+    stat_version = None
+
+    # Read-only requests, served concurrently by workers pool; any other request is handled by server loop itself
+    # in order received, so global time is only updated by single writer:
+    concurrent_requests = ('_get_data', '_get_info', '_get_global_time', '_get_broadcast_message')
+
+    # Request latency histogram bins edges, seconds:
+    latency_bins = np.logspace(-5, 2, 15)
+
+    def __init__(
+        self,
+        dataset=None,
+        network_address=None,
+        log_level=None,
+        task=0,
+        share_data=False,
+        num_workers=4,
+        ready=None,
+    ):
         """
         Configures data server instance.
 
@@ -43,6 +76,13 @@ class BTgymDataFeedServer(multiprocessing.Process):
             network_address:    ...to bind to.
             log_level:          int, logbook.level
             task:               id
+            share_data:         bool, if True - keep domain data in memory-mapped store shared with all
+                                environments on host, so trials are sent as store handles plus rows intervals.
+            num_workers:        int, number of threads serving read-only requests concurrently.
+            ready:              sending end of multiprocessing.Pipe, server reports (network address it has bound
+                                to, shared data stores directory or None) tuple via it; if address has no port,
+                                port is assigned by OS. Stores directory is to be removed by environment
+                                if server gets terminated.
         """
         super(BTgymDataFeedServer, self).__init__()
 
@@ -50,10 +90,17 @@ class BTgymDataFeedServer(multiprocessing.Process):
         self.task = task
         self.log = None
         self.local_step = 0
+        self.step_lock = None  # Guards local_step, as samples are drawn by concurrent workers.
         self.dataset = dataset
         self.network_address = network_address
+        self.share_data = share_data
         self.default_sample_config = copy.deepcopy(DataSampleConfig)
         self.broadcast_message = None
+        self.num_workers = num_workers
+        self.ready = ready
+        self.store_dir = None
+
+        self.latency = dict()
 
         self.debug_pre_sample_fails = 0
         self.debug_pre_sample_attempts = 0
@@ -85,14 +132,14 @@ class BTgymDataFeedServer(multiprocessing.Process):
                     sample_config['timestamp'] = copy.deepcopy(self.dataset.global_timestamp)
 
                 self.log.debug('Sampling with params: {}'.format(sample_config))
-                sample = self.dataset.sample(**sample_config)
 
             else:
-                self.default_sample_config['timestamp'] = copy.deepcopy(self.dataset.global_timestamp)
-                self.log.debug('Sampling with default params: {}'.format(self.default_sample_config))
-                sample = self.dataset.sample(**self.default_sample_config)
+                sample_config = dict(self.default_sample_config, timestamp=self.dataset.global_timestamp)
+                self.log.debug('Sampling with default params: {}'.format(sample_config))
 
-            self.local_step += 1
+            sample = self.dataset.sample(**sample_config)
+            with self.step_lock:
+                self.local_step += 1
 
         else:
             # Dataset not ready, make dummy:
@@ -100,6 +147,136 @@ class BTgymDataFeedServer(multiprocessing.Process):
 
         return sample
 
+    def get_data_message(self, sample, request):
+        """
+        Composes `_get_data` response.
+
+        If request contains `descriptor=True` key and sample data is held by shared store, sends only
+        sample descriptor instead of pickled sample instance.
+        Dataset statistic and sample configuration are only sent if request `stat_version` key
+        differs from current one, i.e. requesting side is expected to cache those by version.
+
+        Args:
+            sample:     data sample instance;
+            request:    dict, `_get_data` request received.
+
+        Returns:
+            dict of: `sample` or `descriptor`, `stat_version`, `origin`, `timestamp` [,`stat`, `sample_config`]
+        """
+        message = {
+            'stat_version': self.stat_version,
+            'origin': 'data_server',
+            'timestamp': self.dataset.global_timestamp,
+        }
+        descriptor = None
+        if request.get('descriptor', False):
+            descriptor = sample.get_descriptor()
+
+        if descriptor is not None:
+            message['descriptor'] = descriptor
+
+        else:
+            message['sample'] = sample
+
+        if request.get('stat_version', None) != self.stat_version:
+            message['stat'] = self.dataset_stat
+            if descriptor is not None:
+                message['sample_config'] = self.dataset.get_sample_config()
+
+            else:
+                message['sample_config'] = None
+
+        return message
+
+    def get_latency_stat(self):
+        """
+        Returns:
+            dict of `bins` - latency histogram bins edges in seconds and `counts` - dict of histogram counts
+            for every request type served, last bin counts latencies above last edge.
+        """
+        return dict(
+            bins=self.latency_bins.tolist(),
+            counts={ctrl: counts.tolist() for ctrl, counts in self.latency.items()},
+        )
+
+    def add_latency(self, ctrl, latency):
+        """
+        Adds request serving time to `ctrl` request type latency histogram.
+        """
+        if ctrl not in self.latency:
+            self.latency[ctrl] = np.zeros(len(self.latency_bins) + 1, dtype=np.int64)
+
+        self.latency[ctrl][np.searchsorted(self.latency_bins, latency)] += 1
+
+    def get_response(self, service_input):
+        """
+        Composes response to read-only request.
+
+        Args:
+            service_input:  dict, request received, `ctrl` key is one of `concurrent_requests`
+
+        Returns:
+            response message
+        """
+        # Send dataset sample:
+        if service_input['ctrl'] == '_get_data':
+            if self.dataset.is_ready:
+                sample = self.get_data(sample_config=service_input['kwargs'])
+                message = 'Sending sample_#{}.'.format(sample.metadata['sample_num'])
+                self.log.debug(message)
+                return self.get_data_message(sample, service_input)
+
+            else:
+                message = {'ctrl': 'Dataset not ready, waiting for control key <_reset_data>'}
+                self.log.debug('Sent: ' + str(message))
+                return message
+
+        # Send dataset statisitc:
+        elif service_input['ctrl'] == '_get_info':
+            message = 'Sending info for #{}.'.format(self.local_step)
+            self.log.debug(message)
+            # Compose response:
+            return dict(
+                dataset_stat=self.dataset_stat,
+                stat_version=self.stat_version,
+                dataset_columns=list(self.dataset.names),
+                pid=self.process.pid,
+                dataset_is_ready=self.dataset.is_ready,
+                data_names=self.dataset.data_names,
+                request_latency=self.get_latency_stat(),
+            )
+
+        elif service_input['ctrl'] == '_get_global_time':
+            # Tell time:
+            return {'timestamp': self.dataset.global_timestamp}
+
+        elif service_input['ctrl'] == '_get_broadcast_message':
+            # Tell:
+            return {
+                'timestamp': self.dataset.global_timestamp,
+                'broadcast_message': self.broadcast_message,
+            }
+
+    def serve(self, identity, service_input, results_address, local, worker_sockets):
+        """
+        Workers pool job: composes and serializes response to read-only request,
+        passes it back to server loop via worker own inproc socket; sockets created are added to `worker_sockets`
+        to be closed by server loop on shutdown.
+        """
+        try:
+            message = self.get_response(service_input)
+
+        except Exception as e:
+            self.log.exception('Failed to serve <{}>'.format(service_input['ctrl']))
+            message = {'ctrl': 'Failed to serve <{}>: {}'.format(service_input['ctrl'], e)}
+
+        if not hasattr(local, 'socket'):
+            local.socket = self.context.socket(zmq.PUSH)
+            local.socket.connect(results_address)
+            worker_sockets.append(local.socket)
+
+        local.socket.send_multipart([identity, b'', pickle.dumps(message, pickle.HIGHEST_PROTOCOL)], copy=False)
+
     def run(self):
         """
         Server process runtime body.
@@ -115,10 +292,48 @@ class BTgymDataFeedServer(multiprocessing.Process):
         self.process = multiprocessing.current_process()
         self.log.info('PID: {}'.format(self.process.pid))
 
-        # Set up a comm. channel for server as ZMQ socket:
-        context = zmq.Context()
-        socket = context.socket(zmq.REP)
-        socket.bind(self.network_address)
+        # Set up a comm. channel for server as ZMQ socket.
+        # ROUTER talks to environments REQ sockets: [identity, empty, request] messages.
+        self.context = zmq.Context()
+        socket = self.context.socket(zmq.ROUTER)
+        self.network_address = bind(socket, self.network_address)
+
+        # All shared data stores are made in single directory, known to environment in advance:
+        if self.share_data:
+            self.store_dir = tempfile.mkdtemp(prefix='btgym_data_server_', dir=_default_store_root())
+
+        # Tell environment we are ready:
+        if self.ready is not None:
+            self.ready.send((self.network_address, self.store_dir))
+            self.ready.close()
+
+        # Workers pass serialized responses back here:
+        results_address = 'inproc://btgym_data_server_{}_results'.format(self.task)
+        results = self.context.socket(zmq.PULL)
+        results.bind(results_address)
+
+        workers = ThreadPoolExecutor(max_workers=self.num_workers)
+        self.step_lock = threading.Lock()
+        local = threading.local()
+        worker_sockets = []
+
+        poller = zmq.Poller()
+        poller.register(socket, zmq.POLLIN)
+        poller.register(results, zmq.POLLIN)
+
+        # Requests being served by workers: identity -> (ctrl, time received), one per REQ client:
+        pending = dict()
+
+        def send_response(identity, payload):
+            socket.send_multipart([identity, b'', payload], copy=False)
+            ctrl, received = pending.pop(identity)
+            self.add_latency(ctrl, time.time() - received)
+
+        def send_pending():
+            # Wait for workers to finish, so dataset can be changed:
+            while pending:
+                identity, _, payload = results.recv_multipart(copy=False)
+                send_response(identity.bytes, payload)
 
         # Actually load data to BTgymDataset instance, will reset it later on:
         try:
@@ -127,29 +342,57 @@ class BTgymDataFeedServer(multiprocessing.Process):
         except (AssertionError, AttributeError) as e:
             self.dataset.read_csv()
 
-        # Describe dataset:
+        # Describe dataset, version is unique for every statistic computed:
         self.dataset_stat = self.dataset.describe()
+        self.stat_version = int(time.time() * 1e6)
 
         # Main loop:
         while True:
-            # Stick here until receive any request:
-            service_input = socket.recv_pyobj()
+            # Stick here until receive any request or response is ready:
+            events = dict(poller.poll())
+
+            if results in events:
+                identity, _, payload = results.recv_multipart(copy=False)
+                send_response(identity.bytes, payload)
+
+            if socket not in events:
+                continue
+
+            identity, _, request = socket.recv_multipart()
+            received = time.time()
+            service_input = pickle.loads(request)
             self.log.debug('Received <{}>'.format(service_input))
 
             if 'ctrl' in service_input:
+                ctrl = service_input['ctrl']
+                if ctrl in self.concurrent_requests:
+                    pending[identity] = (ctrl, received)
+                    workers.submit(self.serve, identity, service_input, results_address, local, worker_sockets)
+                    continue
+
                 # It's time to exit:
                 if service_input['ctrl'] == '_stop':
                     # Server shutdown logic:
                     # send last run statistic, release comm channel and exit:
+                    send_pending()
+                    workers.shutdown(wait=True)
+                    # Worker threads are done, their sockets can be closed here:
+                    for worker_socket in worker_sockets:
+                        worker_socket.close()
                     message = {'ctrl': 'Exiting.'}
                     self.log.info(str(message))
-                    socket.send_pyobj(message)
+                    if self.share_data:
+                        self.dataset.release_data_store()
+                        shutil.rmtree(self.store_dir, ignore_errors=True)
+                    socket.send_multipart([identity, b'', pickle.dumps(message)])
                     socket.close()
-                    context.destroy()
+                    results.close()
+                    self.context.destroy()
                     return None
 
                 # Reset datafeed:
                 elif service_input['ctrl'] == '_reset_data':
+                    send_pending()
                     try:
                         kwargs = service_input['kwargs']
 
@@ -157,6 +400,9 @@ class BTgymDataFeedServer(multiprocessing.Process):
                         kwargs = {}
 
                     self.dataset.reset(**kwargs)
+                    if self.share_data:
+                        self.dataset.share_data(store_dir=self.store_dir)
+                        self.log.debug('Domain data moved to shared store.')
                     # self.global_timestamp = self.dataset.global_timestamp
                     self.log.notice(
                         'Initial global_time set to: {} / stamp: {}'.
@@ -167,45 +413,12 @@ class BTgymDataFeedServer(multiprocessing.Process):
                     )
                     message = {'ctrl': 'Reset with kwargs: {}'.format(kwargs)}
                     self.log.debug('Data_is_ready: {}'.format(self.dataset.is_ready))
-                    socket.send_pyobj(message)
                     self.local_step = 0
 
-                # Send dataset sample:
-                elif service_input['ctrl'] == '_get_data':
-                    if self.dataset.is_ready:
-                        sample = self.get_data(sample_config=service_input['kwargs'])
-                        message = 'Sending sample_#{}.'.format(self.local_step)
-                        self.log.debug(message)
-                        socket.send_pyobj(
-                            {
-                                'sample': sample,
-                                'stat': self.dataset_stat,
-                                'origin': 'data_server',
-                                'timestamp': self.dataset.global_timestamp,
-                            }
-                        )
-
-                    else:
-                        message = {'ctrl': 'Dataset not ready, waiting for control key <_reset_data>'}
-                        self.log.debug('Sent: ' + str(message))
-                        socket.send_pyobj(message)  # pairs any other input
-
-                # Send dataset statisitc:
-                elif service_input['ctrl'] == '_get_info':
-                    message = 'Sending info for #{}.'.format(self.local_step)
-                    self.log.debug(message)
-                    # Compose response:
-                    info_dict = dict(
-                        dataset_stat=self.dataset_stat,
-                        dataset_columns=list(self.dataset.names),
-                        pid=self.process.pid,
-                        dataset_is_ready=self.dataset.is_ready,
-                        data_names=self.dataset.data_names
-                    )
-                    socket.send_pyobj(info_dict)
-
                 # Set global time:
                 elif service_input['ctrl'] == '_set_broadcast_message':
+                    # Workers read global time and message, wait for them to finish:
+                    send_pending()
                     if self.dataset.global_timestamp != 0 and self.dataset.global_timestamp > service_input['timestamp']:
                         message = 'Moving back in time not supported! ' +\
                                   'Current global_time: {}, '.\
@@ -224,22 +437,8 @@ class BTgymDataFeedServer(multiprocessing.Process):
                                 datetime.datetime.fromtimestamp(self.dataset.global_timestamp),
                                 self.dataset.global_timestamp
                             )
-                    socket.send_pyobj(message)
                     self.log.debug(message)
 
-                elif service_input['ctrl'] == '_get_global_time':
-                    # Tell time:
-                    message = {'timestamp': self.dataset.global_timestamp}
-                    socket.send_pyobj(message)
-
-                elif service_input['ctrl'] == '_get_broadcast_message':
-                    # Tell:
-                    message = {
-                        'timestamp': self.dataset.global_timestamp,
-                        'broadcast_message': self.broadcast_message,
-                    }
-                    socket.send_pyobj(message)
-
                 else:  # ignore any other input
                     # NOTE: response dictionary must include 'ctrl' key
                     message = {
@@ -248,9 +447,12 @@ class BTgymDataFeedServer(multiprocessing.Process):
                             '<_get_info>, <_stop>, <_get_global_time>, <_get_broadcast_message>'
                     }
                     self.log.debug('Sent: ' + str(message))
-                    socket.send_pyobj(message)  # pairs any other input
 
             else:
+                ctrl = None
                 message = {'ctrl': 'No <ctrl> key received, got:\n{}'.format(service_input)}
                 self.log.debug(str(message))
-                socket.send_pyobj(message) # pairs input
+
+            # Pairs input:
+            pending[identity] = (ctrl, received)
+            send_response(identity, pickle.dumps(message, pickle.HIGHEST_PROTOCOL))
@@ -20,8 +20,11 @@
 from logbook import Logger, StreamHandler, WARNING, NOTICE, INFO, DEBUG
 import sys
 import time
+import multiprocessing
 import zmq
+import zmq.asyncio
 import os
+import shutil
 import copy
 import numpy as np
 import gym
@@ -34,6 +37,9 @@ import backtrader as bt
 from btgym import BTgymServer, BTgymBaseStrategy, BTgymDataset, BTgymRendering, BTgymDataFeedServer
 from btgym import DictSpace, ActionDictSpace
 from btgym.datafeed.multi import BTgymMultiData
+from btgym.framing import recv_framed, async_recv_framed
+from btgym.inprocess import InProcessContext, BTgymServerThread
+from btgym.ports import clear_ports, wait_ready, get_address, is_complete, release_address
 
 from btgym.rendering import BTgymNullRendering
 
@@ -48,11 +54,13 @@ class BTgymEnv(gym.Env):
     data_master = True
     data_network_address = 'tcp://127.0.0.1:'  # using localhost.
     data_port = 4999
+    share_data = False  # keep domain data in memory-mapped store shared by all environments on host.
     data_server = None
     data_server_pid = None
     data_context = None
     data_socket = None
     data_server_response = None
+    data_store_dir = None  # Directory data_server keeps shared data stores in, if any.
 
     # Dataset:
     dataset = None  # BTgymDataset instance.
@@ -72,6 +80,14 @@ class BTgymEnv(gym.Env):
     network_address = 'tcp://127.0.0.1:'  # using localhost.
     ctrl_actions = ('_done', '_reset', '_stop', '_getstat', '_render')  # server control messages.
     server_response = None
+    in_process = False  # run server in this process, passing messages with no serialization.
+    prefetch = False  # prepare next episode in background while current one runs.
+    feature_cache_size = 256  # megabytes, server memory budget for strategy features reused across trial episodes.
+    data_server_workers = 4  # number of data_server threads serving read-only requests.
+    transport = 'tcp'  # `tcp` or `ipc` for env -- server and server -- data_server channels.
+    wait_server = True  # wait for server to get ready in constructor, see connect_server().
+    _server_ready = None  # receiving end of server readiness pipe, while server is not connected.
+    _async_sockets = None  # zmq.asyncio sockets shadowing ones above, if any.
 
     # Connection timeout:
     connect_timeout = 60  # server connection timeout in seconds.
@@ -115,11 +131,41 @@ class BTgymEnv(gym.Env):
             engine=None (bt.Cerebro):                       environment simulation engine, any bt.Cerebro subclass,
                                                             overrides `strategy` arg.
             network_address=`tcp://127.0.0.1:` (str):       BTGym_server address.
-            port=5500 (int):                                network port to use for server - API_shell communication.
+            port=5500 (int):                                network port to use for server - API_shell communication;
+                                                            if None - port is assigned by OS at server start.
             data_master=True (bool):                        let this environment control over data_server;
             data_network_address=`tcp://127.0.0.1:` (str):  data_server address.
-            data_port=4999 (int):                           network port to use for server -- data_server communication.
+            data_port=4999 (int):                           network port to use for server -- data_server communication;
+                                                            if None - data_master only: port is assigned by OS
+                                                            at data_server start.
+            transport=`tcp` (str):                          `tcp` or `ipc`: unix domain sockets for server and
+                                                            data_server communication, paths are derived from
+                                                            `port` and `data_port` [or made unique if None];
+                                                            note: in_process mode env channel needs no transport.
+            data_server_workers=4 (int):                    data_master only: number of data_server threads serving
+                                                            environments data requests concurrently.
+            share_data=False (bool):                        data_master only: keep domain data in memory-mapped
+                                                            store shared by all environments on host, trials
+                                                            are served as store handles plus rows intervals.
+            in_process=False (bool):                        run server loop in thread of this process instead of
+                                                            separate one: no network, no messages serialization;
+                                                            data_server interaction is not affected.
+            prefetch=False (bool):                          server prepares next episode in background while
+                                                            current one runs, using same reset kwargs; prepared
+                                                            episode is discarded if next reset kwargs differ or
+                                                            global time has moved. To keep data iterators sampling
+                                                            trials in order from skipping discarded episode trial,
+                                                            prefetch is only done while reset kwargs and global
+                                                            time stay unchanged from episode to episode.
+            feature_cache_size=256 (int):                   megabytes; server keeps strategy features computed over
+                                                            entire trial (see DevStrat_4_12) for episodes sampled
+                                                            from same trial, least recently used ones are evicted
+                                                            when budget is exceeded; 0 disables caching.
             connect_timeout=60 (int):                       server connection timeout in seconds.
+            wait_server=True (bool):                        wait for server to get ready and connect to it in
+                                                            constructor; if False - server is only started, so
+                                                            several environments can start their servers
+                                                            concurrently; call connect_server() before use.
             render_enabled=True (bool):                     enable rendering for this environment;
             render_modes=['human', 'episode'] (list):       `episode` - plotted episode results;
                                                             `human` - raw_state observation.
@@ -232,9 +278,16 @@ class BTgymEnv(gym.Env):
         # Random seeding:
         np.random.seed(self.random_seed)
 
-        # Network parameters:
-        self.network_address += str(self.port)
-        self.data_network_address += str(self.data_port)
+        # Network parameters, if tcp port is not set, one is assigned at server start;
+        # slave connects to running data server, so can't do with address made up at start:
+        if self.data_port is None and not self.data_master and \
+                not is_complete(self.data_network_address, self.transport):
+            raise ValueError('Data slave environment requires `data_port` to be set.')
+
+        self.network_address = get_address(self.network_address, self.port, self.transport, 'server')
+        self.data_network_address = get_address(
+            self.data_network_address, self.data_port, self.transport, 'data'
+        )
 
         # Set server rendering:
         if self.render_enabled:
@@ -434,7 +487,7 @@ class BTgymEnv(gym.Env):
         self.server_response = None
         self.env_response = None
 
-        self._start_server()
+        self._start_server(wait=self.wait_server)
         self.closed = False
 
         self.log.info('Environment is ready.')
@@ -484,7 +537,55 @@ class BTgymEnv(gym.Env):
 
         start = time.time()
         try:
-            response['message'] = socket.recv_pyobj()
+            response['message'] = recv_framed(socket)
+            response['time'] = time.time() - start
+
+        except zmq.ZMQError as e:
+            if e.errno == zmq.EAGAIN:
+                response['status'] = 'receive_failed_due_to_connect_timeout'
+
+            else:
+                response['status'] = 'receive_failed_for_unknown_reason'
+            return response
+
+        return response
+
+    @staticmethod
+    async def _async_comm_with_timeout(socket, message, timeout):
+        """
+        Coroutine: exchanges messages via `zmq.asyncio` socket, timeout sensitive.
+
+        Args:
+            socket: zmq.asyncio connected socket to communicate via;
+            message: message to send;
+            timeout: timeout in seconds.
+
+        Returns:
+            dictionary, same as `_comm_with_timeout()` returns.
+        """
+        response = dict(
+            status='ok',
+            message=None,
+        )
+        try:
+            await socket.send_pyobj(message)
+
+        except zmq.ZMQError as e:
+            if e.errno == zmq.EAGAIN:
+                response['status'] = 'send_failed_due_to_connect_timeout'
+
+            else:
+                response['status'] = 'send_failed_for_unknown_reason'
+            return response
+
+        start = time.time()
+        try:
+            # Polling is cheaper than wrapping every receive in asyncio.wait_for() task:
+            if not await socket.poll(timeout * 1000, zmq.POLLIN):
+                response['status'] = 'receive_failed_due_to_connect_timeout'
+                return response
+
+            response['message'] = await async_recv_framed(socket)
             response['time'] = time.time() - start
 
         except zmq.ZMQError as e:
@@ -497,9 +598,35 @@ class BTgymEnv(gym.Env):
 
         return response
 
-    def _start_server(self):
+    def _get_async_socket(self, socket):
+        """
+        Returns `zmq.asyncio` socket sharing same underlying zmq socket with given one;
+        both can be used in turn, as long as request-reply order is kept.
+
+        Args:
+            socket: zmq socket.
+
+        Returns:
+            zmq.asyncio socket
+        """
+        if self._async_sockets is None:
+            self._async_sockets = {}
+
+        # Forget ones of sockets closed on server restarts:
+        for key in [key for key in self._async_sockets.keys() if key.closed]:
+            del self._async_sockets[key]
+
+        if socket not in self._async_sockets:
+            self._async_sockets[socket] = zmq.asyncio.Socket.shadow(socket.underlying)
+
+        return self._async_sockets[socket]
+
+    def _start_server(self, wait=True):
         """
         Configures backtrader REQ/REP server instance and starts server process.
+
+        Args:
+            wait:   bool, wait for server to get ready and connect to it; if False - see connect_server().
         """
 
         # Ensure network resources:
@@ -508,31 +635,77 @@ class BTgymEnv(gym.Env):
             self.context.destroy()
             self.socket = None
 
-        # 2. Kill any process using server port:
-        cmd = "kill $( lsof -i:{} -t ) > /dev/null 2>&1".format(self.port)
-        os.system(cmd)
+        if self.in_process:
+            # Set up client channel, no network:
+            self.context = InProcessContext()
+            self.socket = self.context.client
+            self.socket.setsockopt(zmq.RCVTIMEO, self.connect_timeout * 1000)
+
+            # Configure and start server thread:
+            self.server = BTgymServerThread(
+                BTgymServer(
+                    cerebro=self.engine,
+                    render=self.renderer,
+                    network_address=self.network_address,
+                    data_network_address=self.data_network_address,
+                    connect_timeout=self.connect_timeout,
+                    log_level=self.log_level,
+                    task=self.task,
+                    channel=self.context.server,
+                    prefetch=self.prefetch,
+                    feature_cache_size=self.feature_cache_size,
+                )
+            )
+            self.server.daemon = True
+            self.server.start()
 
-        # Set up client channel:
-        self.context = zmq.Context()
-        self.socket = self.context.socket(zmq.REQ)
-        self.socket.setsockopt(zmq.RCVTIMEO, self.connect_timeout * 1000)
-        self.socket.setsockopt(zmq.SNDTIMEO, self.connect_timeout * 1000)
-        self.socket.connect(self.network_address)
-
-        # Configure and start server:
-        self.server = BTgymServer(
-            cerebro=self.engine,
-            render=self.renderer,
-            network_address=self.network_address,
-            data_network_address=self.data_network_address,
-            connect_timeout=self.connect_timeout,
-            log_level=self.log_level,
-            task=self.task,
-        )
-        self.server.daemon = False
-        self.server.start()
-        # Wait for server to startup:
-        time.sleep(1)
+        else:
+            # 2. Kill any process listening on server port:
+            if self.transport == 'tcp':
+                clear_ports([self.port], log=self.log)
+
+            # Configure and start server:
+            ready, server_ready = multiprocessing.Pipe(duplex=False)
+            self.server = BTgymServer(
+                cerebro=self.engine,
+                render=self.renderer,
+                network_address=self.network_address,
+                data_network_address=self.data_network_address,
+                connect_timeout=self.connect_timeout,
+                log_level=self.log_level,
+                task=self.task,
+                prefetch=self.prefetch,
+                feature_cache_size=self.feature_cache_size,
+                ready=server_ready,
+            )
+            self.server.daemon = False
+            self.server.start()
+            server_ready.close()
+            self._server_ready = ready
+
+        if wait:
+            self.connect_server()
+
+    def connect_server(self):
+        """
+        Waits for server started to get ready, connects and pings it.
+        Needs to be called only if environment has been made with `wait_server=False`.
+        """
+        if self._server_ready is not None:
+            ready = self._server_ready
+            self._server_ready = None
+
+            # Wait for server to bind, get assigned port, if any:
+            self.network_address = wait_ready(ready, self.connect_timeout, 'Server')
+            if self.transport == 'tcp':
+                self.port = int(self.network_address.rsplit(':', 1)[-1])
+
+            # Set up client channel:
+            self.context = zmq.Context()
+            self.socket = self.context.socket(zmq.REQ)
+            self.socket.setsockopt(zmq.RCVTIMEO, self.connect_timeout * 1000)
+            self.socket.setsockopt(zmq.SNDTIMEO, self.connect_timeout * 1000)
+            self.socket.connect(self.network_address)
 
         # Check connection:
         self.log.info('Server started, pinging {} ...'.format(self.network_address))
@@ -561,7 +734,7 @@ class BTgymEnv(gym.Env):
             if self._force_control_mode():
                 # In case server is running and client side is ok:
                 self.socket.send_pyobj({'ctrl': '_stop'})
-                self.server_response = self.socket.recv_pyobj()
+                self.server_response = recv_framed(self.socket)
 
             else:
                 self.server.terminate()
@@ -596,12 +769,39 @@ class BTgymEnv(gym.Env):
 
             while 'ctrl' not in self.server_response:
                 self.socket.send_pyobj({'ctrl': '_done'})
-                self.server_response = self.socket.recv_pyobj()
+                self.server_response = recv_framed(self.socket)
+                attempt += 1
+                self.log.debug('FORCE CONTROL MODE attempt: {}.\nResponse: {}'.format(attempt, self.server_response))
+
+            return True
+
+    async def _async_force_control_mode(self):
+        """
+        Coroutine: puts BT server to control mode, same as `_force_control_mode()` does.
+        """
+        if not self.server or not self.server.is_alive():
+            msg = 'No running server found. Hint: forgot to call reset()?'
+
+        elif not self.context or self.context.closed:
+            msg = 'No network connection found.'
+
+        else:
+            socket = self._get_async_socket(self.socket)
+            self.server_response = {}
+            attempt = 0
+
+            while 'ctrl' not in self.server_response:
+                await socket.send_pyobj({'ctrl': '_done'})
+                self.server_response = await async_recv_framed(socket)
                 attempt += 1
                 self.log.debug('FORCE CONTROL MODE attempt: {}.\nResponse: {}'.format(attempt, self.server_response))
 
             return True
 
+        self.log.info(msg)
+        self.server_response = msg
+        return False
+
     def _assert_response(self, response):
         """
         Simple watcher:
@@ -619,6 +819,41 @@ class BTgymEnv(gym.Env):
         self.log.debug('Response checker received:\n{}\nas type: {}'.
                        format(response, type(response)))
 
+    def _assert_observation(self):
+        """
+        Checks if observation of last environment response is within observation space,
+        stops server and rises exception otherwise.
+        """
+        try:
+            assert self.observation_space.contains(self.env_response[0])
+
+        except (AssertionError, AttributeError) as e:
+            msg1 = self._print_space(self.observation_space.spaces)
+            msg2 = self._print_space(self.env_response[0])
+            msg3 = ''
+            for step_info in self.env_response[-1]:
+                msg3 += '{}\n'.format(step_info)
+            msg = (
+                '\nState observation shape/range mismatch!\n' +
+                'Space set by env: \n{}\n' +
+                'Space returned by server: \n{}\n' +
+                'Full response:\n{}\n' +
+                'Reward: {}\n' +
+                'Done: {}\n' +
+                'Info:\n{}\n' +
+                'Hint: Wrong Strategy.get_state() parameters?'
+            ).format(
+                msg1,
+                msg2,
+                self.env_response[0],
+                self.env_response[1],
+                self.env_response[2],
+                msg3,
+            )
+            self.log.exception(msg)
+            self._stop_server()
+            raise AssertionError(msg)
+
     def _print_space(self, space, _tab=''):
         """
         Parses observation space shape or response.
@@ -693,6 +928,27 @@ class BTgymEnv(gym.Env):
                 )
 
         """
+        self._prepare_reset(**kwargs)
+
+        # Get initial environment response:
+        self.env_response = self.step(self.get_initial_action())
+
+        # Check (once) if it is really (o,r,d,i) tuple:
+        self._assert_response(self.env_response)
+
+        # Check (once) if state_space is as expected:
+        self._assert_observation()
+
+        return self.env_response[0]
+
+    def _prepare_reset(self, **kwargs):
+        """
+        Gets data_server and server ready and signals server to start new episode;
+        episode gets prepared by server while waiting for initial environment response.
+
+        Args:
+            kwargs:         same as for `reset()`.
+        """
         # Data Server check:
         if self.data_master:
             if not self.data_server or not self.data_server.is_alive():
@@ -720,48 +976,66 @@ class BTgymEnv(gym.Env):
                 socket=self.socket,
                 message={'ctrl': '_reset', 'kwargs': kwargs}
             )
-            # Get initial environment response:
-            self.env_response = self.step(self.get_initial_action())
 
-            # Check (once) if it is really (o,r,d,i) tuple:
-            self._assert_response(self.env_response)
+        else:
+            msg = 'Something went wrong. env.reset() can not get response from server.'
+            self.log.exception(msg)
+            raise ChildProcessError(msg)
 
-            # Check (once) if state_space is as expected:
-            try:
-                assert self.observation_space.contains(self.env_response[0])
-
-            except (AssertionError, AttributeError) as e:
-                msg1 = self._print_space(self.observation_space.spaces)
-                msg2 = self._print_space(self.env_response[0])
-                msg3 = ''
-                for step_info in self.env_response[-1]:
-                    msg3 += '{}\n'.format(step_info)
-                msg = (
-                    '\nState observation shape/range mismatch!\n' +
-                    'Space set by env: \n{}\n' +
-                    'Space returned by server: \n{}\n' +
-                    'Full response:\n{}\n' +
-                    'Reward: {}\n' +
-                    'Done: {}\n' +
-                    'Info:\n{}\n' +
-                    'Hint: Wrong Strategy.get_state() parameters?'
-                ).format(
-                    msg1,
-                    msg2,
-                    self.env_response[0],
-                    self.env_response[1],
-                    self.env_response[2],
-                    msg3,
+    async def async_reset(self, **kwargs):
+        """
+        Coroutine: same as `reset()`, but does not block while waiting for data server and server responses,
+        so single event loop can drive many environments.
+
+        Args:
+            kwargs:         any kwargs, same as for `reset()`.
+
+        Returns:
+            observation space state
+        """
+        if self.in_process:
+            # Server runs in this process, no waiting to overlap:
+            return self.reset(**kwargs)
+
+        # Data Server check:
+        if self.data_master:
+            if not self.data_server or not self.data_server.is_alive():
+                self.log.info('No running data_server found, starting...')
+                self._start_data_server()
+
+            # Domain dataset status check:
+            self.data_server_response = await self._async_comm_with_timeout(
+                socket=self._get_async_socket(self.data_socket),
+                message={'ctrl': '_get_info'},
+                timeout=self.connect_timeout,
+            )
+            if not self.data_server_response['message']['dataset_is_ready']:
+                self.log.info(
+                    'Data domain `reset()` called prior to `reset_data()` with [possibly inconsistent] defaults.'
                 )
-                self.log.exception(msg)
-                self._stop_server()
-                raise AssertionError(msg)
+                await self.async_reset_data()
 
-            return self.env_response[0]
+        # Server process check:
+        if not self.server or not self.server.is_alive():
+            self.log.info('No running server found, starting...')
+            self._start_server()
+
+        if await self._async_force_control_mode():
+            self.server_response = await self._async_comm_with_timeout(
+                socket=self._get_async_socket(self.socket),
+                message={'ctrl': '_reset', 'kwargs': kwargs},
+                timeout=self.connect_timeout,
+            )
+            # Get initial environment response:
+            self.env_response = await self.async_step(self.get_initial_action())
+
+            self._assert_response(self.env_response)
+            self._assert_observation()
 
+            return self.env_response[0]
 
         else:
-            msg = 'Something went wrong. env.reset() can not get response from server.'
+            msg = 'Something went wrong. env.async_reset() can not get response from server.'
             self.log.exception(msg)
             raise ChildProcessError(msg)
 
@@ -777,6 +1051,57 @@ class BTgymEnv(gym.Env):
             tuple (Observation, Reward, Info, Done)
 
         """
+        env_response = self._comm_with_timeout(
+            socket=self.socket,
+            message=self._get_action_message(action)
+        )
+        if not env_response['status'] in 'ok':
+            msg = '.step(): server unreachable with status: <{}>.'.format(env_response['status'])
+            self.log.error(msg)
+            raise ConnectionError(msg)
+
+        self.env_response = env_response ['message']
+
+        return self.env_response
+
+    async def async_step(self, action):
+        """
+        Coroutine: same as `step()`, but does not block while waiting for server response.
+
+        Args:
+            action:     int or dict, action compatible to env.action_space
+
+        Returns:
+            tuple (Observation, Reward, Info, Done)
+        """
+        if self.in_process:
+            # Server runs in this process, no waiting to overlap:
+            return self.step(action)
+
+        env_response = await self._async_comm_with_timeout(
+            socket=self._get_async_socket(self.socket),
+            message=self._get_action_message(action),
+            timeout=self.connect_timeout,
+        )
+        if not env_response['status'] in 'ok':
+            msg = '.async_step(): server unreachable with status: <{}>.'.format(env_response['status'])
+            self.log.error(msg)
+            raise ConnectionError(msg)
+
+        self.env_response = env_response['message']
+
+        return self.env_response
+
+    def _get_action_message(self, action):
+        """
+        Checks action and environment state, converts action to message server expects.
+
+        Args:
+            action:     int or dict, action compatible to env.action_space
+
+        Returns:
+            dictionary: {'action': action as dict of strings}
+        """
         # If we got int as action - try to treat it as an action for single-valued action space dict:
         if isinstance(action, int) and len(list(self.action_space.spaces.keys())) == 1:
             a = copy.deepcopy(action)
@@ -804,21 +1129,10 @@ class BTgymEnv(gym.Env):
             self.log.exception(msg)
             raise AssertionError(msg)
 
-        # Send action (as dict of strings) to backtrader engine, receive environment response:
+        # Action as dict of strings backtrader engine expects:
         action_as_dict = {key: self.server_actions[key][value] for key, value in action.items()}
         #print('step: ', action, action_as_dict)
-        env_response = self._comm_with_timeout(
-            socket=self.socket,
-            message={'action': action_as_dict}
-        )
-        if not env_response['status'] in 'ok':
-            msg = '.step(): server unreachable with status: <{}>.'.format(env_response['status'])
-            self.log.error(msg)
-            raise ConnectionError(msg)
-
-        self.env_response = env_response ['message']
-
-        return self.env_response
+        return {'action': action_as_dict}
 
     def close(self):
         """
@@ -828,18 +1142,27 @@ class BTgymEnv(gym.Env):
         self.log.debug('close.call()')
         self._stop_server()
         self._stop_data_server()
+
+        # Remove unique ipc socket paths made, if any:
+        release_address(self.network_address)
+        if self.data_master:
+            release_address(self.data_network_address)
+
         self.log.info('Environment closed.')
 
     def get_stat(self):
         """
         Returns last run episode statistics.
 
+        Along with engine analyzers results, includes `runtime` of episode and its `setup_time` and `run_time` parts:
+        time spent preparing engine and data and running backtrader engine itself, as datetime.timedelta.
+
         Note:
             when invoked, forces running episode to terminate.
         """
         if self._force_control_mode():
             self.socket.send_pyobj({'ctrl': '_getstat'})
-            return self.socket.recv_pyobj()
+            return recv_framed(self.socket)
 
         else:
             return self.server_response
@@ -881,7 +1204,7 @@ class BTgymEnv(gym.Env):
             raise ValueError('Unexpected render mode {}'.format(mode))
         self.socket.send_pyobj({'ctrl': '_render', 'mode': mode})
 
-        rgb_array_dict = self.socket.recv_pyobj()
+        rgb_array_dict = recv_framed(self.socket)
 
         self.rendered_rgb.update(rgb_array_dict)
 
@@ -919,21 +1242,29 @@ class BTgymEnv(gym.Env):
 
         # Only data_master launches/stops data_server process:
         if self.data_master:
-            # 2. Kill any process using server port:
-            cmd = "kill $( lsof -i:{} -t ) > /dev/null 2>&1".format(self.data_port)
-            os.system(cmd)
+            # 2. Kill any process listening on server port:
+            if self.transport == 'tcp':
+                clear_ports([self.data_port], log=self.log)
 
             # Configure and start server:
+            ready, server_ready = multiprocessing.Pipe(duplex=False)
             self.data_server = BTgymDataFeedServer(
                 dataset=self.dataset,
                 network_address=self.data_network_address,
                 log_level=self.log_level,
-                task=self.task
+                task=self.task,
+                share_data=self.share_data,
+                num_workers=self.data_server_workers,
+                ready=server_ready,
             )
             self.data_server.daemon = False
             self.data_server.start()
-            # Wait for server to startup
-            time.sleep(1)
+            server_ready.close()
+
+            # Wait for server to bind, get assigned port, if any:
+            self.data_network_address, self.data_store_dir = wait_ready(ready, self.connect_timeout, 'Data_server')
+            if self.transport == 'tcp':
+                self.data_port = int(self.data_network_address.rsplit(':', 1)[-1])
 
         # Set up client channel:
         self.data_context = zmq.Context()
@@ -980,6 +1311,11 @@ class BTgymEnv(gym.Env):
 
             self.log.info('{} Exit code: {}'.format(self.data_server_response, self.data_server.exitcode))
 
+            # Shared data stores left by server not exited gracefully, if any:
+            if self.data_store_dir is not None:
+                shutil.rmtree(self.data_store_dir, ignore_errors=True)
+                self.data_store_dir = None
+
         if self.data_context:
             self.data_context.destroy()
             self.data_socket = None
@@ -996,8 +1332,44 @@ class BTgymEnv(gym.Env):
         """
         Retrieves dataset configuration and descriptive statistic.
         """
-        self.data_socket.send_pyobj({'ctrl': '_get_info'})
-        self.data_server_response = self.data_socket.recv_pyobj()
+        response = self._comm_with_timeout(
+            socket=self.data_socket,
+            message={'ctrl': '_get_info'}
+        )
+        if not response['status'] in 'ok':
+            msg = 'Data_server unreachable with status: <{}>.'.format(response['status'])
+            self.log.error(msg)
+            raise ConnectionError(msg)
+
+        self.data_server_response = response['message']
+
+        return self.data_server_response['dataset_stat'],\
+            self.data_server_response['dataset_columns'],\
+            self.data_server_response['pid'], \
+            self.data_server_response['data_names']
+
+    async def async_get_dataset_info(self):
+        """
+        Coroutine: same as `_get_dataset_info()`, but does not block while waiting for data server response.
+
+        Returns:
+            dataset statistic, columns, data_server pid and data lines names
+        """
+        if self.in_process:
+            # Server runs in this process, no waiting to overlap:
+            return self._get_dataset_info()
+
+        response = await self._async_comm_with_timeout(
+            socket=self._get_async_socket(self.data_socket),
+            message={'ctrl': '_get_info'},
+            timeout=self.connect_timeout,
+        )
+        if not response['status'] in 'ok':
+            msg = 'Data_server unreachable with status: <{}>.'.format(response['status'])
+            self.log.error(msg)
+            raise ConnectionError(msg)
+
+        self.data_server_response = response['message']
 
         return self.data_server_response['dataset_stat'],\
             self.data_server_response['dataset_columns'],\
@@ -1045,4 +1417,41 @@ class BTgymEnv(gym.Env):
         else:
             pass
 
+    async def async_reset_data(self, **kwargs):
+        """
+        Coroutine: same as `reset_data()`, but does not block while waiting for data server response.
+
+        Args:
+            **kwargs:   data provider class .reset() method specific.
+        """
+        if self.in_process:
+            # Server runs in this process, no waiting to overlap:
+            return self.reset_data(**kwargs)
+
+        if self.closed:
+            self._start_server()
+            if self.data_master:
+                self._start_data_server()
+            self.closed = False
+
+        else:
+            _ = await self._async_force_control_mode()
 
+        if self.data_master:
+            if self.data_server is None or not self.data_server.is_alive():
+                self._restart_data_server()
+
+            self.data_server_response = await self._async_comm_with_timeout(
+                socket=self._get_async_socket(self.data_socket),
+                message={'ctrl': '_reset_data', 'kwargs': kwargs},
+                timeout=self.connect_timeout,
+            )
+            if self.data_server_response['status'] in 'ok':
+                self.log.debug('Dataset seems ready with response: <{}>'.
+                               format(self.data_server_response['message']))
+
+            else:
+                msg = 'Data_server unreachable with status: <{}>.'. \
+                    format(self.data_server_response['status'])
+                self.log.error(msg)
+                raise SystemExit(msg)
@@ -28,6 +28,7 @@ from btgym import BTgymRendering, DictSpace, ActionDictSpace
 from btgym.rendering import BTgymNullRendering
 
 from btgym.envs.base import BTgymEnv
+from btgym.ports import get_address, is_complete
 
 
 class MultiDiscreteEnv(BTgymEnv):
@@ -248,9 +249,16 @@ class MultiDiscreteEnv(BTgymEnv):
         # Random seeding:
         np.random.seed(self.random_seed)
 
-        # Network parameters:
-        self.network_address += str(self.port)
-        self.data_network_address += str(self.data_port)
+        # Network parameters, if tcp port is not set, one is assigned at server start;
+        # slave connects to running data server, so can't do with address made up at start:
+        if self.data_port is None and not self.data_master and \
+                not is_complete(self.data_network_address, self.transport):
+            raise ValueError('Data slave environment requires `data_port` to be set.')
+
+        self.network_address = get_address(self.network_address, self.port, self.transport, 'server')
+        self.data_network_address = get_address(
+            self.data_network_address, self.data_port, self.transport, 'data'
+        )
 
         # Set server rendering:
         if self.render_enabled:
@@ -371,7 +379,7 @@ class MultiDiscreteEnv(BTgymEnv):
         self.env_response = None
 
         # if not self.data_master:
-        self._start_server()
+        self._start_server(wait=self.wait_server)
         self.closed = False
 
         self.log.info('Environment is ready.')
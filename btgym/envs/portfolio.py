@@ -29,6 +29,7 @@ from btgym import BTgymRendering, DictSpace, ActionDictSpace
 from btgym.rendering import BTgymNullRendering
 
 from btgym.envs.base import BTgymEnv
+from btgym.ports import get_address, is_complete
 
 
 class PortfolioEnv(BTgymEnv):
@@ -289,9 +290,16 @@ class PortfolioEnv(BTgymEnv):
         # Random seeding:
         np.random.seed(self.random_seed)
 
-        # Network parameters:
-        self.network_address += str(self.port)
-        self.data_network_address += str(self.data_port)
+        # Network parameters, if tcp port is not set, one is assigned at server start;
+        # slave connects to running data server, so can't do with address made up at start:
+        if self.data_port is None and not self.data_master and \
+                not is_complete(self.data_network_address, self.transport):
+            raise ValueError('Data slave environment requires `data_port` to be set.')
+
+        self.network_address = get_address(self.network_address, self.port, self.transport, 'server')
+        self.data_network_address = get_address(
+            self.data_network_address, self.data_port, self.transport, 'data'
+        )
 
         # Set server rendering:
         if self.render_enabled:
@@ -422,7 +430,7 @@ class PortfolioEnv(BTgymEnv):
         self.env_response = None
 
         # if not self.data_master:
-        self._start_server()
+        self._start_server(wait=self.wait_server)
         self.closed = False
 
         self.log.info('Environment is ready.')
@@ -432,17 +440,15 @@ class PortfolioEnv(BTgymEnv):
         action[self.cash_name] = np.asarray([1.0])
         return action
 
-    def step(self, action):
+    def _get_action_message(self, action):
         """
-        Implementation of OpenAI Gym env.step() method.
-        Makes a step in the environment.
+        Checks action and environment state; portfolio actions are sent to server as is.
 
         Args:
-            action:     int or dict, action compatible to env.action_space
+            action:     dict, action compatible to env.action_space
 
         Returns:
-            tuple (Observation, Reward, Info, Done)
-
+            dictionary: {'action': action}
         """
         # Are you in the list, ready to go and all that?
         if self.action_space.contains(action) \
@@ -466,16 +472,4 @@ class PortfolioEnv(BTgymEnv):
             self.log.exception(msg)
             raise AssertionError(msg)
 
-        # print('step: ', action, action_as_dict)
-        env_response = self._comm_with_timeout(
-            socket=self.socket,
-            message={'action': action}
-        )
-        if not env_response['status'] in 'ok':
-            msg = '.step(): server unreachable with status: <{}>.'.format(env_response['status'])
-            self.log.error(msg)
-            raise ConnectionError(msg)
-
-        self.env_response = env_response['message']
-
-        return self.env_response
+        return {'action': action}
@@ -0,0 +1,257 @@
+###############################################################################
+#
+# Copyright (C) 2017 Andrew Muzikin
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+from logbook import Logger, StreamHandler, WARNING
+import sys
+import time
+import zmq
+import numpy as np
+
+from collections import OrderedDict
+
+from btgym.envs.base import BTgymEnv
+from btgym.framing import recv_framed
+
+
+def stack_observations(observations):
+    """
+    Stacks list of (possibly nested dictionaries of) observations along new first dimension.
+
+    Args:
+        observations:   list of environment observations of same structure.
+
+    Returns:
+        observation of same structure with every array stacked.
+    """
+    first = observations[0]
+    if type(first) in [dict, OrderedDict]:
+        return type(first)([(key, stack_observations([o[key] for o in observations])) for key in first.keys()])
+
+    return np.stack([np.asarray(o) for o in observations])
+
+
+class VecBTgymEnv:
+    """
+    Runs several BTgym environments of same configuration, every one with its own server process,
+    and steps those concurrently: all actions are sent first, than responses are gathered as soon as
+    any server gets ready, so one slow episode step does not hold others. Episodes are reset same way.
+
+    Environment at first port is data master: it starts and controls data server all other environments
+    are fed from.
+
+    Note:
+        episodes ended are reset automatically; terminal observation of such episode is passed
+        as `terminal_observation` key of last step info dictionary, and first observation of new
+        episode is returned in its place.
+    """
+
+    def __init__(
+            self,
+            num_envs=2,
+            env_class=BTgymEnv,
+            port=5000,
+            data_port=4999,
+            auto_reset=True,
+            reset_kwargs=None,
+            task=0,
+            log_level=WARNING,
+            **kwargs
+    ):
+        """
+        Args:
+            num_envs:       int, number of environments to run;
+            env_class:      BTgymEnv class or subclass;
+            port:           int, first environment server port, next ones are `port + 1`, `port + 2`, ...;
+                            if None - ports are assigned by OS;
+            data_port:      int, data server port shared by all environments; if None - assigned by OS;
+            auto_reset:     bool, reset environment as soon as episode is done;
+            reset_kwargs:   dict, kwargs passed to every environment `reset()` when reset automatically;
+            task:           int, first environment id;
+            log_level:      int, logbook level;
+            **kwargs:       environment kwargs, same for all environments.
+        """
+        if kwargs.get('in_process', False):
+            raise ValueError('In-process environments can not be stepped concurrently, set `in_process=False`.')
+
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.reset_kwargs = reset_kwargs or {}
+        self.task = task
+        self.log_level = log_level
+
+        StreamHandler(sys.stdout).push_application()
+        self.log = Logger('VecBTgymEnv_{}'.format(self.task), level=self.log_level)
+
+        # Servers are started concurrently, see below:
+        kwargs['wait_server'] = False
+        start_time = time.time()
+        self.envs = []
+        for i in range(self.num_envs):
+            env = env_class(
+                port=port + i if port is not None else None,
+                data_port=data_port,
+                data_master=i == 0,
+                task=task + i,
+                log_level=log_level,
+                **kwargs
+            )
+            # Slaves connect to data server master has started:
+            data_port = env.data_port
+            kwargs['data_network_address'] = env.data_network_address
+            self.envs.append(env)
+
+        # Servers are started concurrently, now wait for every one to get ready:
+        for i, env in enumerate(self.envs):
+            env.connect_server()
+            self.log.info('set BTGym environment {} @ port:{}, data_port:{}'.format(task + i, env.port, data_port))
+
+        self.log.info('{} environments started in {:.2f} sec.'.format(self.num_envs, time.time() - start_time))
+
+        self.observation_space = self.envs[0].observation_space
+        self.action_space = self.envs[0].action_space
+        self.connect_timeout = self.envs[0].connect_timeout
+
+    def reset(self, **kwargs):
+        """
+        Starts new episode in every environment.
+
+        Args:
+            kwargs:     passed through to every environment `reset()`.
+
+        Returns:
+            stacked observations
+        """
+        return stack_observations(self._reset_envs(range(self.num_envs), **kwargs))
+
+    def _reset_envs(self, indices, **kwargs):
+        """
+        Starts new episode in environments given: every server is signalled to reset first,
+        than initial responses are gathered, so episodes get prepared concurrently.
+
+        Args:
+            indices:    environments indices;
+            kwargs:     passed through to every environment `reset()`.
+
+        Returns:
+            list of initial observations
+        """
+        for i in indices:
+            self.envs[i]._prepare_reset(**kwargs)
+
+        responses = self._exchange(
+            indices,
+            [self.envs[i]._get_action_message(self.envs[i].get_initial_action()) for i in indices],
+            'reset()',
+        )
+        observations = []
+        for i, response in zip(indices, responses):
+            env = self.envs[i]
+            env.env_response = response
+            env._assert_response(response)
+            env._assert_observation()
+            observations.append(response[0])
+
+        return observations
+
+    def _exchange(self, indices, messages, caller):
+        """
+        Sends messages to environments servers, than gathers responses in order servers get ready.
+
+        Args:
+            indices:    environments indices;
+            messages:   list of messages, one per environment;
+            caller:     str, method name for error messages.
+
+        Returns:
+            list of responses, same order as `indices`
+        """
+        poller = zmq.Poller()
+        pending = {}
+        for n, (i, message) in enumerate(zip(indices, messages)):
+            env = self.envs[i]
+            try:
+                env.socket.send_pyobj(message)
+
+            except zmq.ZMQError as e:
+                msg = '.{}: environment {} server unreachable with error: <{}>.'.format(caller, env.task, e)
+                self.log.error(msg)
+                raise ConnectionError(msg)
+
+            poller.register(env.socket, zmq.POLLIN)
+            pending[env.socket] = n
+
+        responses = [None] * len(messages)
+        while pending:
+            ready = poller.poll(self.connect_timeout * 1000)
+            if not ready:
+                msg = '.{}: environments {} servers unreachable with status: <receive_timeout>.'.format(
+                    caller,
+                    [self.envs[indices[n]].task for n in pending.values()]
+                )
+                self.log.error(msg)
+                raise ConnectionError(msg)
+
+            for socket, _ in ready:
+                n = pending.pop(socket)
+                poller.unregister(socket)
+                responses[n] = recv_framed(socket)
+
+        return responses
+
+    def step(self, actions):
+        """
+        Makes a step in every environment.
+
+        Args:
+            actions:    list of actions, one per environment, each compatible to env.action_space
+
+        Returns:
+            tuple (stacked observations, rewards array, dones array, list of infos)
+        """
+        assert len(actions) == self.num_envs, \
+            'Expected {} actions, got: {}'.format(self.num_envs, len(actions))
+
+        # Check all actions prior to sending any:
+        messages = [env._get_action_message(action) for env, action in zip(self.envs, actions)]
+
+        responses = self._exchange(range(self.num_envs), messages, 'step()')
+        for env, response in zip(self.envs, responses):
+            env.env_response = response
+
+        observations, rewards, dones, infos = [list(item) for item in zip(*responses)]
+
+        if self.auto_reset:
+            done_indices = [i for i in range(self.num_envs) if dones[i]]
+            for i, observation in zip(done_indices, self._reset_envs(done_indices, **self.reset_kwargs)):
+                infos[i][-1]['terminal_observation'] = observations[i]
+                observations[i] = observation
+
+        return (
+            stack_observations(observations),
+            np.asarray(rewards, dtype=np.float64),
+            np.asarray(dones, dtype=bool),
+            infos,
+        )
+
+    def close(self):
+        """
+        Closes all environments, data master one goes last.
+        """
+        for env in reversed(self.envs):
+            env.close()
@@ -0,0 +1,163 @@
+###############################################################################
+#
+# Copyright (C) 2017 Andrew Muzikin
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+import zmq
+
+# Arrays smaller than that are pickled within header, bigger ones are sent as separate frames
+# (same as zmq.COPY_THRESHOLD: smaller frames get copied by zmq anyway):
+MIN_FRAME_SIZE = 2 ** 16
+
+# Types never holding arrays, skipped without further checks:
+_LEAF_TYPES = {str, bytes, int, float, bool, type(None)}
+
+
+class ArrayFrame:
+    """
+    Header placeholder marker: (ArrayFrame, frame, dtype, shape) tuple stands for array sent as separate frame.
+    Plain tuples with marker class pickle by far cheaper than any custom instances.
+    """
+    pass
+
+
+def _encode(obj, frames, min_frame_size):
+    obj_type = type(obj)
+    if obj_type in _LEAF_TYPES:
+        return obj
+
+    if obj_type is np.ndarray:
+        if obj.dtype.hasobject or obj.nbytes < min_frame_size:
+            return obj
+
+        frames.append(np.ascontiguousarray(obj))
+        return ArrayFrame, len(frames), obj.dtype.str, obj.shape
+
+    if obj_type in (dict, OrderedDict):
+        return obj_type([(key, _encode(value, frames, min_frame_size)) for key, value in obj.items()])
+
+    if obj_type is tuple:
+        return tuple([_encode(value, frames, min_frame_size) for value in obj])
+
+    return obj
+
+
+def _decode(obj, frames):
+    obj_type = type(obj)
+    if obj_type in _LEAF_TYPES:
+        return obj
+
+    if obj_type is tuple and len(obj) == 4 and obj[0] is ArrayFrame:
+        array = np.frombuffer(frames[obj[1]], dtype=obj[2]).reshape(obj[3])
+        if not array.flags.writeable:
+            # Read-only buffer, e.g. bytes: copy, so array is writable as unpickled one would be:
+            array = array.copy()
+
+        return array
+
+    if obj_type in (dict, OrderedDict):
+        return obj_type([(key, _decode(value, frames)) for key, value in obj.items()])
+
+    if obj_type is tuple:
+        return tuple([_decode(value, frames) for value in obj])
+
+    return obj
+
+
+def pack(obj, min_frame_size=MIN_FRAME_SIZE):
+    """
+    Serializes object as multipart message: header frame, holding pickled object structure with
+    big numpy arrays replaced by their dtypes and shapes, followed by raw buffers of those arrays,
+    one frame per array. Arrays are looked up within nested dictionaries and tuples only,
+    e.g. observation dictionaries; lists are left for pickle as is.
+
+    Args:
+        obj:                object to serialize;
+        min_frame_size:     int, arrays smaller than that many bytes are pickled within header.
+
+    Returns:
+        list of frames: [header bytes, array_1, ..., array_n]; if there is no big arrays,
+        single frame is same as one `socket.send_pyobj()` sends.
+    """
+    frames = []
+    header = _encode(obj, frames, min_frame_size)
+    return [pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)] + frames
+
+
+def unpack(frames):
+    """
+    Restores object serialized by `pack()` or `socket.send_pyobj()`.
+
+    Args:
+        frames:     list of bytes or zmq.Frame instances.
+
+    Returns:
+        object; arrays sent as separate frames are views of received buffers.
+
+    Note:
+        arrays are writable, same as unpickled ones: zero-copy frames received by `recv_framed()` are
+        writable buffers owned by receiver, so arrays are their views and modifying those in place is safe.
+        Frames given as read-only buffers (bytes, or zmq frames with pyzmq versions exposing
+        those read-only) cost one extra copy of every array.
+    """
+    buffers = [frame.buffer if hasattr(frame, 'buffer') else frame for frame in frames]
+    header = pickle.loads(buffers[0])
+    if len(buffers) == 1:
+        return header
+
+    return _decode(header, buffers)
+
+
+def send_framed(socket, obj, flags=0):
+    """
+    Sends object via zmq socket as multipart message, big arrays buffers are not copied.
+    """
+    if getattr(socket, 'in_process', False):
+        return socket.send_pyobj(obj)
+
+    frames = pack(obj)
+    if len(frames) == 1:
+        return socket.send(frames[0], flags=flags)
+
+    socket.send(frames[0], flags=flags | zmq.SNDMORE)
+    return socket.send_multipart(frames[1:], flags=flags, copy=False)
+
+
+def recv_framed(socket, flags=0):
+    """
+    Receives object sent by `send_framed()` or `send_pyobj()` via zmq socket.
+    """
+    if getattr(socket, 'in_process', False):
+        return socket.recv_pyobj()
+
+    frames = [socket.recv(flags=flags)]
+    while socket.getsockopt(zmq.RCVMORE):
+        frames.append(socket.recv(flags=flags, copy=False))
+
+    return unpack(frames)
+
+
+async def async_recv_framed(socket):
+    """
+    Coroutine: receives object sent by `send_framed()` or `send_pyobj()` via `zmq.asyncio` socket.
+    """
+    frames = await socket.recv_multipart(copy=False)
+    return unpack(frames)
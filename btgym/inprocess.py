@@ -0,0 +1,202 @@
+###############################################################################
+#
+# Copyright (C) 2017 Andrew Muzikin
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import copy
+import datetime
+import queue
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import zmq
+
+# Closed channel marker:
+_CLOSED = object()
+
+# Immutable types, passed as is:
+_LEAF_TYPES = {
+    str, bytes, int, float, bool, complex, type(None),
+    datetime.datetime, datetime.date, datetime.timedelta,
+    np.float64, np.float32, np.int64, np.int32, np.bool_,
+}
+
+
+def snapshot(obj):
+    """
+    Copies parts of object sender may still change after sending, same way as `btgym.framing` walks objects:
+    dictionaries, tuples and lists are copied recursively, writable numpy arrays - by value.
+    Immutable values and read-only arrays (e.g. views of episode data or cached features) are passed as is,
+    any other objects are deep-copied.
+
+    Note:
+        Strategy keeps reusing its state buffers (see BTgymBaseStrategy.get_internal_state()) and
+        metadata dictionaries, so those do need copying, while observation slices of read-only
+        data are by far the largest part of step response and need not.
+    """
+    obj_type = type(obj)
+    if obj_type in _LEAF_TYPES:
+        return obj
+
+    if obj_type is np.ndarray:
+        if obj.flags.writeable or obj.dtype.hasobject:
+            return obj.copy()
+
+        return obj
+
+    if obj_type in (dict, OrderedDict):
+        return obj_type([(key, snapshot(value)) for key, value in obj.items()])
+
+    if obj_type in (tuple, list):
+        return obj_type([snapshot(value) for value in obj])
+
+    return copy.deepcopy(obj)
+
+
+class InProcessSocket:
+    """
+    One end of in-process duplex channel, mimicking part of zmq socket API BTgym env and server use.
+    Objects are passed as is, with no serialization: sending one only puts it into peer's inbox queue.
+    """
+    # Tells `btgym.framing` to pass objects through:
+    in_process = True
+
+    def __init__(self, inbox, outbox, copy_sent=False):
+        """
+        Args:
+            inbox:      queue to receive from;
+            outbox:     queue to send to;
+            copy_sent:  bool, send snapshots of objects (see `snapshot()`): receiver can't see sender changes
+                        made afterwards, same as with serializing transport; otherwise objects are sent as is
+                        and should not be changed by either side.
+        """
+        self.inbox = inbox
+        self.outbox = outbox
+        self.copy_sent = copy_sent
+        self.closed = False
+        self.timeout = None
+
+    def setsockopt(self, option, value):
+        """
+        Only zmq.RCVTIMEO option is supported, others are ignored.
+        """
+        if option == zmq.RCVTIMEO:
+            self.timeout = value / 1000 if value >= 0 else None
+
+    def send_pyobj(self, obj, flags=0):
+        if self.closed:
+            raise zmq.ZMQError(zmq.ENOTSOCK)
+
+        self.outbox.put(snapshot(obj) if self.copy_sent else obj)
+
+    def recv_pyobj(self, flags=0):
+        if self.closed:
+            raise zmq.ZMQError(zmq.ENOTSOCK)
+
+        try:
+            obj = self.inbox.get(timeout=self.timeout)
+
+        except queue.Empty:
+            raise zmq.Again()
+
+        if obj is _CLOSED:
+            self.closed = True
+            raise zmq.ContextTerminated()
+
+        return obj
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            # Wake up peer waiting to receive, if any:
+            self.outbox.put(_CLOSED)
+
+    def interrupt(self):
+        """
+        Makes this end waiting to receive, if any, fail as closed.
+        """
+        self.inbox.put(_CLOSED)
+
+
+class InProcessContext:
+    """
+    Pair of connected `InProcessSocket` ends: `client` one for environment and `server` one for BTgymServer.
+    Replaces zmq context and REQ/REP sockets pair when environment runs its server in-process.
+    """
+
+    def __init__(self, copy_sent=True):
+        """
+        Args:
+            copy_sent:  bool, server sends snapshots of responses, so environment gets observations and info
+                        it can keep; only parts server can still change (state buffers, dictionaries) get copied.
+                        If False, responses are sent as is: observations returned are valid until next step only
+                        and should not be changed by agent.
+        """
+        to_server = queue.Queue()
+        to_client = queue.Queue()
+        self.client = InProcessSocket(inbox=to_client, outbox=to_server)
+        self.server = InProcessSocket(inbox=to_server, outbox=to_client, copy_sent=copy_sent)
+        self.closed = False
+
+    def destroy(self):
+        self.client.close()
+        self.server.close()
+        self.closed = True
+
+
+class BTgymServerThread(threading.Thread):
+    """
+    Runs BTgymServer control and episode loops in thread of environment process; mimics part of
+    multiprocessing.Process API environment uses to manage server.
+
+    Cerebro drives episode by its own call stack, so episode can't be suspended by `yield` at every agent step;
+    server thread waiting on channel queue takes that role: only one of environment and server threads runs
+    at any time, and control is handed over with every message.
+    """
+
+    def __init__(self, server):
+        """
+        Args:
+            server:     BTgymServer instance with in-process `channel` set.
+        """
+        super(BTgymServerThread, self).__init__(name='BTgymServer_{}'.format(server.task))
+        self.server = server
+        self.exitcode = None
+
+    @property
+    def pid(self):
+        return None
+
+    def run(self):
+        try:
+            self.server.run()
+            self.exitcode = 0
+
+        except (zmq.ContextTerminated, zmq.ZMQError):
+            # Channel closed by environment:
+            self.exitcode = 0
+
+        except Exception:
+            self.exitcode = 1
+            raise
+
+    def terminate(self):
+        """
+        Interrupts server end of channel; server thread exits as soon as it waits for next message.
+        """
+        self.server.channel.interrupt()
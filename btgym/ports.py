@@ -0,0 +1,176 @@
+###############################################################################
+#
+# Copyright (C) 2017 Andrew Muzikin
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import psutil
+
+# Supported zmq transports for env -- server and server -- data_server channels:
+transports = ('tcp', 'ipc')
+
+# Directories made for unique ipc socket paths by this process, see release_address():
+_temp_dirs = set()
+
+
+def get_address(address, port, transport='tcp', name='server'):
+    """
+    Composes server network address for given transport.
+
+    Args:
+        address:    base address, e.g. `tcp://127.0.0.1:`; complete address (with port or `ipc://` path)
+                    is returned as is
+        port:       int or None; tcp: if None, port is to be assigned by OS at server start,
+                    ipc: socket path is derived from port, unique path is made if None
+        transport:  `tcp` or `ipc` - unix domain socket, server should run on same host
+        name:       channel name, part of ipc socket path
+
+    Returns:
+        network address, str
+    """
+    if transport == 'ipc':
+        if address.startswith('ipc://'):
+            return address
+
+        if port is None:
+            temp_dir = tempfile.mkdtemp(prefix='btgym_')
+            _temp_dirs.add(temp_dir)
+            return 'ipc://' + os.path.join(temp_dir, name)
+
+        return 'ipc://' + os.path.join(tempfile.gettempdir(), 'btgym_{}_{}'.format(name, port))
+
+    elif transport == 'tcp':
+        if address.endswith(':') and port is not None:
+            return address + str(port)
+
+        return address
+
+    else:
+        raise ValueError('Expected transport to be one of {}, got: {}'.format(transports, transport))
+
+
+def is_complete(address, transport='tcp'):
+    """
+    Returns:
+        True if address can be connected to as is: has tcp port or is `ipc://` path.
+    """
+    if transport == 'ipc':
+        return address.startswith('ipc://')
+
+    return not address.endswith(':')
+
+
+def release_address(address):
+    """
+    Removes directory made by `get_address()` for unique ipc socket path, if any;
+    should be called once server bound to address is stopped.
+    """
+    if not address.startswith('ipc://'):
+        return
+
+    temp_dir = os.path.dirname(address[len('ipc://'):])
+    if temp_dir in _temp_dirs:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        _temp_dirs.discard(temp_dir)
+
+
+def clear_ports(ports, log=None):
+    """
+    Kills processes listening on any of given local TCP ports, if any.
+    Host connections are scanned once for all ports; falls back to `lsof` per port if scan is not permitted.
+
+    Args:
+        ports:  list of int, ports to clear; None entries are ignored
+        log:    logbook.Logger instance or None
+    """
+    ports = set([int(port) for port in ports if port is not None])
+    if len(ports) == 0:
+        return
+
+    try:
+        pids = set(
+            [
+                conn.pid for conn in psutil.net_connections(kind='tcp')
+                if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr[1] in ports
+                and conn.pid is not None
+            ]
+        )
+
+    except psutil.AccessDenied:
+        pids = set()
+        for port in ports:
+            output = subprocess.run(
+                ['lsof', '-i:{}'.format(port), '-t'],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            ).stdout
+            pids.update([int(pid) for pid in output.decode().split()])
+
+    pids.discard(os.getpid())
+
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+            if log is not None:
+                log.info('process {} listening on one of ports {} killed'.format(pid, sorted(ports)))
+
+        except OSError:
+            pass
+
+
+def wait_ready(connection, timeout, name='Server'):
+    """
+    Waits for server process to report network address it has bound to.
+
+    Args:
+        connection:     receiving end of multiprocessing.Pipe passed to server process as `ready`
+        timeout:        seconds to wait
+        name:           server name for error message
+
+    Returns:
+        server network address, str
+    """
+    try:
+        if not connection.poll(timeout):
+            raise ConnectionError('{} not ready in {} seconds.'.format(name, timeout))
+
+        return connection.recv()
+
+    except EOFError:
+        raise ConnectionError('{} exited before getting ready.'.format(name))
+
+    finally:
+        connection.close()
+
+
+def bind(socket, address):
+    """
+    Binds zmq socket to address; if no port is specified (address ends with `:`), binds to port assigned by OS.
+
+    Returns:
+        actual network address socket has bound to, str
+    """
+    if address.endswith(':'):
+        port = socket.bind_to_random_port(address[:-1])
+        return address + str(port)
+
+    socket.bind(address)
+    return address
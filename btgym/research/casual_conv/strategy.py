@@ -6,6 +6,7 @@ import backtrader.indicators as btind
 from backtrader import Indicator
 
 from btgym.strategy.utils import tanh, exp_scale
+from btgym.strategy.features import episode_line, rolling_max, rolling_min
 
 from btgym.research.gps.strategy import GuidedStrategy_0_0
 from btgym.research.strategy_gen_4 import DevStrat_4_12
@@ -108,9 +109,10 @@ class CasualConvStrategy(DevStrat_4_12):
     )
 
     def set_datalines(self):
-        self.data.features = [
-            btind.SimpleMovingAverage(self.datas[0], period=period) for period in self.features_parameters
-        ]
+        if not self.p.precompute_features:
+            self.data.features = [
+                btind.SimpleMovingAverage(self.datas[0], period=period) for period in self.features_parameters
+            ]
 
         self.data.dim_sma = btind.SimpleMovingAverage(
             self.datas[0],
@@ -260,9 +262,6 @@ class CasualConvStrategy_0(CasualConvStrategy):
     )
 
     def set_datalines(self):
-        features_low = [MinPool(self.data, period=period) for period in self.features_parameters]
-        features_high = [MaxPool(self.data, period=period) for period in self.features_parameters]
-
         # If `scale` was scalar - make it vector:
         if len(np.asarray(self.p.state_ext_scale).shape) < 1:
             self.p.state_ext_scale = np.repeat(np.asarray(self.p.state_ext_scale), self.num_features)
@@ -270,9 +269,13 @@ class CasualConvStrategy_0(CasualConvStrategy):
         # Sort features by `period` for .get_external_state() to estimate
         # more or less sensible gradient; double-stretch scale vector accordingly:
         # TODO: maybe 2 separate conv. encoders for hi/low?
-        self.data.features = []
-        for f1, f2 in zip(features_low, features_high):
-            self.data.features += [f1, f2]
+        if not self.p.precompute_features:
+            features_low = [MinPool(self.data, period=period) for period in self.features_parameters]
+            features_high = [MaxPool(self.data, period=period) for period in self.features_parameters]
+
+            self.data.features = []
+            for f1, f2 in zip(features_low, features_high):
+                self.data.features += [f1, f2]
 
         self.p.state_ext_scale = np.repeat(self.p.state_ext_scale, 2)
 
@@ -284,6 +287,24 @@ class CasualConvStrategy_0(CasualConvStrategy):
         )
         self.data.dim_sma.plotinfo.plot = False
 
+    def get_episode_features(self, data):
+        """
+        Computes same signals MinPool and MaxPool indicators provide, for entire data feed at once.
+
+        Args:
+            data:   bt.feed, either episode or trial one
+
+        Returns:
+            array of shape [num_records, 2 * num_features]
+        """
+        low = episode_line(data, 'low')
+        high = episode_line(data, 'high')
+        features = []
+        for period in self.features_parameters:
+            features += [rolling_min(low, period), rolling_max(high, period)]
+
+        return np.stack(features, axis=-1)
+
 
 import scipy.signal as signal
 from scipy.stats import zscore
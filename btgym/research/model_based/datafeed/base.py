@@ -438,7 +438,7 @@ class BaseDataGenerator:
 
         return sample_instance
 
-    def describe(self):
+    def describe(self, *args, **kwargs):
         """
         Returns summary dataset statistic as pandas dataframe:
 
@@ -11,6 +11,7 @@ import time
 from btgym.research.strategy_gen_5.base import BaseStrategy5
 from btgym.strategy.utils import tanh
 from btgym.research.model_based.model import PairFilteredModel
+from btgym.research.model_based.utils import RollingSSA
 
 
 class MonoSpreadOUStrategy_0(BaseStrategy5):
@@ -251,7 +252,7 @@ class MonoSpreadOUStrategy_0(BaseStrategy5):
         # Potential-based shaping function 1:
         # based on potential of averaged profit/loss for current opened trade (unrealized p/l):
         unrealised_pnl = np.asarray(self.broker_stat['unrealized_pnl'])
-        current_pos_duration = self.broker_stat['pos_duration'][-1]
+        current_pos_duration = int(self.broker_stat['pos_duration'][-1])
 
         # We want to estimate potential `fi = gamma*fi_prime - fi` of current opened position,
         # thus need to consider different cases given skip_fame parameter:
@@ -544,7 +545,7 @@ class PairSpreadStrategy_0(MonoSpreadOUStrategy_0):
         # Potential-based shaping function 1:
         # based on potential of averaged profit/loss for current opened trade (unrealized p/l):
         unrealised_pnl = np.asarray(self.broker_stat['unrealized_pnl'])
-        current_pos_duration = self.broker_stat['pos_duration'][-1]
+        current_pos_duration = int(self.broker_stat['pos_duration'][-1])
 
         # We want to estimate potential `fi = gamma*fi_prime - fi` of current opened position,
         # thus need to consider different cases given skip_fame parameter:
@@ -780,6 +781,9 @@ class PairStrategyPFD_0(PairSpreadStrategy_0):
         self.max_feature_period = max(self.p.features_parameters)
         self.p.ssa_window = 10
         self.p.ssa_grouping = [[None, 1], [1, 4], [4, None]]
+        # Lag covariances of both assets trajectories are updated with every new bar:
+        self.ssa = RollingSSA(window=self.p.ssa_window, length=self.p.time_dim, num_series=2)
+        self.ssa_last_bar = None
 
     @staticmethod
     def ema(x, period=10, gamma=1.0):
@@ -807,17 +811,12 @@ class PairStrategyPFD_0(PairSpreadStrategy_0):
         for Processes with Unit Roots and Cointegration`, 2008; pt. 2.2
         """
         J = np.ones([n - window + 1, 1])
-        pad = n - window
-        B = np.asarray(
-            [
-                np.pad(x[i, :], [i, pad - i], mode='constant', constant_values=[np.nan, np.nan])
-                for i in range(x.shape[0])
-            ]
-        )
-        B = np.ma.masked_array(B, mask=np.isnan(B))
-        s = 1 / np.logical_not(B.mask).sum(axis=0)
-        B[B.mask] = 0.0
-        return B.data, J, s
+        # Row i holds x[i, :] shifted by i, zero-padded:
+        rows = np.arange(x.shape[0])[:, None]
+        B = np.zeros([x.shape[0], n])
+        B[rows, rows + np.arange(window)] = x
+        s = 1 / np.bincount((rows + np.arange(window)).ravel(), minlength=n)
+        return B, J, s
 
     def ssa_reconstruct(self, X, U, n, window, grouping=None):
         """
@@ -851,13 +850,21 @@ class PairStrategyPFD_0(PairSpreadStrategy_0):
         x1 = np.asarray(self.datas[0].get(size=self.p.time_dim))
         x2 = np.asarray(self.datas[1].get(size=self.p.time_dim))
 
-        x1 /= np.clip(x1.std(), 1e-8, None)
-        x2 /= np.clip(x2.std(), 1e-8, None)
-        x = x2 - x1
-        # Get  decomposition:
-        X, U, _, _ = self.ssa_decomp(x, self.p.ssa_window)
+        current_bar = len(self.data)
+        self.ssa.update(
+            [x1, x2],
+            steps=None if self.ssa_last_bar is None else current_bar - self.ssa_last_bar
+        )
+        self.ssa_last_bar = current_bar
+
+        std1 = np.clip(x1.std(), 1e-8, None)
+        std2 = np.clip(x2.std(), 1e-8, None)
+        x = x2 / std2 - x1 / std1
+
+        # Get  decomposition, same as .ssa_decomp() and .ssa_reconstruct() give:
+        U = self.ssa.decompose([-1 / std1, 1 / std2])
 
-        x_ssa_bank = self.ssa_reconstruct(X, U, len(x), self.p.ssa_window, grouping=self.p.ssa_grouping).T
+        x_ssa_bank = self.ssa.reconstruct(x, U, grouping=self.p.ssa_grouping).T
 
         # Gradient along features axis:
         dx = np.gradient(x_ssa_bank, axis=-1)
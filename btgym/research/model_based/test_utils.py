@@ -0,0 +1,51 @@
+
+import unittest
+import numpy as np
+
+from btgym.research.model_based.utils import RollingSSA
+from btgym.research.model_based.strategy import PairStrategyPFD_0
+
+
+class RollingSSATest(unittest.TestCase):
+    """Testing rolling SSA against full decomposition PairStrategyPFD_0 used to run every step"""
+
+    window = 10
+    length = 128
+    grouping = [[None, 1], [1, 4], [4, None]]
+
+    def reference(self, x1, x2):
+        x = x2 / np.clip(x2.std(), 1e-8, None) - x1 / np.clip(x1.std(), 1e-8, None)
+        X, U, _, _ = PairStrategyPFD_0.ssa_decomp(PairStrategyPFD_0, x, self.window)
+        return PairStrategyPFD_0.ssa_reconstruct(
+            PairStrategyPFD_0, X, U, len(x), self.window, grouping=self.grouping
+        )
+
+    def test_reconstruction_matches_full_decomposition(self):
+        rnd = np.random.RandomState(0)
+        num_bars = 2000
+        prices = 1.1 + np.cumsum(rnd.normal(scale=1e-4, size=[2, num_bars]), axis=-1)
+        prices[1] += 0.5 * (prices[0] - 1.1)
+
+        ssa = RollingSSA(window=self.window, length=self.length, num_series=2, recompute_period=500)
+        last_bar = None
+        bar = self.length
+        while bar < num_bars:
+            x1, x2 = prices[:, bar - self.length: bar]
+            ssa.update([x1, x2], steps=None if last_bar is None else bar - last_bar)
+            last_bar = bar
+
+            std1 = np.clip(x1.std(), 1e-8, None)
+            std2 = np.clip(x2.std(), 1e-8, None)
+            u = ssa.decompose([-1 / std1, 1 / std2])
+            components = ssa.reconstruct(x2 / std2 - x1 / std1, u, grouping=self.grouping)
+
+            self.assertTrue(
+                np.allclose(components, self.reference(x1, x2), rtol=1e-6, atol=1e-6),
+                'Mismatch at bar {}'.format(bar)
+            )
+            # Irregular steps, as with skip_frame > 1:
+            bar += 1 + bar % 3
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -146,5 +146,124 @@ def ou_variance(l, sigma, **kwargs):
     return np.clip(sigma**2, 0, None) / (2 * np.clip(l, 1e-10, None))
 
 
+class RollingSSA:
+    """
+    Singular spectrum analysis over sliding window of linear combination of several series,
+    e.g. normalized pair spread `x2 / std2 - x1 / std1` with weights changing every step.
+
+    Lag cross-products of every pair of series trajectory matrices are kept as running sums,
+    updated in O(num_series^2 * window^2) per new value; lag covariance of any weighted combination is then
+    computed from these sums with no trajectory matrix built. Sums are recomputed from scratch
+    every `recompute_period` values to keep round-off from accumulating.
+    """
 
+    def __init__(self, window, length, num_series=1, recompute_period=1000):
+        """
+        Args:
+            window:             int, embedding window size
+            length:             int, number of last series values decomposed
+            num_series:         int, number of series to combine
+            recompute_period:   int, number of values after which running sums are recomputed
+        """
+        self.window = window
+        self.length = length
+        self.num_columns = length - window + 1
+        self.num_series = num_series
+        self.recompute_period = recompute_period
+
+        # Trajectory matrix entry [i, j] is series value i + j;
+        # diagonal averaging maps it back by anti-diagonal index:
+        self.diag_index = (np.arange(window)[:, None] + np.arange(self.num_columns)[None, :]).ravel()
+        self.diag_count = np.bincount(self.diag_index, minlength=length)
+
+        self.x = None
+        self.shift = None
+        self.lag_sums = None
+        self.lag_products = None
+        self.num_updates = 0
+
+    def embed(self, x):
+        """
+        Returns:
+            read-only trajectory (Hankel) matrices view of array of shape [..., length] as [..., window, num_columns]
+        """
+        x = np.ascontiguousarray(x)
+        return np.lib.stride_tricks.as_strided(
+            x,
+            shape=x.shape[:-1] + (self.window, x.shape[-1] - self.window + 1),
+            strides=x.strides + x.strides[-1:],
+            writeable=False,
+        )
 
+    def reset(self):
+        self.x = None
+
+    def update(self, x, steps=None):
+        """
+        Moves window forward.
+
+        Args:
+            x:      array of shape [num_series, length], last values of every series
+            steps:  int, number of new values since previous update; None forces recomputing
+        """
+        x = np.array(x, dtype=np.float64).reshape([self.num_series, self.length])
+        if self.x is None or steps is None or not 0 <= steps < self.num_columns or\
+                self.num_updates + steps >= self.recompute_period:
+            # Any constant shift leaves covariance unchanged but saves precision:
+            self.shift = x[:, -1:]
+            trajectory = self.embed(x - self.shift)
+            self.lag_sums = trajectory.sum(axis=-1)
+            self.lag_products = np.einsum('aik,bjk->abij', trajectory, trajectory)
+            self.num_updates = 0
+
+        elif steps > 0:
+            added = self.embed(x - self.shift)[..., -steps:]
+            removed = self.embed(self.x - self.shift)[..., :steps]
+            self.lag_sums += added.sum(axis=-1) - removed.sum(axis=-1)
+            self.lag_products += np.einsum('aik,bjk->abij', added, added) -\
+                np.einsum('aik,bjk->abij', removed, removed)
+            self.num_updates += steps
+
+        self.x = x
+
+    def decompose(self, weights):
+        """
+        Args:
+            weights:    array of shape [num_series], series linear combination coefficients
+
+        Returns:
+            lag covariance eigenvectors of series combination, ordered by decreasing eigenvalue, [window, window]
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        mean = weights.dot(self.lag_sums) / self.num_columns
+        products = np.einsum('a,b,abij->ij', weights, weights, self.lag_products)
+        covariance = (products - self.num_columns * np.outer(mean, mean)) / (self.num_columns - 1)
+        _, u = np.linalg.eigh(covariance)
+
+        return u[:, ::-1]
+
+    def reconstruct(self, x, u, grouping=None):
+        """
+        Returns SSA reconstruction w.r.t. given grouping.
+
+        Args:
+            x:          array of shape [length], series combination to reconstruct
+            u:          eigenvectors as returned by decompose()
+            grouping:   list of [start, stop] eigenvectors slices, default is one group per eigenvector
+
+        Returns:
+            array of shape [num_groups, length]
+        """
+        if grouping is None:
+            grouping = [[i, i + 1] for i in range(u.shape[-1])]
+
+        trajectory = self.embed(x)
+        components = []
+        for group in grouping:
+            u_group = u[:, slice(*group)]
+            reconstructed = u_group.dot(u_group.T.dot(trajectory))
+            components.append(
+                np.bincount(self.diag_index, weights=reconstructed.ravel(), minlength=self.length) / self.diag_count
+            )
+
+        return np.asarray(components)
@@ -6,6 +6,7 @@ import backtrader.indicators as btind
 
 from btgym.strategy.base import BTgymBaseStrategy
 from btgym.strategy.utils import tanh, abs_norm_ratio, exp_scale, discounted_average, log_transform
+from btgym.strategy.features import episode_line, sma
 
 from gym import spaces
 from btgym import DictSpace
@@ -155,6 +156,59 @@ class DevStrat_4_6(BTgymBaseStrategy):
 
         return x_market[:, None, :]
 
+    def get_broker_state(self, keys, size=None):
+        """
+        Copies latest values of selected broker statistics rows to preallocated array.
+
+        Args:
+            keys:   broker statistics names, ordered as features
+            size:   number of latest values to take, whole window if None
+
+        Returns:
+            array of shape [size, 1, len(keys)], overwritten on next call.
+        """
+        x_broker = self.broker_stat.view()
+        length = x_broker.shape[-1]
+        if size is None:
+            size = length
+
+        if self.broker_state is None or self.broker_state.shape != (size, 1, len(keys)):
+            # Window is not full yet or first call:
+            self.broker_state = np.empty([size, 1, len(keys)], dtype=x_broker.dtype)
+            self.broker_state_gradient = np.empty_like(self.broker_state)
+
+        for i, key in enumerate(keys):
+            self.broker_state[:, 0, i] = self.broker_stat[key][length - size:]
+
+        return self.broker_state
+
+    def get_broker_state_gradient(self, keys):
+        """
+        Same as `tanh(np.gradient(x, axis=-1) * state_int_scale)` of `get_broker_state(keys)` output,
+        computed in preallocated array.
+
+        Returns:
+            array of shape [window_length, 1, len(keys)], overwritten on next call.
+        """
+        x = self.get_broker_state(keys)
+        dx = self.broker_state_gradient
+
+        # np.gradient() with unit spacing, first order edges:
+        np.subtract(x[..., 1:2], x[..., 0:1], out=dx[..., 0:1])
+        np.subtract(x[..., -1:], x[..., -2:-1], out=dx[..., -1:])
+        np.subtract(x[..., 2:], x[..., :-2], out=dx[..., 1:-1])
+        np.divide(dx[..., 1:-1], 2.0, out=dx[..., 1:-1])
+
+        # tanh():
+        np.multiply(dx, self.p.state_int_scale, out=dx)
+        np.multiply(dx, -2, out=dx)
+        np.exp(dx, out=dx)
+        np.add(dx, 1, out=dx)
+        np.divide(2, dx, out=dx)
+        np.subtract(dx, 1, out=dx)
+
+        return dx
+
 
 class DevStrat_4_7(DevStrat_4_6):
     """
@@ -251,16 +305,10 @@ class DevStrat_4_7(DevStrat_4_6):
         super(DevStrat_4_7, self).__init__(**kwargs)
 
     def get_internal_state(self):
-        x_broker = np.stack(
-            [
-                self.broker_stat['value'][-1],
-                self.broker_stat['unrealized_pnl'][-1],
-                self.broker_stat['realized_pnl'][-1],
-                self.broker_stat['cash'][-1],
-                self.broker_stat['exposure'][-1],
-            ]
+        return self.get_broker_state(
+            ('value', 'unrealized_pnl', 'realized_pnl', 'cash', 'exposure'),
+            size=1
         )
-        return x_broker[None, None, :]
 
 
 class DevStrat_4_8(DevStrat_4_7):
@@ -353,23 +401,17 @@ class DevStrat_4_8(DevStrat_4_7):
     )
 
     def get_internal_state(self):
-        x_broker = np.concatenate(
-            [
-                np.asarray(self.broker_stat['value'])[..., None],
-                np.asarray(self.broker_stat['unrealized_pnl'])[..., None],
-                np.asarray(self.broker_stat['realized_pnl'])[..., None],
-                np.asarray(self.broker_stat['cash'])[..., None],
-                np.asarray(self.broker_stat['exposure'])[..., None],
-                # np.asarray(self.sliding_stat['episode_step'])[..., None],
-                # np.asarray(self.sliding_stat['reward'])[..., None],
-                # np.asarray(self.sliding_stat['action'])[..., None],
-                # norm_position_duration[...,None],
-                # max_unrealized_pnl[..., None],
-                # min_unrealized_pnl[..., None],
-            ],
-            axis=-1
+        return self.get_broker_state(
+            (
+                'value',
+                'unrealized_pnl',
+                'realized_pnl',
+                'cash',
+                'exposure',
+                # 'max_unrealized_pnl',
+                # 'min_unrealized_pnl',
+            )
         )
-        return x_broker[:, None, :]
 
 
 class DevStrat_4_9(DevStrat_4_7):
@@ -697,28 +739,10 @@ class DevStrat_4_11(DevStrat_4_10):
         return x[:, None, :]
 
     def get_internal_state(self):
-
-        x_broker = np.concatenate(
-            [
-                np.asarray(self.broker_stat['value'])[..., None],
-                np.asarray(self.broker_stat['unrealized_pnl'])[..., None],
-                np.asarray(self.broker_stat['realized_pnl'])[..., None],
-                np.asarray(self.broker_stat['cash'])[..., None],
-                np.asarray(self.broker_stat['exposure'])[..., None],
-                np.asarray(self.broker_stat['pos_direction'])[..., None],
-
-                # np.asarray(self.broker_stat['value'])[-self.p.skip_frame:, None],
-                # np.asarray(self.broker_stat['unrealized_pnl'])[-self.p.skip_frame:, None],
-                # np.asarray(self.broker_stat['realized_pnl'])[-self.p.skip_frame:, None],
-                # np.asarray(self.broker_stat['cash'])[-self.p.skip_frame:, None],
-                # np.asarray(self.broker_stat['exposure'])[-self.p.skip_frame:, None],
-                # np.asarray(self.broker_stat['pos_direction'])[-self.p.skip_frame:, None],
-            ],
-            axis=-1
+        x_broker = self.get_broker_state_gradient(
+            ('value', 'unrealized_pnl', 'realized_pnl', 'cash', 'exposure', 'pos_direction')
         )
-        x_broker = tanh(np.gradient(x_broker, axis=-1) * self.p.state_int_scale)
-        # return x_broker[:, None, :]
-        return np.clip(x_broker[:, None, :], -2, 2)
+        return np.clip(x_broker, -2, 2, out=x_broker)
 
 
 class DevStrat_4_11_1(DevStrat_4_11):
@@ -918,12 +942,19 @@ class DevStrat_4_12(DevStrat_4_11):
         gamma=gamma,
         reward_scale=1.0,
         metadata={},
+        precompute_features=True,
     )
 
+    def __init__(self, **kwargs):
+        # Signal features for entire episode, see .get_external_state():
+        self.episode_features = None
+        super(DevStrat_4_12, self).__init__(**kwargs)
+
     def set_datalines(self):
-        self.data.features = [
-            btind.SimpleMovingAverage(self.datas[0], period=period) for period in self.features_parameters
-        ]
+        if not self.p.precompute_features:
+            self.data.features = [
+                btind.SimpleMovingAverage(self.datas[0], period=period) for period in self.features_parameters
+            ]
 
         self.data.dim_sma = btind.SimpleMovingAverage(
             self.datas[0],
@@ -931,36 +962,70 @@ class DevStrat_4_12(DevStrat_4_11):
         )
         self.data.dim_sma.plotinfo.plot = False
 
-    def get_external_state(self):
+    def get_episode_features(self, data):
+        """
+        Computes same signals `data.features` indicators provide, for entire data feed at once.
 
-        x_sma = np.stack(
-            [
-                feature.get(size=self.time_dim) for feature in self.data.features
-            ],
-            axis=-1
+        Args:
+            data:   bt.feed, either episode or trial one
+
+        Returns:
+            array of shape [num_records, num_features]
+        """
+        close = episode_line(data, 'close')
+        return np.stack([sma(close, period) for period in self.features_parameters], axis=-1)
+
+    def get_features_spec(self):
+        """
+        Returns:
+            hashable key features computed by this strategy are cached by
+        """
+        return (
+            type(self).get_episode_features.__qualname__,
+            type(self).transform_features.__qualname__,
+            tuple(self.features_parameters),
+            tuple(np.ravel(self.p.state_ext_scale)),
         )
+
+    def transform_features(self, x):
         # Gradient along features axis:
-        dx = np.gradient(x_sma, axis=-1) * self.p.state_ext_scale
+        dx = np.gradient(x, axis=-1) * self.p.state_ext_scale
 
         # In [-1,1]:
-        x = tanh(dx)
+        return tanh(dx)
+
+    def get_external_state(self):
+        if self.p.precompute_features:
+            # Features are action-independent and get computed once per episode,
+            # so observation is just a window of last `time_dim` rows:
+            if self.episode_features is None:
+                compute = lambda data: self.transform_features(self.get_episode_features(data))
+                trial_features = getattr(self.env, '_trial_features', None)
+                if trial_features is not None:
+                    # Same trial features computed for previous episodes, if any:
+                    self.episode_features = trial_features.get(self.get_features_spec(), compute)
+
+                else:
+                    self.episode_features = compute(self.data)
+
+            current_bar = len(self.data)
+            x = self.episode_features[current_bar - self.time_dim: current_bar]
+
+        else:
+            x_sma = np.stack(
+                [
+                    feature.get(size=self.time_dim) for feature in self.data.features
+                ],
+                axis=-1
+            )
+            x = self.transform_features(x_sma)
+
         return x[:, None, :]
 
     def get_internal_state(self):
-
-        x_broker = np.concatenate(
-            [
-                np.asarray(self.broker_stat['value'])[..., None],
-                np.asarray(self.broker_stat['unrealized_pnl'])[..., None],
-                np.asarray(self.broker_stat['realized_pnl'])[..., None],
-                np.asarray(self.broker_stat['cash'])[..., None],
-                np.asarray(self.broker_stat['exposure'])[..., None],
-            ],
-            axis=-1
+        return self.get_broker_state_gradient(
+            ('value', 'unrealized_pnl', 'realized_pnl', 'cash', 'exposure')
         )
-        x_broker = tanh(np.gradient(x_broker, axis=-1) * self.p.state_int_scale)
-
-        return x_broker[:, None, :]
 
     def get_datetime_state(self):
         time = self.data.datetime.time()
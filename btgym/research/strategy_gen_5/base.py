@@ -24,9 +24,8 @@ from gym import spaces
 from btgym import DictSpace
 
 import numpy as np
-from collections import deque
 
-from btgym.strategy.utils import norm_value, decayed_result, exp_scale
+from btgym.strategy.utils import norm_value, decayed_result, exp_scale, RingBuffer
 
 
 ############################## Base BTgymStrategy Class ###################
@@ -211,6 +210,7 @@ class BaseStrategy5(bt.Strategy):
         self.broker_message = '_'
         self.final_message = '_'
         self.raw_state = None
+        self.raw_state_buffer = None
         self.time_stamp = 0
 
         # Configure state_shape:
@@ -331,7 +331,9 @@ class BaseStrategy5(bt.Strategy):
 
         # Broker and account related sliding statistics accumulators, globally normalized last `avg_perod` values,
         # so it's a bit more computationally efficient than use of bt.Observers:
-        self.broker_stat = {key: deque(maxlen=self.avg_period) for key in self.broker_datalines}
+        # kept in preallocated [statistic, time] ring buffer, updated in place:
+        self.broker_stat = RingBuffer(self.broker_datalines, self.avg_period)
+        self.broker_state = None
 
         # Add custom data Lines if any (convenience wrapper):
         self.set_datalines()
@@ -425,7 +427,7 @@ class BaseStrategy5(bt.Strategy):
 
     def update_broker_stat(self):
         """
-        Updates all sliding broker statistics deques with latest-step values such as:
+        Updates all sliding broker statistics with latest-step values such as:
             - normalized broker value
             - normalized broker cash
             - normalized exposure (position size)
@@ -440,14 +442,15 @@ class BaseStrategy5(bt.Strategy):
         positions = [self.env.broker.getposition(data) for data in self.datas]
         exposure = sum([abs(pos.size) for pos in positions])
 
-        for key, method in self.collection_get_broker_stat_methods.items():
-            self.broker_stat[key].append(
-                method(
+        self.broker_stat.append(
+            [
+                self.collection_get_broker_stat_methods[key](
                     current_value=current_value,
                     positions=positions,
                     exposure=exposure,
-                )
-            )
+                ) for key in self.broker_stat
+            ]
+        )
 
         # Reset one-time flags:
         self.trade_just_closed = False
@@ -610,17 +613,35 @@ class BaseStrategy5(bt.Strategy):
                 n - time-embedding length  == state_shape[0] == <set by user>.
 
         Note:
-            `self.raw_state` is used to render environment `human` mode and should not be modified.
+            `self.raw_state` is used to render environment `human` mode and should not be modified;
+            for BTgymNumpyData feed it is read-only float64 view of feed data, for any other feed
+            it is float32 array, overwritten every step.
 
         """
-        self.raw_state = np.row_stack(
-            (
-                np.frombuffer(self.data.open.get(size=self.time_dim)),
-                np.frombuffer(self.data.high.get(size=self.time_dim)),
-                np.frombuffer(self.data.low.get(size=self.time_dim)),
-                np.frombuffer(self.data.close.get(size=self.time_dim)),
-            )
-        ).T
+        # Only BTgymNumpyData provides data windows:
+        get_window = getattr(self.data, 'get_window', None)
+        if get_window is not None:
+            self.raw_state = get_window(('open', 'high', 'low', 'close'), self.time_dim)
+
+        else:
+            self.raw_state = None
+
+        if self.raw_state is None:
+            # Copy from line buffers to preallocated array:
+            if self.raw_state_buffer is None:
+                self.raw_state_buffer = np.empty([self.time_dim, 4], dtype=np.float32)
+
+            for i, line in enumerate([self.data.open, self.data.high, self.data.low, self.data.close]):
+                if line.useislice:
+                    # Bounded deque buffer, `exactbars` mode:
+                    self.raw_state_buffer[:, i] = line.get(size=self.time_dim)
+
+                else:
+                    # Window ends at current bar, with preload buffer already holds bars ahead:
+                    end = line.idx + 1
+                    self.raw_state_buffer[:, i] = np.frombuffer(line.array)[end - self.time_dim: end]
+
+            self.raw_state = self.raw_state_buffer
 
         return self.raw_state
 
@@ -630,11 +651,13 @@ class BaseStrategy5(bt.Strategy):
         Generally, this method should not be modified, implement corresponding get_broker_[mode]() methods.
 
         """
-        x_broker = np.concatenate(
-            [np.asarray(stat)[..., None] for stat in self.broker_stat.values()],
-            axis=-1
-        )
-        return x_broker[:, None, :]
+        x_broker = self.broker_stat.view()
+        if self.broker_state is None or self.broker_state.shape[0] != x_broker.shape[-1]:
+            # Window is not full yet or first call:
+            self.broker_state = np.empty([x_broker.shape[-1], 1, x_broker.shape[0]], dtype=x_broker.dtype)
+
+        np.copyto(self.broker_state[:, 0, :], x_broker.T)
+        return self.broker_state
 
     def get_metadata_state(self):
         self.metadata['timestamp'] = np.asarray(self._get_timestamp())
@@ -717,8 +740,8 @@ class BaseStrategy5(bt.Strategy):
 
         # Potential-based shaping function 1:
         # based on potential of averaged profit/loss for current opened trade (unrealized p/l):
-        unrealised_pnl = np.asarray(self.broker_stat['unrealized_pnl'])
-        current_pos_duration = self.broker_stat['pos_duration'][-1]
+        unrealised_pnl = self.broker_stat['unrealized_pnl']
+        current_pos_duration = int(self.broker_stat['pos_duration'][-1])
 
         # We want to estimate potential `fi = gamma*fi_prime - fi` of current opened position,
         # thus need to consider different cases given skip_fame parameter:
@@ -747,7 +770,7 @@ class BaseStrategy5(bt.Strategy):
             f1 = self.p.gamma * fi_1_prime - fi_1
 
         # Main reward function: normalized realized profit/loss:
-        realized_pnl = np.asarray(self.broker_stat['realized_pnl'])[-self.p.skip_frame:].sum()
+        realized_pnl = self.broker_stat['realized_pnl'][-self.p.skip_frame:].sum()
 
         # Weights are subject to tune:
         self.reward = (10.0 * f1 + 10.0 * realized_pnl) * self.p.reward_scale
@@ -18,23 +18,118 @@
 ###############################################################################
 
 import multiprocessing
+import threading
 import gc
 
 import itertools
+import collections
 import zmq
 import copy
+import numpy as np
 
 import time, datetime
 import random
 from datetime import timedelta
 
 import backtrader as bt
-from .datafeed import DataSampleConfig, EnvResetConfig
+from .datafeed import DataSampleConfig, EnvResetConfig, BTgymBaseData
 from .strategy.observers import NormPnL, Position, Reward
+from .framing import send_framed
+from .ports import bind
 
 ###################### BT Server in-episode communocation method ##############
 
 
+class _InfoBuffer:
+    """
+    Preallocated columnar storage of strategy info for frames between agent steps.
+    Every info field gets its own array: numeric fields are kept in numpy columns of matching dtype,
+    other ones (e.g. datetime or action dictionary) in object columns.
+    """
+    dtypes = {bool: np.bool_, int: np.int64, float: np.float64}
+
+    def __init__(self, size):
+        """
+        Args:
+            size:   int, initial number of frames to hold, grows if exceeded.
+        """
+        self.size = max(size, 1)
+        self.columns = None
+        self.types = None
+        self.length = 0
+
+    def _new_column(self, value):
+        """
+        Returns:
+            tuple (empty column for values of same type as `value`, value type or None for object column).
+        """
+        if isinstance(value, (np.number, np.bool_)):
+            dtype = value.dtype
+
+        else:
+            dtype = self.dtypes.get(type(value), object)
+
+        if dtype == object:
+            return np.empty(self.size, dtype=object), None
+
+        return np.empty(self.size, dtype=dtype), type(value)
+
+    def append(self, info):
+        """
+        Adds frame info, dictionary or any object.
+        """
+        if not isinstance(info, dict):
+            info = {None: info}
+
+        if self.columns is None:
+            self.columns = {}
+            self.types = {}
+            for key, value in info.items():
+                self.columns[key], self.types[key] = self._new_column(value)
+
+        if self.length == self.size:
+            for key, column in self.columns.items():
+                self.columns[key] = np.concatenate([column, np.empty_like(column)])
+            self.size *= 2
+
+        for key, value in info.items():
+            column = self.columns[key]
+            if self.types[key] is not None and type(value) is not self.types[key]:
+                column = self._to_objects(key)
+
+            try:
+                column[self.length] = value
+
+            except OverflowError:
+                self._to_objects(key)[self.length] = value
+
+        self.length += 1
+
+    def _to_objects(self, key):
+        """
+        Converts column to object one, for fields changed type or out of column dtype range.
+        """
+        self.columns[key] = self.columns[key].astype(object)
+        self.types[key] = None
+        return self.columns[key]
+
+    def get(self, last_only=False):
+        """
+        Returns:
+            list of frames info objects, in order added; just latest one if `last_only` is True
+        """
+        first = self.length - 1 if last_only else 0
+        # Numeric values are converted back to python scalars:
+        columns = {key: column[first: self.length].tolist() for key, column in self.columns.items()}
+        if None in columns:
+            return columns[None]
+
+        return [{key: column[i] for key, column in columns.items()} for i in range(self.length - first)]
+
+    def reset(self):
+        self.length = 0
+
+
 class _BTgymAnalyzer(bt.Analyzer):
     """
     This [kind of] misused analyzer handles strategy/environment communication logic
@@ -70,7 +165,14 @@ class _BTgymAnalyzer(bt.Analyzer):
         except:
             pass
 
-        self.info_list = []
+        # Info to keep: for every skipped frame or latest one only:
+        self.info_all_frames = getattr(self.strategy.p, 'info_frames', 'last') == 'all'
+        self.info_buffer = _InfoBuffer(self.strategy.p.skip_frame if self.info_all_frames else 1)
+
+        # Skip-frame loop action, made once:
+        # Trick to avoid excessive orders emitting during skip_frame loop:
+        self.skip_action = self.strategy.p.initial_portfolio_action
+        self.skip_action['_skip_this'] = True
 
     def prenext(self):
         pass
@@ -97,16 +199,17 @@ class _BTgymAnalyzer(bt.Analyzer):
         # We'll do it every step:
         # If it's time to leave:
         is_done = self.strategy._get_done()
-        # Collect step info:
-        self.info_list.append(self.strategy.get_info())
-        # Put agent on hold:
+        is_response_step = self.strategy.iteration % self.strategy.p.skip_frame == 0 or is_done
 
-        self.strategy.action = self.strategy.p.initial_portfolio_action
-        # Trick to avoid excessive orders emitting during skip_frame loop:
-        self.strategy.action['_skip_this'] = True
+        # Collect step info, for skipped frames only if requested:
+        if is_response_step or self.info_all_frames:
+            self.info_buffer.append(self.strategy.get_info())
+
+        # Put agent on hold:
+        self.strategy.action = self.skip_action
 
         # Only if it's time to communicate or episode has come to end:
-        if self.strategy.iteration % self.strategy.p.skip_frame == 0 or is_done:
+        if is_response_step:
 
             #print('Analyzer_strat_iteration:', self.strategy.iteration)
             #print('Analyzer_env_iteration:', self.strategy.env_iteration)
@@ -125,7 +228,8 @@ class _BTgymAnalyzer(bt.Analyzer):
             while 'ctrl' in self.message:
                 # Rendering requested:
                 if self.message['ctrl'] == '_render':
-                    self.socket.send_pyobj(
+                    send_framed(
+                        self.socket,
                         self.render.render(
                             self.message['mode'],
                             step_to_render=self.step_to_render,
@@ -168,9 +272,10 @@ class _BTgymAnalyzer(bt.Analyzer):
                 raise AssertionError(msg)
 
             # Send response as <o, r, d, i> tuple (Gym convention),
-            # opt to send entire info_list or just latest part:
-            info = [self.info_list[-1]]
-            self.socket.send_pyobj((state, reward, is_done, info))
+            # opt to send info for all skipped frames or just latest part:
+            info_list = self.info_buffer.get()
+            info = info_list if self.info_all_frames else info_list[-1:]
+            send_framed(self.socket, (state, reward, is_done, info))
 
             # Increment global time by sending timestamp to data_server, if authorized;
             if self.can_broadcast:
@@ -191,10 +296,10 @@ class _BTgymAnalyzer(bt.Analyzer):
             # Back up step information for rendering.
             # It pays when using skip-frames: will'll get future state otherwise.
 
-            self.step_to_render = ({'human':raw_state}, state, reward, is_done, self.info_list)
+            self.step_to_render = ({'human':raw_state}, state, reward, is_done, info_list)
 
             # Reset info:
-            self.info_list = []
+            self.info_buffer.reset()
             self.strategy.env_iteration += 1
 
         # If done, initiate fallback to Control Mode:
@@ -205,6 +310,228 @@ class _BTgymAnalyzer(bt.Analyzer):
         self.strategy.iteration += 1
         self.strategy.broker_message = '-'
 
+
+class _CerebroTemplate:
+    """
+    Recorded configuration of backtrader engine: strategies, observers, analyzers, sizers etc. as
+    (class, args, kwargs) entries along with cerebro and broker parameters.
+    Builds fresh engine instance for every episode instead of deep-copying live one.
+
+    Note:
+        entries kwargs values are shared by all built instances, only strategy kwargs dictionaries are copied,
+        so per-episode strategy params can be set.
+    """
+    # Cerebro attributes holding lists or dicts of entries:
+    entries = ('strats', 'observers', 'analyzers', 'indicators', 'sizers', 'signals', 'writers', 'optcbs')
+
+    # Plain cerebro attributes:
+    attributes = ('_dooptimize', '_signal_strat', '_signal_concurrent', '_signal_accumulate', '_tradingcal')
+
+    def __init__(self, cerebro):
+        """
+        Args:
+            cerebro:    bt.Cerebro instance to record, with no data added.
+        """
+        self.cerebro_class = type(cerebro)
+        self.cerebro_params = cerebro.p._getkwargs()
+        self.config = {key: copy.copy(getattr(cerebro, key)) for key in self.entries if hasattr(cerebro, key)}
+        self.config.update({key: getattr(cerebro, key) for key in self.attributes if hasattr(cerebro, key)})
+
+        broker = cerebro.getbroker()
+        self.broker_class = type(broker)
+        # Note: cash and most of settings are kept as broker params:
+        self.broker_params = broker.p._getkwargs()
+        self.broker_comminfo = copy.copy(broker.comminfo)
+        self.broker_fundmode = getattr(broker, '_fundmode', None)
+
+    def make(self):
+        """
+        Returns:
+            new bt.Cerebro instance, configured as recorded one.
+        """
+        cerebro = self.cerebro_class(**self.cerebro_params)
+        for key, value in self.config.items():
+            setattr(cerebro, key, copy.copy(value))
+
+        cerebro.strats = [[(cls, args, dict(kwargs)) for cls, args, kwargs in strat] for strat in cerebro.strats]
+
+        broker = self.broker_class(**self.broker_params)
+        broker.comminfo = copy.copy(self.broker_comminfo)
+        if self.broker_fundmode is not None:
+            broker._fundmode = self.broker_fundmode
+
+        cerebro.setbroker(broker)
+
+        return cerebro
+
+def _same_config(config, other):
+    """
+    Returns:
+        True if sample configs are equal; configs holding arrays are never considered equal.
+    """
+    try:
+        return bool(config == other)
+
+    except ValueError:
+        return False
+
+
+class _EpisodePrefetch(threading.Thread):
+    """
+    Prepares next episode in background while current one runs: requests trial from data server
+    (via own socket) and samples episode from it, same way as `BTgymServer.prepare_episode()` does.
+    Prepared episode is only used if next `_reset` comes with same sample config at same global time.
+    Prefetch changes no server state: episode data, along with dataset statistic received, is applied
+    by server loop once taken.
+    """
+
+    def __init__(self, server, sample_config, timestamp):
+        """
+        Args:
+            server:         BTgymServer instance
+            sample_config:  dict of `trial_config` and `episode_config` used for current episode
+            timestamp:      global time current episode has been prepared at
+        """
+        super(_EpisodePrefetch, self).__init__(name='BTgymServer_{}_prefetch'.format(server.task))
+        self.daemon = True
+        self.server = server
+        self.sample_config = copy.deepcopy(sample_config)
+        self.timestamp = timestamp
+        self.episode_data = None
+
+    def run(self):
+        socket = self.server.data_context.socket(zmq.REQ)
+        socket.setsockopt(zmq.RCVTIMEO, self.server.connect_timeout * 1000)
+        socket.setsockopt(zmq.SNDTIMEO, self.server.connect_timeout * 1000)
+        socket.connect(self.server.data_network_address)
+        try:
+            self.episode_data = self.server.prepare_episode(self.sample_config, self.timestamp, socket=socket)
+
+        except Exception as e:
+            # Episode will be prepared again on reset:
+            self.server.log.warning('Failed to prefetch episode: {}'.format(e))
+
+        finally:
+            socket.close(linger=0)
+
+    def result(self, sample_config, timestamp):
+        """
+        Waits for prefetch to finish.
+
+        Args:
+            sample_config:  dict of `trial_config` and `episode_config` received with `_reset`
+            timestamp:      current global time
+
+        Returns:
+            prepared episode data if valid for given config and time, None otherwise
+        """
+        self.join()
+        if self.episode_data is None:
+            return None
+
+        if not (timestamp == self.timestamp and _same_config(sample_config, self.sample_config)):
+            self.server.log.debug('Sample config or global time changed, prefetched episode discarded.')
+            return None
+
+        self.server.log.debug('Using prefetched episode.')
+        return self.episode_data
+
+
+class _FeatureCache:
+    """
+    Features computed over entire trial data, kept across episodes sampled from same trial.
+    Least recently used entries are evicted when memory budget is exceeded.
+    """
+
+    def __init__(self, memory_budget):
+        """
+        Args:
+            memory_budget:  int, bytes; arrays larger than budget are not cached.
+        """
+        self.memory_budget = memory_budget
+        self.entries = collections.OrderedDict()
+        self.memory_used = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        """
+        Args:
+            key:        hashable, (trial id, features specification)
+            compute:    callable returning features array, called on cache miss
+
+        Returns:
+            features array
+        """
+        try:
+            features = self.entries[key]
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return features
+
+        except KeyError:
+            self.misses += 1
+
+        features = compute()
+        if features.nbytes <= self.memory_budget:
+            # Cached arrays are shared by episodes:
+            features.flags.writeable = False
+            self.entries[key] = features
+            self.memory_used += features.nbytes
+
+            while self.memory_used > self.memory_budget:
+                _, evicted = self.entries.popitem(last=False)
+                self.memory_used -= evicted.nbytes
+
+        return features
+
+    def get_stat(self):
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            entries=len(self.entries),
+            memory_used=self.memory_used,
+        )
+
+
+class _TrialFeatures:
+    """
+    Episode access to features cache: features are computed over parent trial and sliced to episode rows.
+    Passed to strategy as `env._trial_features` attribute.
+    """
+
+    def __init__(self, cache, trial_id, trial_sample, first_row, num_rows):
+        """
+        Args:
+            cache:          _FeatureCache instance
+            trial_id:       int, trial number assigned by server
+            trial_sample:   trial BTgymBaseData instance
+            first_row:      episode first row in trial data
+            num_rows:       episode number of rows
+        """
+        self.cache = cache
+        self.trial_id = trial_id
+        self.trial_sample = trial_sample
+        self.first_row = first_row
+        self.num_rows = num_rows
+
+    def get(self, spec, compute):
+        """
+        Args:
+            spec:       hashable features specification, same for any strategy computing same features
+            compute:    callable: bt.feed -> features array of shape [feed_num_records, ...]; gets trial data
+                        feed on cache miss, is expected to compute every row from current and preceding ones only.
+
+        Returns:
+            features array of shape [episode_num_records, ...]; rows with not enough episode data preceding
+            hold values estimated from trial data.
+        """
+        features = self.cache.get(
+            (self.trial_id, spec),
+            lambda: compute(list(self.trial_sample.to_btfeed().values())[0])
+        )
+        return features[self.first_row: self.first_row + self.num_rows]
+
     ##############################  BTgym Server Main  ##############################
 
 
@@ -252,6 +579,10 @@ class BTgymServer(multiprocessing.Process):
         connect_timeout=90,
         log_level=None,
         task=0,
+        channel=None,
+        prefetch=False,
+        feature_cache_size=256,
+        ready=None,
     ):
         """
 
@@ -262,6 +593,14 @@ class BTgymServer(multiprocessing.Process):
             data_network_address:   data communication, str
             connect_timeout:        seconds, int
             log_level:              int, logbook.level
+            channel:                btgym.inprocess.InProcessSocket instance to use instead of network
+                                    environment communication, if server runs in environment process.
+            prefetch:               bool, prepare next episode in background while current one runs; only done
+                                    when sample config and global time have not changed since previous episode.
+            feature_cache_size:     int, megabytes; memory budget for strategy features computed over entire
+                                    trial and reused by episodes sampled from it; 0 disables caching.
+            ready:                  sending end of multiprocessing.Pipe, server reports network address
+                                    it has bound to via it; if address has no port, port is assigned by OS.
         """
 
         super(BTgymServer, self).__init__()
@@ -275,11 +614,23 @@ class BTgymServer(multiprocessing.Process):
         self.data_network_address = data_network_address
         self.connect_timeout = connect_timeout # server connection timeout in seconds.
         self.connect_timeout_step = 0.01
+        self.channel = channel
+        self.prefetch = prefetch
+        self.feature_cache_size = feature_cache_size
+        self.ready = ready
+        self.cerebro_template = None
+        self.feature_cache = None
 
         self.trial_sample = None
+        self.trial_id = None
+        self.trial_ids = itertools.count()
         self.trial_stat = None
         self.dataset_stat = None
 
+        # Data server protocol: dataset statistic and sample configuration are cached by version:
+        self.stat_version = None
+        self.sample_config = None
+
     @staticmethod
     def _comm_with_timeout(socket, message):
         """
@@ -340,21 +691,38 @@ class BTgymServer(multiprocessing.Process):
             self.log.error(msg)
             raise ConnectionError(msg)
 
-    def get_trial(self, **reset_kwargs):
+    def get_trial(self, socket=None, **reset_kwargs):
         """
+        Requests new trial from data server. Trial is received either as descriptor of shared data store interval
+        (if data server shares domain data) or as pickled instance; dataset statistic is only resent by data server
+        when its version changes.
+
+        Server state is not changed here, as trial can be requested by prefetch thread while episode runs:
+        statistic received is returned along with trial and is to be stored by caller.
 
         Args:
+            socket:         data server socket to use, default is `self.data_socket`
             reset_kwargs:   dictionary of args to pass to parent data iterator
 
         Returns:
-            trial_sample, trial_stat, dataset_stat
+            trial_sample, trial_stat, dict of most recent `dataset_stat`, `stat_version` and `sample_config`,
+            origin, timestamp
         """
+        is_main = socket is None
+        if socket is None:
+            socket = self.data_socket
+
         wait = 0
         while True:
             # Get new data subset:
             data_server_response = self._comm_with_timeout(
-                socket=self.data_socket,
-                message={'ctrl': '_get_data', 'kwargs': reset_kwargs}
+                socket=socket,
+                message={
+                    'ctrl': '_get_data',
+                    'kwargs': reset_kwargs,
+                    'descriptor': True,
+                    'stat_version': self.stat_version,
+                }
             )
             if data_server_response['status'] in 'ok':
                 self.log.debug('Data_server @{} responded in ~{:1.6f} seconds.'.
@@ -378,24 +746,79 @@ class BTgymServer(multiprocessing.Process):
                     )
                 else:
                     data_server_response = self._comm_with_timeout(
-                        socket=self.data_socket,
+                        socket=socket,
                         message={'ctrl': '_stop'}
                     )
-                    self.socket.close()
-                    self.context.destroy()
+                    if is_main:
+                        self.socket.close()
+                        if self.context is not None:
+                            self.context.destroy()
                     raise RuntimeError('Failed to assert Domain dataset is ready. Exiting.')
 
             except (AssertionError, KeyError) as e:
                 break
-        # Get trial instance:
-        trial_sample = data_server_response['message']['sample']
-        trial_stat = trial_sample.describe()
+        response = data_server_response['message']
+
+        # Renewed statistic, if it has been sent:
+        if 'stat' in response:
+            stat = dict(
+                dataset_stat=response['stat'],
+                stat_version=response.get('stat_version', None),
+                sample_config=response.get('sample_config', None),
+            )
+
+        else:
+            stat = dict(
+                dataset_stat=self.dataset_stat,
+                stat_version=self.stat_version,
+                sample_config=self.sample_config,
+            )
+
+        # Get trial instance, either sent as is or materialized from shared data store:
+        if 'descriptor' in response:
+            trial_sample = BTgymBaseData.from_descriptor(response['descriptor'], stat['sample_config'])
+
+        else:
+            trial_sample = response['sample']
+
+        # Percentiles take pass over all trial rows, not computed for every trial and episode:
+        trial_stat = trial_sample.describe(percentiles=False)
         trial_sample.reset()
-        dataset_stat = data_server_response['message']['stat']
-        origin = data_server_response['message']['origin']
-        timestamp = data_server_response['message']['timestamp']
+        origin = response['origin']
+        timestamp = response['timestamp']
+
+        return trial_sample, trial_stat, stat, origin, timestamp
+
+    def get_trial_features(self, episode_sample):
+        """
+        Locates episode rows in current trial data.
+
+        Args:
+            episode_sample:     episode sampled from current trial
+
+        Returns:
+            _TrialFeatures instance; None if caching is disabled or episode is not a rows interval of trial data.
+        """
+        if self.feature_cache is None:
+            return None
+
+        try:
+            trial_data = self.trial_sample.data
+            episode_data = episode_sample.data
+            first_row = episode_sample.metadata['first_row']
+            num_rows = episode_data.shape[0]
+            is_interval = trial_data.shape[0] >= first_row + num_rows and\
+                trial_data.index[first_row] == episode_data.index[0] and\
+                trial_data.index[first_row + num_rows - 1] == episode_data.index[-1]
+
+        except (AttributeError, KeyError, TypeError, IndexError):
+            is_interval = False
 
-        return trial_sample, trial_stat, dataset_stat, origin, timestamp
+        if not is_interval:
+            self.log.debug('Episode rows not found in trial data, features cache is not used.')
+            return None
+
+        return _TrialFeatures(self.feature_cache, self.trial_id, self.trial_sample, first_row, num_rows)
 
     def get_trial_message(self):
         """
@@ -442,15 +865,18 @@ class BTgymServer(multiprocessing.Process):
 
         return data_server_response['message']['timestamp']
 
-    def get_broadcast_message(self):
+    def get_broadcast_message(self, socket=None):
         """
         Asks dataserver for current dataset global_time and broadcast message.
 
+        Args:
+            socket:     data server socket to use, default is `self.data_socket`
+
         Returns:
             POSIX timestamp
         """
         data_server_response = self._comm_with_timeout(
-            socket=self.data_socket,
+            socket=socket if socket is not None else self.data_socket,
             message={'ctrl': '_get_broadcast_message'}
         )
         if data_server_response['status'] in 'ok':
@@ -464,6 +890,74 @@ class BTgymServer(multiprocessing.Process):
 
         return data_server_response['message']['timestamp'], data_server_response['message']['broadcast_message']
 
+    def prepare_episode(self, sample_config, timestamp, socket=None):
+        """
+        Gets trial (new one from data server if requested or current one) and samples episode from it.
+
+        Args:
+            sample_config:  dict of `trial_config` and `episode_config`, as received with `_reset`
+            timestamp:      current global time, POSIX timestamp
+            socket:         data server socket to use, default is `self.data_socket`
+
+        Returns:
+            dict of trial_sample, trial_id, trial_stat, episode_sample, episode_stat, episode bt.feed and
+            `stat` - dict of dataset_stat, stat_version and sample_config to be stored by server; none of
+            server attributes are changed here, see _EpisodePrefetch.
+        """
+        sample_config = copy.deepcopy(sample_config)
+        trial_sample, trial_stat = self.trial_sample, self.trial_stat
+        trial_id = self.trial_id
+        stat = dict(
+            dataset_stat=self.dataset_stat,
+            stat_version=self.stat_version,
+            sample_config=self.sample_config,
+        )
+
+        # Get new Trial from data_server if requested,
+        # despite bult-in new/reuse data object sampling option, perform checks here to avoid
+        # redundant traffic:
+        if sample_config['trial_config']['get_new'] or trial_sample is None:
+            self.log.info(
+                'Requesting new Trial sample with args: {}'.format(sample_config['trial_config'])
+            )
+            trial_sample, trial_stat, stat, origin, timestamp =\
+                self.get_trial(socket=socket, **sample_config['trial_config'])
+            trial_id = next(self.trial_ids)
+
+            if origin in 'data_server':
+                trial_sample.set_logger(self.log_level, self.task)
+
+            self.log.debug('Got new Trial: <{}>'.format(trial_sample.filename))
+
+        else:
+            self.log.info('Reusing Trial <{}>'.format(trial_sample.filename))
+
+        self.log.debug(
+            'current global_time: {}'.format(datetime.datetime.fromtimestamp(timestamp))
+        )
+        # Get episode:
+        if sample_config['episode_config']['timestamp'] is None or\
+                sample_config['episode_config']['timestamp'] < timestamp:
+            sample_config['episode_config']['timestamp'] = timestamp
+
+        self.log.info(
+            'Requesting episode from <{}> with args: {}'.
+            format(trial_sample.filename, sample_config['episode_config'])
+        )
+
+        episode_sample = trial_sample.sample(**sample_config['episode_config'])
+        self.log.debug('Got new Episode: <{}>'.format(episode_sample.filename))
+
+        return dict(
+            trial_sample=trial_sample,
+            trial_id=trial_id,
+            trial_stat=trial_stat,
+            stat=stat,
+            episode_sample=episode_sample,
+            episode_stat=episode_sample.describe(percentiles=False),
+            feed=episode_sample.to_btfeed(),
+        )
+
     def run(self):
         """
         Server process runtime body. This method is invoked by env._start_server().
@@ -471,7 +965,9 @@ class BTgymServer(multiprocessing.Process):
         # Logging:
         from logbook import Logger, StreamHandler, WARNING
         import sys
-        StreamHandler(sys.stdout).push_application()
+        if self.channel is None:
+            # In-process server logs via environment handlers:
+            StreamHandler(sys.stdout).push_application()
         if self.log_level is None:
             self.log_level = WARNING
         self.log = Logger('BTgymServer_{}'.format(self.task), level=self.log_level)
@@ -483,6 +979,11 @@ class BTgymServer(multiprocessing.Process):
         cerebro = None
         episode_result = dict()
         episode_sample = None
+        prefetch = None
+        last_sample_config = None
+        last_timestamp = None
+        if self.feature_cache_size:
+            self.feature_cache = _FeatureCache(self.feature_cache_size * 2 ** 20)
 
         # How long to wait for data_master to reset data:
         self.wait_for_data_reset = 300  # seconds
@@ -492,11 +993,22 @@ class BTgymServer(multiprocessing.Process):
         # Set up a comm. channel for server as ZMQ socket
         # to carry both service and data signal
         # !! Reminder: Since we use REQ/REP - messages do go in pairs !!
-        self.context = zmq.Context()
-        self.socket = self.context.socket(zmq.REP)
-        self.socket.setsockopt(zmq.RCVTIMEO, -1)
-        self.socket.setsockopt(zmq.SNDTIMEO, connect_timeout * 1000)
-        self.socket.bind(self.network_address)
+        if self.channel is None:
+            self.context = zmq.Context()
+            self.socket = self.context.socket(zmq.REP)
+            self.socket.setsockopt(zmq.RCVTIMEO, -1)
+            self.socket.setsockopt(zmq.SNDTIMEO, connect_timeout * 1000)
+            self.network_address = bind(self.socket, self.network_address)
+
+            # Tell environment we are ready:
+            if self.ready is not None:
+                self.ready.send(self.network_address)
+                self.ready.close()
+
+        else:
+            # In-process mode: environment messages are passed as is, no network:
+            self.context = None
+            self.socket = self.channel
 
         self.data_context = zmq.Context()
         self.data_socket = self.data_context.socket(zmq.REQ)
@@ -532,6 +1044,22 @@ class BTgymServer(multiprocessing.Process):
         else:
             aux_obsrevers = [bt.observers.DrawDown]
 
+        # Record engine configuration once, along with auxillary observers, if not already added,
+        # and communication utility:
+        cerebro = _CerebroTemplate(self.cerebro).make()
+        for aux in aux_obsrevers:
+            is_added = False
+            for observer in cerebro.observers:
+                if aux in observer:
+                    is_added = True
+            if not is_added:
+                cerebro.addobserver(aux)
+
+        cerebro.addanalyzer(_BTgymAnalyzer, _name='_env_analyzer',)
+
+        self.cerebro_template = _CerebroTemplate(cerebro)
+        cerebro = None
+
         # Server 'Control Mode' loop:
         for episode_number in itertools.count(0):
             while True:
@@ -547,9 +1075,17 @@ class BTgymServer(multiprocessing.Process):
                         # send last run statistic, release comm channel and exit:
                         message = 'Exiting.'
                         self.log.info(message)
+                        if prefetch is not None:
+                            prefetch.join()
+
                         self.socket.send_pyobj(message)
                         self.socket.close()
-                        self.context.destroy()
+                        if self.context is not None:
+                            self.context.destroy()
+                        # In-process server thread leaves no process to exit, so data channel is released here,
+                        # otherwise collecting it later blocks on unsent requests:
+                        self.data_socket.close(linger=0)
+                        self.data_context.destroy(linger=0)
                         return None
 
                     # Start episode:
@@ -567,7 +1103,7 @@ class BTgymServer(multiprocessing.Process):
                     # Send episode rendering:
                     elif service_input['ctrl'] == '_render' and 'mode' in service_input.keys():
                         # Just send what we got:
-                        self.socket.send_pyobj(self.render.render(service_input['mode']))
+                        send_framed(self.socket, self.render.render(service_input['mode']))
                         self.log.debug('Episode rendering for [{}] sent.'.format(service_input['mode']))
 
                     # Serve data-dependent environment with trial instance:
@@ -596,7 +1132,7 @@ class BTgymServer(multiprocessing.Process):
 
             # Got '_reset' signal -> prepare Cerebro subclass and run episode:
             start_time = time.time()
-            cerebro = copy.deepcopy(self.cerebro)
+            cerebro = self.cerebro_template.make()
             cerebro._socket = self.socket
             cerebro._data_socket = self.data_socket
             cerebro._log = self.log
@@ -606,18 +1142,6 @@ class BTgymServer(multiprocessing.Process):
             cerebro._get_data = self.get_trial_message
             cerebro._get_info = self.get_dataset_stat
 
-            # Add auxillary observers, if not already:
-            for aux in aux_obsrevers:
-                is_added = False
-                for observer in cerebro.observers:
-                    if aux in observer:
-                        is_added = True
-                if not is_added:
-                    cerebro.addobserver(aux)
-
-            # Add communication utility:
-            cerebro.addanalyzer(_BTgymAnalyzer, _name='_env_analyzer',)
-
             # Data preparation:
 
             # Renew system state:
@@ -639,46 +1163,31 @@ class BTgymServer(multiprocessing.Process):
             sample_config['trial_config']['broadcast_message'] = current_broadcast_message
             sample_config['episode_config']['broadcast_message'] = current_broadcast_message
 
-            # Get new Trial from data_server if requested,
-            # despite bult-in new/reuse data object sampling option, perform checks here to avoid
-            # redundant traffic:
-            if sample_config['trial_config']['get_new'] or self.trial_sample is None:
-                self.log.info(
-                    'Requesting new Trial sample with args: {}'.format(sample_config['trial_config'])
-                )
-                self.trial_sample, self.trial_stat, self.dataset_stat, origin, current_timestamp =\
-                    self.get_trial(**sample_config['trial_config'])
+            # Take episode prepared in background, if it has been made with same config at same global time:
+            episode_data = None
+            if prefetch is not None:
+                episode_data = prefetch.result(sample_config, current_timestamp)
+                prefetch = None
 
-                if origin in 'data_server':
-                    self.trial_sample.set_logger(self.log_level, self.task)
+            if episode_data is None:
+                episode_data = self.prepare_episode(sample_config, current_timestamp)
 
-                self.log.debug('Got new Trial: <{}>'.format(self.trial_sample.filename))
+            self.trial_sample = episode_data['trial_sample']
+            self.trial_id = episode_data['trial_id']
+            self.trial_stat = episode_data['trial_stat']
+            self.dataset_stat = episode_data['stat']['dataset_stat']
+            self.stat_version = episode_data['stat']['stat_version']
+            self.sample_config = episode_data['stat']['sample_config']
+            episode_sample = episode_data['episode_sample']
 
-            else:
-                self.log.info('Reusing Trial <{}>'.format(self.trial_sample.filename))
-                # current_timestamp = self.get_global_time()
-
-            self.log.debug(
-                'current global_time: {}'.format(datetime.datetime.fromtimestamp(current_timestamp))
-            )
-            # Get episode:
-            if sample_config['episode_config']['timestamp'] is None or\
-                    sample_config['episode_config']['timestamp'] < current_timestamp:
-                sample_config['episode_config']['timestamp'] = current_timestamp
-
-            self.log.info(
-                'Requesting episode from <{}> with args: {}'.
-                format(self.trial_sample.filename, sample_config['episode_config'])
-            )
-
-            episode_sample = self.trial_sample.sample(**sample_config['episode_config'])
-            self.log.debug('Got new Episode: <{}>'.format(episode_sample.filename))
+            # Let strategy reuse features computed over this trial for previous episodes:
+            cerebro._trial_features = self.get_trial_features(episode_sample)
 
             # Get episode data statistic and pass it to strategy params:
             cerebro.strats[0][0][2]['trial_stat'] = self.trial_stat
             cerebro.strats[0][0][2]['trial_metadata'] = self.trial_sample.metadata
             cerebro.strats[0][0][2]['dataset_stat'] = self.dataset_stat
-            cerebro.strats[0][0][2]['episode_stat'] = episode_sample.describe()
+            cerebro.strats[0][0][2]['episode_stat'] = episode_data['episode_stat']
             cerebro.strats[0][0][2]['metadata'] = episode_sample.metadata
 
             cerebro.strats[0][0][2]['broadcast_message'] = current_broadcast_message
@@ -686,8 +1195,8 @@ class BTgymServer(multiprocessing.Process):
             # Set nice broker cash plotting:
             cerebro.broker.set_shortcash(False)
 
-            # Convert and add data to engine:
-            feed = episode_sample.to_btfeed()
+            # Add data to engine:
+            feed = episode_data['feed']
             if isinstance(feed, dict):
                 for key, stream in feed.items():
                     cerebro.adddata(stream, name=key)
@@ -695,8 +1204,21 @@ class BTgymServer(multiprocessing.Process):
             else:
                 cerebro.adddata(feed, name='base_asset')
 
+            # Start preparing next episode with same config while this one runs, but only if config and global time
+            # have not changed since previous episode: otherwise they most likely change again (e.g. data master
+            # moves global time every episode), so prefetched episode would be discarded, wasting trial taken
+            # from data iterator - one sampling trials in order would skip it:
+            is_steady = last_timestamp == current_timestamp and _same_config(last_sample_config, sample_config)
+            last_timestamp, last_sample_config = current_timestamp, copy.deepcopy(sample_config)
+
+            if self.prefetch and is_steady:
+                prefetch = _EpisodePrefetch(self, sample_config, current_timestamp)
+                prefetch.start()
+
             # Finally:
+            run_start_time = time.time()
             episode = cerebro.run(stdstats=True, preload=False, oldbuysell=True)[0]
+            run_time = timedelta(seconds=time.time() - run_start_time)
 
             # Update episode rendering:
             _ = self.render.render('just_render', cerebro=cerebro)
@@ -707,10 +1229,17 @@ class BTgymServer(multiprocessing.Process):
             analyzers_list.remove('_env_analyzer')
 
             elapsed_time = timedelta(seconds=time.time() - start_time)
-            self.log.debug('Episode elapsed time: {}.'.format(elapsed_time))
+            setup_time = timedelta(seconds=run_start_time - start_time)
+            self.log.debug(
+                'Episode elapsed time: {}, setup: {}, run: {}.'.format(elapsed_time, setup_time, run_time)
+            )
+            if self.feature_cache is not None:
+                self.log.debug('Features cache: {}'.format(self.feature_cache.get_stat()))
 
             episode_result['episode'] = episode_number
             episode_result['runtime'] = elapsed_time
+            episode_result['setup_time'] = setup_time
+            episode_result['run_time'] = run_time
             episode_result['length'] = len(episode.data.close)
 
             for name in analyzers_list:
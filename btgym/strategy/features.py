@@ -0,0 +1,107 @@
+###############################################################################
+#
+# Copyright (C) 2017 Andrew Muzikin
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+"""
+Episode-level signal features.
+
+Features which do not depend on agent actions can be computed for entire episode at once
+instead of being tracked bar by bar with backtrader indicators; strategy observation is then a slice
+of precomputed array. Every function here takes whole episode line and returns array of same length,
+first `period - 1` values (not enough data yet) are NaN, other values are bit-exact to corresponding indicator.
+"""
+
+import math
+import numpy as np
+
+
+def episode_line(data, name='close'):
+    """
+    Returns entire episode data line of started backtrader feed.
+
+    Args:
+        data:   `BTgymNumpyData` or `PandasDirectData` feed instance
+        name:   line name
+
+    Returns:
+        float64 array of shape [num_records]
+    """
+    arrays = getattr(data, 'arrays', None)
+    if arrays is not None:
+        return arrays[name]
+
+    # Pandas feeds: 0 refers to dataframe index, positive values - to columns numbered from one:
+    column = getattr(data.p, name)
+    assert column is not None and column > 0, 'Line `{}` not found in data feed dataframe'.format(name)
+
+    return np.ascontiguousarray(data.p.dataname.iloc[:, column - 1], dtype=np.float64)
+
+
+def sliding_window(x, size):
+    """
+    Returns:
+        read-only strided view of 1D array `x` of shape [len(x) - size + 1, size], no copying is done.
+    """
+    x = np.ascontiguousarray(x)
+    return np.lib.stride_tricks.as_strided(
+        x,
+        shape=(max(x.shape[0] - size + 1, 0), size),
+        strides=(x.strides[0], x.strides[0]),
+        writeable=False,
+    )
+
+
+def sma(x, period):
+    """
+    Simple moving average, same as `backtrader.indicators.SimpleMovingAverage`.
+
+    Note:
+        Windows are summed with `math.fsum` the way backtrader `Average` indicator does: correctly rounded sum
+        keeps result bit-compatible with indicator, while running sum or convolution differs in last bits.
+    """
+    values = np.asarray(x, dtype=np.float64).tolist()
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1:] = [
+            math.fsum(values[i - period:i]) for i in range(period, len(values) + 1)
+        ]
+        out[period - 1:] /= period
+
+    return out
+
+
+def rolling_max(x, period):
+    """
+    Sliding upper bound over last `period` values.
+    """
+    out = np.full(np.shape(x)[0], np.nan)
+    if out.shape[0] >= period:
+        out[period - 1:] = sliding_window(x, period).max(axis=-1)
+
+    return out
+
+
+def rolling_min(x, period):
+    """
+    Sliding lower bound over last `period` values.
+    """
+    out = np.full(np.shape(x)[0], np.nan)
+    if out.shape[0] >= period:
+        out[period - 1:] = sliding_window(x, period).min(axis=-1)
+
+    return out
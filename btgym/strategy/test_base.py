@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+import backtrader as bt
+
+from btgym.strategy.base import BTgymBaseStrategy
+
+
+class CompareRawState(bt.Strategy):
+    """Calls BTgymBaseStrategy.get_raw_state() on feed with no data windows"""
+
+    time_dim = 30
+
+    def __init__(self):
+        self.raw_state = None
+        self.raw_state_buffer = None
+        self.num_checked = 0
+        self.mismatches = 0
+
+    def next(self):
+        if len(self) < self.time_dim:
+            return
+
+        raw_state = BTgymBaseStrategy.get_raw_state(self)
+        expected = np.stack(
+            [
+                np.asarray(line.get(size=self.time_dim), dtype=np.float32)
+                for line in [self.data.open, self.data.high, self.data.low, self.data.close]
+            ],
+            axis=-1
+        )
+        self.mismatches += int(not np.array_equal(raw_state, expected))
+        self.num_checked += 1
+
+
+class RawStateTest(unittest.TestCase):
+
+    def test_line_buffers_fallback(self):
+        rng = np.random.RandomState(0)
+        frame = pd.DataFrame(
+            100 + rng.randn(500, 5).cumsum(axis=0),
+            index=pd.date_range('2017-01-02', periods=500, freq='1min'),
+            columns=['open', 'high', 'low', 'close', 'volume'],
+        )
+        # With preload all bars are loaded before first next() call, state should still end at current bar:
+        for preload in [False, True]:
+            with self.subTest(preload=preload):
+                cerebro = bt.Cerebro(stdstats=False)
+                cerebro.adddata(bt.feeds.PandasData(dataname=frame))
+                cerebro.addstrategy(CompareRawState)
+                strategy = cerebro.run(preload=preload)[0]
+
+                self.assertEqual(strategy.num_checked, frame.shape[0] - CompareRawState.time_dim + 1)
+                self.assertEqual(strategy.mismatches, 0)
+                self.assertEqual(strategy.raw_state.dtype, np.float32)
+                self.assertIs(strategy.raw_state, strategy.raw_state_buffer)
+
+
+if __name__ == '__main__':
+    unittest.main()
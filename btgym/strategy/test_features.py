@@ -0,0 +1,132 @@
+
+import os
+import types
+import unittest
+import numpy as np
+import backtrader as bt
+import backtrader.indicators as btind
+
+from btgym.datafeed.derivative import BTgymDataset
+from btgym.strategy.features import episode_line, sma, rolling_max, rolling_min
+from btgym.research.strategy_gen_4 import DevStrat_4_12
+from btgym.research.casual_conv.strategy import MaxPool, MinPool
+from btgym.server import _FeatureCache, _TrialFeatures
+
+periods = DevStrat_4_12.features_parameters
+
+
+class RecordIndicators(bt.Strategy):
+    """Collects every bar indicator values along with episode lines."""
+
+    def __init__(self):
+        self.indicators = []
+        for period in periods:
+            self.indicators += [
+                btind.SimpleMovingAverage(self.data, period=period),
+                MinPool(self.data, period=period),
+                MaxPool(self.data, period=period),
+            ]
+        self.values = []
+
+    def start(self):
+        close = episode_line(self.data, 'close')
+        low = episode_line(self.data, 'low')
+        high = episode_line(self.data, 'high')
+        self.episode_features = []
+        for period in periods:
+            self.episode_features += [sma(close, period), rolling_min(low, period), rolling_max(high, period)]
+
+        self.episode_features = np.stack(self.episode_features, axis=-1)
+
+    def next(self):
+        self.values.append([indicator[0] for indicator in self.indicators])
+
+
+class EpisodeFeaturesTest(unittest.TestCase):
+    """Testing precomputed episode features against backtrader indicators"""
+
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../examples/data')
+    filename = os.path.join(data_dir, 'DAT_ASCII_EURUSD_M1_201701.csv')
+
+    def setUp(self):
+        domain = BTgymDataset(filename=self.filename, log_level=13)
+        domain.reset()
+        self.episode = domain._sample_exact_interval([1000, 3000])
+
+    def run_episode(self):
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.adddata(list(self.episode.to_btfeed().values())[0])
+        cerebro.addstrategy(RecordIndicators)
+        return cerebro.run(preload=False)[0]
+
+    def test_features_bit_exact(self):
+        strategy = self.run_episode()
+        min_period = max(periods) - 1
+        values = np.asarray(strategy.values)
+
+        self.assertEqual(strategy.episode_features.shape[0], self.episode.data.shape[0])
+        self.assertEqual(values.shape[0] + min_period, strategy.episode_features.shape[0])
+        self.assertTrue(np.array_equal(values, strategy.episode_features[min_period:]))
+        self.assertTrue(np.isnan(strategy.episode_features[:min_period, -1]).all())
+
+    def test_external_state_bit_exact(self):
+        strategy = self.run_episode()
+        time_dim = DevStrat_4_12.time_dim
+        dev_strat = types.SimpleNamespace(p=types.SimpleNamespace(state_ext_scale=DevStrat_4_12.state_ext_scale))
+
+        # DevStrat_4_12 features are SMAs of its own periods, every third recorded column:
+        indicator_features = np.asarray(strategy.values)[:, ::3]
+        episode_features = DevStrat_4_12.transform_features(dev_strat, strategy.episode_features[:, ::3])
+        min_period = max(periods) - 1
+
+        for bar in range(time_dim, indicator_features.shape[0]):
+            window = DevStrat_4_12.transform_features(dev_strat, indicator_features[bar - time_dim: bar])
+            current_bar = min_period + bar
+            self.assertTrue(
+                np.array_equal(window, episode_features[current_bar - time_dim: current_bar]),
+                'Mismatch at bar {}'.format(current_bar)
+            )
+
+
+class FeatureCacheTest(unittest.TestCase):
+    """Testing trial features cache"""
+
+    def test_episode_slice_matches_episode_features(self):
+        domain = BTgymDataset(filename=EpisodeFeaturesTest.filename, log_level=13)
+        domain.reset()
+        episode = domain._sample_exact_interval([1000, 3000])
+        num_rows = episode.data.shape[0]
+
+        def compute(data):
+            close = episode_line(data, 'close')
+            return np.stack([sma(close, period) for period in periods], axis=-1)
+
+        cache = _FeatureCache(memory_budget=2 ** 30)
+        trial_features = _TrialFeatures(cache, 0, domain, episode.metadata['first_row'], num_rows)
+        features = trial_features.get('sma', compute)
+        _ = trial_features.get('sma', compute)
+
+        self.assertEqual(features.shape, (num_rows, len(periods)))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Rows past warm-up are computed over episode data only:
+        min_period = max(periods) - 1
+        self.assertTrue(
+            np.array_equal(features[min_period:], compute(list(episode.to_btfeed().values())[0])[min_period:])
+        )
+
+    def test_lru_eviction(self):
+        cache = _FeatureCache(memory_budget=3 * 8000)
+        for key in [0, 1, 2, 0, 3]:
+            cache.get(key, lambda: np.zeros(1000))
+
+        self.assertEqual(list(cache.entries.keys()), [2, 0, 3])
+        self.assertEqual(cache.memory_used, 3 * 8000)
+
+        # Too large to cache:
+        cache.get(4, lambda: np.zeros(4000))
+        self.assertNotIn(4, cache.entries)
+
+
+if __name__ == '__main__':
+    unittest.main()
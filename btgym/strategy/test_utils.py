@@ -0,0 +1,61 @@
+import unittest
+from collections import deque
+
+import numpy as np
+
+from btgym.strategy.utils import RingBuffer
+
+
+class RingBufferTest(unittest.TestCase):
+
+    keys = ['cash', 'value', 'exposure']
+    size = 5
+
+    def assert_same_as_deque(self, buffer, reference):
+        view = buffer.view()
+        self.assertEqual(view.shape, (len(self.keys), len(reference[self.keys[0]])))
+        for i, key in enumerate(self.keys):
+            expected = np.asarray(reference[key], dtype=np.float64)
+            np.testing.assert_array_equal(view[i], expected)
+            np.testing.assert_array_equal(buffer[key], expected)
+
+    def test_partial_fill_and_wraparound(self):
+        buffer = RingBuffer(self.keys, self.size)
+        reference = {key: deque(maxlen=self.size) for key in self.keys}
+        self.assertEqual(buffer.view().shape, (len(self.keys), 0))
+
+        for step in range(3 * self.size + 2):
+            values = [step, 10 * step, -step]
+            buffer.append(values)
+            for key, value in zip(self.keys, values):
+                reference[key].append(value)
+
+            # Oldest to latest, for every window length and position of write pointer:
+            self.assert_same_as_deque(buffer, reference)
+            self.assertEqual(buffer.length, min(step + 1, self.size))
+
+    def test_view_is_not_a_copy(self):
+        buffer = RingBuffer(self.keys, self.size)
+        for step in range(self.size + 2):
+            buffer.append([step, step, step])
+
+        self.assertTrue(np.shares_memory(buffer.view(), buffer.buffer))
+        self.assertTrue(np.shares_memory(buffer['value'], buffer.buffer))
+
+    def test_reset(self):
+        buffer = RingBuffer(self.keys, self.size)
+        for step in range(self.size + 2):
+            buffer.append([step, step, step])
+
+        buffer.reset()
+        self.assertEqual(buffer.view().shape, (len(self.keys), 0))
+
+        buffer.append([1, 2, 3])
+        buffer.append([4, 5, 6])
+        np.testing.assert_array_equal(buffer.view(), [[1, 4], [2, 5], [3, 6]])
+        self.assertEqual(list(buffer), self.keys)
+        self.assertEqual(len(buffer), len(self.keys))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,5 @@
 import  numpy as np
+from collections.abc import Mapping
 
 
 def log_transform(x):
@@ -93,4 +94,62 @@ def discounted_average(x, gamma=1):
     while len(x.shape) < 2:
         x = x[..., None]
     gamma = gamma * np.ones(x.shape)
-    return np.squeeze(np.average(x, weights=(gamma ** np.arange(x.shape[0])[..., None])[::-1], axis=0))
\ No newline at end of file
+    return np.squeeze(np.average(x, weights=(gamma ** np.arange(x.shape[0])[..., None])[::-1], axis=0))
+
+
+class RingBuffer(Mapping):
+    """
+    Fixed-size sliding window over several named statistics, a drop-in for dictionary of `deque(maxlen=size)`.
+    Backed by single preallocated array of shape [num_statistics, 2 * size] updated in place:
+    every value is written twice, `size` columns apart, so ordered (oldest to latest) window is always
+    contiguous slice and is returned as view, with no copying or per-step allocation.
+
+    Args:
+        keys:   statistics names
+        size:   window length
+        dtype:  values type
+
+    Note:
+        Views returned by `view()` and `[key]` are valid until next `append()`; copy to keep.
+    """
+
+    def __init__(self, keys, size, dtype=np.float64):
+        self._keys = list(keys)
+        self._index = {key: i for i, key in enumerate(self._keys)}
+        self.size = size
+        self.buffer = np.zeros([len(self._keys), 2 * size], dtype=dtype)
+        self.position = 0
+        self.length = 0
+
+    def append(self, values):
+        """
+        Writes single value for every statistic.
+
+        Args:
+            values: sequence of values, ordered as buffer keys
+        """
+        self.buffer[:, self.position] = values
+        self.buffer[:, self.position + self.size] = values
+        self.position = (self.position + 1) % self.size
+        self.length = min(self.length + 1, self.size)
+
+    def view(self):
+        """
+        Returns:
+            array of shape [num_statistics, current_window_length], oldest to latest values.
+        """
+        end = self.position + self.size
+        return self.buffer[:, end - self.length: end]
+
+    def reset(self):
+        self.position = 0
+        self.length = 0
+
+    def __getitem__(self, key):
+        return self.view()[self._index[key]]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
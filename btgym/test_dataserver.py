@@ -0,0 +1,135 @@
+import threading
+import multiprocessing
+import unittest
+
+import pandas as pd
+import zmq
+
+from btgym.dataserver import BTgymDataFeedServer
+
+
+class FakeSample:
+
+    def __init__(self, sample_num, timestamp):
+        self.metadata = {'sample_num': sample_num, 'timestamp': timestamp}
+
+    def get_descriptor(self):
+        return None
+
+
+class FakeDataset:
+    """Dataset stub: every sample waits for `gate` to open"""
+
+    def __init__(self):
+        self.data = pd.DataFrame({'open': [1.0]})
+        self.names = ['open']
+        self.data_names = ('default_asset',)
+        self.is_ready = True
+        self.global_timestamp = 0
+        self.sample_num = 0
+        self.sample_lock = threading.RLock()
+        self.gate = threading.Event()
+        self.sampling = threading.Semaphore(0)
+
+    def describe(self, percentiles=True):
+        return self.data.describe()
+
+    def sample(self, **kwargs):
+        with self.sample_lock:
+            sample_num = self.sample_num
+            self.sample_num += 1
+
+        self.sampling.release()
+        assert self.gate.wait(10)
+        return FakeSample(sample_num, self.global_timestamp)
+
+    def get_sample_config(self):
+        return {}
+
+
+class DataServerTest(unittest.TestCase):
+    """Testing data server loop with read-only requests served concurrently"""
+
+    num_clients = 4
+
+    def setUp(self):
+        self.dataset = FakeDataset()
+        receiver, ready = multiprocessing.Pipe(duplex=False)
+        self.server = BTgymDataFeedServer(
+            dataset=self.dataset,
+            network_address='tcp://127.0.0.1:',
+            num_workers=self.num_clients,
+            ready=ready,
+        )
+        # Server loop runs in thread, so its state can be inspected here:
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        self.assertTrue(receiver.poll(10))
+        address, _ = receiver.recv()
+
+        self.context = zmq.Context()
+        self.clients = []
+        for _ in range(self.num_clients + 1):
+            client = self.context.socket(zmq.REQ)
+            client.setsockopt(zmq.RCVTIMEO, 10000)
+            client.connect(address)
+            self.clients.append(client)
+
+    def tearDown(self):
+        self.dataset.gate.set()
+        self.clients[-1].send_pyobj({'ctrl': '_stop'})
+        self.clients[-1].recv_pyobj()
+        self.thread.join(10)
+        for client in self.clients:
+            client.close(linger=0)
+        self.context.term()
+
+    def wait_sampling(self, num_samples):
+        for _ in range(num_samples):
+            self.assertTrue(self.dataset.sampling.acquire(timeout=10))
+
+    def test_concurrent_get_data(self):
+        for client in self.clients[:-1]:
+            client.send_pyobj({'ctrl': '_get_data', 'kwargs': None})
+
+        # Every request is being sampled at once:
+        self.wait_sampling(self.num_clients)
+        self.dataset.gate.set()
+
+        sample_nums = [client.recv_pyobj()['sample'].metadata['sample_num'] for client in self.clients[:-1]]
+        self.assertEqual(sorted(sample_nums), list(range(self.num_clients)))
+        self.assertEqual(self.server.local_step, self.num_clients)
+
+        # Latencies are added after responses are sent, next round trip makes sure those are:
+        self.clients[0].send_pyobj({'ctrl': '_get_info'})
+        latency = self.clients[0].recv_pyobj()['request_latency']
+        self.assertEqual(sum(latency['counts']['_get_data']), self.num_clients)
+
+    def test_broadcast_message_waits_for_requests_served(self):
+        reader, writer = self.clients[:2]
+        reader.send_pyobj({'ctrl': '_get_data', 'kwargs': None})
+        self.wait_sampling(1)
+
+        writer.send_pyobj({'ctrl': '_set_broadcast_message', 'timestamp': 100, 'broadcast_message': 'go'})
+        # Global time is not changed while sample is being made:
+        self.assertEqual(writer.poll(300), 0)
+        self.assertEqual(self.dataset.global_timestamp, 0)
+
+        self.dataset.gate.set()
+        response = reader.recv_pyobj()
+        self.assertEqual(response['timestamp'], 0)
+        self.assertEqual(response['sample'].metadata['timestamp'], 0)
+        writer.recv_pyobj()
+
+        reader.send_pyobj({'ctrl': '_get_broadcast_message'})
+        self.assertEqual(reader.recv_pyobj(), {'timestamp': 100, 'broadcast_message': 'go'})
+
+        # Moving back in time is refused:
+        writer.send_pyobj({'ctrl': '_set_broadcast_message', 'timestamp': 50, 'broadcast_message': 'back'})
+        writer.recv_pyobj()
+        reader.send_pyobj({'ctrl': '_get_global_time'})
+        self.assertEqual(reader.recv_pyobj(), {'timestamp': 100})
+
+
+if __name__ == '__main__':
+    unittest.main()
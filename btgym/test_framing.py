@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+import zmq
+
+from btgym.framing import pack, unpack, send_framed, recv_framed, MIN_FRAME_SIZE
+
+
+class FramingTest(unittest.TestCase):
+    """Testing multipart messages with zero-copy arrays"""
+
+    def setUp(self):
+        self.message = (
+            {
+                'external': np.random.randn(MIN_FRAME_SIZE // 8, 2),
+                'internal': np.random.randn(10, 1, 5),
+            },
+            0.5,
+            False,
+            [{'step': 1}],
+        )
+
+    def assert_same_message(self, received):
+        for key, value in self.message[0].items():
+            np.testing.assert_array_equal(received[0][key], value)
+            self.assertTrue(received[0][key].flags.writeable)
+
+        self.assertEqual(received[1:], self.message[1:])
+
+    def test_received_arrays_are_writable_views(self):
+        context = zmq.Context()
+        sender = context.socket(zmq.PAIR)
+        receiver = context.socket(zmq.PAIR)
+        try:
+            port = sender.bind_to_random_port('tcp://127.0.0.1')
+            receiver.connect('tcp://127.0.0.1:{}'.format(port))
+
+            send_framed(sender, self.message)
+            received = recv_framed(receiver)
+            self.assert_same_message(received)
+
+            # Big array is a view of message buffer, no copy is made:
+            self.assertIsNotNone(received[0]['external'].base)
+            received[0]['external'] *= 2
+            np.testing.assert_array_equal(received[0]['external'], self.message[0]['external'] * 2)
+
+        finally:
+            sender.close(linger=0)
+            receiver.close(linger=0)
+            context.term()
+
+    def test_read_only_frames_are_copied(self):
+        frames = [bytes(memoryview(frame)) for frame in pack(self.message)]
+        self.assertEqual(len(frames), 2)
+        self.assert_same_message(unpack(frames))
+
+
+if __name__ == '__main__':
+    unittest.main()
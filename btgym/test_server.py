@@ -0,0 +1,129 @@
+import os
+import unittest
+import datetime
+
+import numpy as np
+import backtrader as bt
+
+from btgym.datafeed.derivative import BTgymDataset
+from btgym.server import _InfoBuffer, _CerebroTemplate
+
+filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../examples/data/DAT_ASCII_EURUSD_M1_201701.csv')
+
+
+class InfoBufferTest(unittest.TestCase):
+    """Testing columnar storage of frames info"""
+
+    def test_frames_round_trip(self):
+        frames = [
+            dict(
+                step=i,
+                time=datetime.datetime(2017, 1, 1, 0, i),
+                action={'default_asset': 'hold'},
+                broker_message='-',
+                broker_value=100.0 + i,
+                is_open=bool(i % 2),
+            )
+            for i in range(7)
+        ]
+        buffer = _InfoBuffer(3)
+        for frame in frames:
+            buffer.append(frame)
+
+        self.assertEqual(buffer.get(), frames)
+        self.assertEqual(buffer.get(last_only=True), frames[-1:])
+        self.assertEqual(buffer.columns['step'].dtype, np.int64)
+        self.assertEqual(buffer.columns['broker_value'].dtype, np.float64)
+        self.assertEqual(buffer.columns['time'].dtype, object)
+        for key, value in buffer.get()[0].items():
+            self.assertIs(type(value), type(frames[0][key]))
+
+        buffer.reset()
+        buffer.append(frames[0])
+        self.assertEqual(buffer.get(), frames[:1])
+
+    def test_field_type_change(self):
+        buffer = _InfoBuffer(2)
+        values = [1, 2.5, None, 2 ** 70]
+        for value in values:
+            buffer.append({'value': value})
+
+        self.assertEqual([frame['value'] for frame in buffer.get()], values)
+
+    def test_non_dict_info(self):
+        buffer = _InfoBuffer(2)
+        frames = [('a', 1), ('b', 2), ('c', 3)]
+        for frame in frames:
+            buffer.append(frame)
+
+        self.assertEqual(buffer.get(), frames)
+
+
+class FlipPosition(bt.Strategy):
+    params = dict(period=50)
+
+    def next(self):
+        if len(self) % self.p.period == 0:
+            self.order_target_size(target=10000 if (len(self) // self.p.period) % 2 else -10000)
+
+
+class CerebroTemplateTest(unittest.TestCase):
+    """Testing engine built from recorded configuration"""
+
+    @staticmethod
+    def configure(cerebro):
+        cerebro.addstrategy(FlipPosition, period=30)
+        cerebro.addanalyzer(bt.analyzers.DrawDown)
+        cerebro.addobserver(bt.observers.Trades)
+        cerebro.broker.setcash(2000.0)
+        cerebro.broker.setcommission(commission=0.0001, leverage=10.0)
+        cerebro.broker.setcommission(commission=0.001, mult=2.0, name='other')
+        cerebro.broker.set_fundmode(True, fundstartval=50.0)
+        cerebro.broker.set_shortcash(False)
+        return cerebro
+
+    @staticmethod
+    def describe_broker(broker):
+        return (
+            type(broker),
+            broker.p._getkwargs(),
+            {name: (type(info), info.p._getkwargs()) for name, info in broker.comminfo.items()},
+            broker.fundmode,
+        )
+
+    def test_template_matches_configured_cerebro(self):
+        dataset = BTgymDataset(filename=filename)
+        dataset.reset()
+        episode = dataset._sample_exact_interval([1000, 2435])
+
+        template = _CerebroTemplate(self.configure(bt.Cerebro()))
+
+        engines = [self.configure(bt.Cerebro()), template.make(), template.make()]
+
+        # Strategy kwargs are per engine:
+        engines[1].strats[0][0][2]['period'] = 10
+        self.assertEqual(engines[2].strats[0][0][2], {'period': 30})
+        engines[1].strats[0][0][2]['period'] = 30
+
+        results = []
+        for cerebro in engines:
+            config = self.describe_broker(cerebro.broker)
+            cerebro.adddata(list(episode.to_btfeed().values())[0])
+            strategy = cerebro.run(preload=False)[0]
+            results.append(
+                (
+                    config,
+                    [[(cls, kwargs) for cls, args, kwargs in strat] for strat in cerebro.strats],
+                    cerebro.broker.getvalue(),
+                    cerebro.broker.get_fundvalue(),
+                    strategy.analyzers.drawdown.get_analysis()['max']['drawdown'],
+                )
+            )
+
+        self.assertNotEqual(results[0][2], 2000.0)
+        self.assertNotEqual(results[0][3], 50.0)
+        self.assertEqual(results[1], results[0])
+        self.assertEqual(results[2], results[0])
+
+if __name__ == '__main__':
+    unittest.main()
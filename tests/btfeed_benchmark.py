@@ -0,0 +1,70 @@
+"""
+Backtrader data feeds throughput: bars loaded per second by `btfeeds.PandasDirectData` vs `BTgymNumpyData`,
+with same cerebro setup BTgymServer runs episodes with (preload=False).
+
+Usage:
+    python tests/btfeed_benchmark.py [csv_filename] [num_runs]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import backtrader as bt
+import backtrader.feeds as btfeeds
+
+from btgym.datafeed.derivative import BTgymDataset
+from btgym.datafeed.feed import BTgymNumpyData
+
+
+class RecordBars(bt.Strategy):
+    """Collects every bar values seen."""
+
+    def __init__(self):
+        self.bars = []
+
+    def next(self):
+        self.bars.append(
+            (self.data.datetime[0], self.data.open[0], self.data.high[0], self.data.low[0], self.data.close[0])
+        )
+
+
+def run(feed_class, dataset, record=False):
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(
+        feed_class(
+            dataname=dataset.data,
+            timeframe=bt.TimeFrame.Minutes,
+            datetime=0,
+            open=1,
+            high=2,
+            low=3,
+            close=4,
+            volume=-1,
+            openinterest=-1,
+        )
+    )
+    cerebro.addstrategy(RecordBars if record else bt.Strategy)
+    start = time.time()
+    strategy = cerebro.run(preload=False)[0]
+    return time.time() - start, strategy
+
+
+if __name__ == '__main__':
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../examples/data')
+    filename = sys.argv[1] if len(sys.argv) > 1 else os.path.join(data_dir, 'DAT_ASCII_EURUSD_M1_201701.csv')
+    num_runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    dataset = BTgymDataset(filename=filename, log_level=13)
+    dataset.read_csv()
+    num_bars = dataset.data.shape[0]
+
+    # Same bars seen by strategy:
+    _, reference = run(btfeeds.PandasDirectData, dataset, record=True)
+    _, strategy = run(BTgymNumpyData, dataset, record=True)
+    assert np.array_equal(np.asarray(reference.bars), np.asarray(strategy.bars)), 'Feeds output mismatch'
+
+    print('{} bars, best of {} runs:'.format(num_bars, num_runs))
+    for feed_class in [btfeeds.PandasDirectData, BTgymNumpyData]:
+        elapsed = min([run(feed_class, dataset)[0] for _ in range(num_runs)])
+        print('{:>20}: {:8.3f} sec, {:10.0f} bars/sec'.format(feed_class.__name__, elapsed, num_bars / elapsed))
@@ -0,0 +1,89 @@
+"""
+Env <-> server step response throughput: `send_pyobj` vs multipart framing (btgym.framing),
+for DevStrat_4_12-sized observation and for big one.
+
+Usage:
+    python tests/framing_benchmark.py [num_steps]
+"""
+import sys
+import time
+import datetime
+import multiprocessing
+
+import numpy as np
+import zmq
+
+from btgym.framing import send_framed, recv_framed
+
+
+def make_response(external_shape):
+    state = {
+        'external': np.random.rand(*external_shape),
+        'internal': np.random.rand(20, 1, 5),
+        'datetime': np.random.rand(1, 5),
+        'metadata': {
+            'type': np.uint32(0),
+            'trial_num': np.uint32(1),
+            'trial_type': np.uint32(0),
+            'sample_num': np.uint32(1),
+            'first_row': np.uint32(0),
+            'timestamp': np.float64(1.5e9),
+        },
+    }
+    info = [
+        {
+            'step': 1,
+            'time': datetime.datetime.now(),
+            'action': {'default_asset': 'hold'},
+            'broker_message': '-',
+            'broker_cash': 100.0,
+            'broker_value': 100.0,
+            'drawdown': 0.0,
+            'max_drawdown': 0.0,
+        }
+    ]
+    return state, 0.0, False, info
+
+
+def serve(address, external_shape, framed, num_steps):
+    socket = zmq.Context().socket(zmq.REP)
+    socket.bind(address)
+    response = make_response(external_shape)
+    for _ in range(num_steps):
+        socket.recv_pyobj()
+        if framed:
+            send_framed(socket, response)
+
+        else:
+            socket.send_pyobj(response)
+
+
+def run(external_shape, framed, num_steps, port=5599):
+    address = 'tcp://127.0.0.1:{}'.format(port)
+    server = multiprocessing.Process(target=serve, args=(address, external_shape, framed, num_steps))
+    server.start()
+    socket = zmq.Context().socket(zmq.REQ)
+    socket.connect(address)
+    start = time.time()
+    for _ in range(num_steps):
+        socket.send_pyobj({'action': {'default_asset': 'hold'}})
+        response = recv_framed(socket) if framed else socket.recv_pyobj()
+    elapsed = time.time() - start
+    server.join()
+    socket.close()
+    assert response[0]['external'].shape == external_shape
+    return num_steps / elapsed
+
+
+if __name__ == '__main__':
+    num_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    for name, external_shape in [('DevStrat_4_12', (30, 1, 6)), ('256KB', (512, 1, 64)), ('1MB', (2048, 1, 64))]:
+        for framed in [False, True]:
+            print(
+                '{:>14} observation, {:>10}: {:8.0f} steps/sec'.format(
+                    name,
+                    'framed' if framed else 'send_pyobj',
+                    max([run(external_shape, framed, num_steps) for _ in range(3)]),
+                )
+            )
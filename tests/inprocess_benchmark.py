@@ -0,0 +1,49 @@
+"""
+Single environment throughput: server in separate process talking over zmq vs in-process server (`in_process=True`).
+
+Usage:
+    python tests/inprocess_benchmark.py [num_steps]
+"""
+import os
+import sys
+import time
+
+from btgym import BTgymEnv
+
+env_config = dict(
+    filename=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '../examples/data/DAT_ASCII_EURUSD_M1_201701.csv'
+    ),
+    render_enabled=False,
+    connect_timeout=30,
+    port=5100,
+    data_port=5099,
+    log_level=13,
+)
+
+
+def run(in_process, num_steps):
+    env = BTgymEnv(in_process=in_process, **env_config)
+    env.reset()
+    start = time.time()
+    for _ in range(num_steps):
+        o, r, d, i = env.step(env.action_space.sample())
+        if d:
+            env.reset()
+
+    elapsed = time.time() - start
+    stat = env.get_stat()
+    env.close()
+    assert 'runtime' in stat
+    return num_steps / elapsed
+
+
+if __name__ == '__main__':
+    num_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    for in_process in [False, True]:
+        print(
+            '{:>12}: {:8.0f} steps/sec'.format(
+                'in-process' if in_process else 'zmq', max([run(in_process, num_steps) for _ in range(2)])
+            )
+        )
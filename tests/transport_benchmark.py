@@ -0,0 +1,68 @@
+"""
+Env <-> server step round-trip latency over zmq transports: `tcp` vs `ipc` (btgym.ports.get_address),
+with `inproc` as lower bound, for DevStrat_4_12-sized step response.
+
+Usage:
+    python tests/transport_benchmark.py [num_steps]
+"""
+import sys
+import time
+import threading
+import multiprocessing
+
+import numpy as np
+import zmq
+
+from btgym.framing import send_framed, recv_framed
+from btgym.ports import get_address
+
+from framing_benchmark import make_response
+
+
+def serve(context, address, num_steps, ready):
+    socket = (context or zmq.Context()).socket(zmq.REP)
+    socket.bind(address)
+    ready.set()
+    response = make_response((30, 1, 6))
+    for _ in range(num_steps):
+        socket.recv_pyobj()
+        send_framed(socket, response)
+    socket.close()
+
+
+def run(transport, num_steps, port=5598):
+    if transport == 'inproc':
+        # Server thread shares context with client:
+        context = zmq.Context()
+        address = 'inproc://btgym_benchmark'
+        ready = threading.Event()
+        server = threading.Thread(target=serve, args=(context, address, num_steps, ready))
+
+    else:
+        context = None
+        address = get_address('tcp://127.0.0.1:', port, transport, 'benchmark')
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(target=serve, args=(None, address, num_steps, ready))
+
+    server.start()
+    ready.wait()
+    socket = (context or zmq.Context()).socket(zmq.REQ)
+    socket.connect(address)
+    latency = []
+    for _ in range(num_steps):
+        start = time.time()
+        socket.send_pyobj({'action': {'default_asset': 'hold'}})
+        response = recv_framed(socket)
+        latency.append(time.time() - start)
+    server.join()
+    socket.close()
+    assert response[0]['external'].shape == (30, 1, 6)
+    return np.median(latency) * 1e6, np.percentile(latency, 99) * 1e6
+
+
+if __name__ == '__main__':
+    num_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    for transport in ['tcp', 'ipc', 'inproc']:
+        median, p99 = min([run(transport, num_steps) for _ in range(3)])
+        print('{:>8}: round trip median {:8.1f} us, 99% {:8.1f} us'.format(transport, median, p99))
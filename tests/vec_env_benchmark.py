@@ -0,0 +1,93 @@
+"""
+Several environments throughput: list of `BTgymEnv` stepped one by one vs `VecBTgymEnv` stepping concurrently
+vs same list driven by single asyncio event loop via `async_step()`.
+
+Usage:
+    python tests/vec_env_benchmark.py [num_envs] [num_steps]
+"""
+import os
+import sys
+import time
+import asyncio
+
+from btgym import BTgymEnv
+from btgym.envs.vector import VecBTgymEnv
+
+env_config = dict(
+    filename=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '../examples/data/DAT_ASCII_EURUSD_M1_201701.csv'
+    ),
+    render_enabled=False,
+    connect_timeout=30,
+)
+
+
+def run_sequential(num_envs, num_steps):
+    envs = [
+        BTgymEnv(port=5100 + i, data_port=5099, data_master=i == 0, task=i, log_level=13, **env_config)
+        for i in range(num_envs)
+    ]
+    for env in envs:
+        env.reset()
+
+    start = time.time()
+    for _ in range(num_steps):
+        for env in envs:
+            o, r, d, i = env.step(env.action_space.sample())
+            if d:
+                env.reset()
+
+    elapsed = time.time() - start
+    for env in reversed(envs):
+        env.close()
+    return num_steps * num_envs / elapsed
+
+
+def run_async(num_envs, num_steps):
+    envs = [
+        BTgymEnv(port=5100 + i, data_port=5099, data_master=i == 0, task=i, log_level=13, **env_config)
+        for i in range(num_envs)
+    ]
+
+    async def run_env(env):
+        for _ in range(num_steps):
+            o, r, d, i = await env.async_step(env.action_space.sample())
+            if d:
+                await env.async_reset()
+
+    async def run_all():
+        # Data master first:
+        await envs[0].async_reset_data()
+        await asyncio.gather(*[env.async_reset() for env in envs])
+        start = time.time()
+        await asyncio.gather(*[run_env(env) for env in envs])
+        return time.time() - start
+
+    elapsed = asyncio.run(run_all())
+    for env in reversed(envs):
+        env.close()
+    return num_steps * num_envs / elapsed
+
+
+def run_vectorized(num_envs, num_steps):
+    env = VecBTgymEnv(num_envs=num_envs, port=5100, data_port=5099, log_level=13, **env_config)
+    env.reset()
+
+    start = time.time()
+    for _ in range(num_steps):
+        o, r, d, i = env.step([env.action_space.sample() for _ in range(num_envs)])
+
+    elapsed = time.time() - start
+    assert r.shape == (num_envs,) and o['raw'].shape[0] == num_envs
+    env.close()
+    return num_steps * num_envs / elapsed
+
+
+if __name__ == '__main__':
+    num_envs = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    num_steps = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    print('{} environments, {} cpu:'.format(num_envs, os.cpu_count()))
+    print('{:>12}: {:8.0f} env steps/sec'.format('sequential', run_sequential(num_envs, num_steps)))
+    print('{:>12}: {:8.0f} env steps/sec'.format('VecBTgymEnv', run_vectorized(num_envs, num_steps)))
+    print('{:>12}: {:8.0f} env steps/sec'.format('asyncio', run_async(num_envs, num_steps)))